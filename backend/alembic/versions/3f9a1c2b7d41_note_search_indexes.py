@@ -0,0 +1,48 @@
+"""note search indexes
+
+Revision ID: 3f9a1c2b7d41
+Revises: cc82c6fc530d
+Create Date: 2026-10-16 10:12:40.512733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d41'
+down_revision: Union[str, None] = 'cc82c6fc530d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app/models/note.py 의 NOTE_SEARCH_VECTOR 와 같아야 한다
+# 한국어 사전이 없으므로 'simple' 설정을 쓰고, 조사가 붙은 어절은 접두어 질의(:*)로 찾는다
+# tsvector 크기 제한(1MB) 때문에 본문은 앞 100,000자만 색인한다
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', left(coalesce(content, ''), 100000)), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('notes', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR, persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_notes_search_vector', 'notes', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_notes_title_trgm', 'notes', ['title'], unique=False,
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notes_title_trgm', table_name='notes')
+    op.drop_index('ix_notes_search_vector', table_name='notes')
+    op.drop_column('notes', 'search_vector')
@@ -0,0 +1,30 @@
+"""note content trigram index
+
+Revision ID: 5e7b9d2c4a16
+Revises: 8b2d4e6f1a93
+Create Date: 2026-10-16 18:05:27.391842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7b9d2c4a16'
+down_revision: Union[str, None] = '8b2d4e6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 본문 부분 문자열 검색 (content ILIKE '%검색어%') 용. pg_trgm 은 3f9a1c2b7d41 에서 설치했다
+    op.create_index(
+        'ix_notes_content_trgm', 'notes', ['content'], unique=False,
+        postgresql_using='gin', postgresql_ops={'content': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notes_content_trgm', table_name='notes')
@@ -0,0 +1,32 @@
+"""chat history summary
+
+Revision ID: 8b2d4e6f1a93
+Revises: 3f9a1c2b7d41
+Create Date: 2026-10-16 15:40:12.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4e6f1a93'
+down_revision: Union[str, None] = '3f9a1c2b7d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_until_id', sa.Integer(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_chat_messages_session_id_id', 'chat_messages', ['session_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_session_id_id', table_name='chat_messages')
+    op.drop_column('chat_sessions', 'summary_updated_at')
+    op.drop_column('chat_sessions', 'summary_until_id')
+    op.drop_column('chat_sessions', 'summary')
@@ -0,0 +1,30 @@
+"""note content truncated flag
+
+Revision ID: 9d4f2a7c1e58
+Revises: 5e7b9d2c4a16
+Create Date: 2026-10-16 21:12:44.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f2a7c1e58'
+down_revision: Union[str, None] = '5e7b9d2c4a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 스트리밍 적재로 본문 앞부분만 저장된 노트 표시 (본문 수정 시 나머지 청크가 지워지지 않도록)
+    op.add_column(
+        'notes',
+        sa.Column('content_truncated', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('notes', 'content_truncated')
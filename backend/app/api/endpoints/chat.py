@@ -1,19 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from typing import List, Dict
+import logging
 
 from app.db.session import get_db, SessionLocal
 from app.models.user import User
 from app.models.chat import ChatSession, ChatMessage
 from app.core.deps import get_current_user
-from app.services.embedding_service import EmbeddingService
-from app.services.milvus_service import search_similar
+from app.services.chat_history import load_history, needs_summary, refresh_summary
+from app.services.chat_retrieval import retrieve_for_chat
+from app.services.context_builder import build_chat_context
+from app.core.config import settings
 from app.services.gemini_service import GeminiService
+from app.services.response_cache import get_response_cache
 
 router = APIRouter()
-embedding_service = EmbeddingService()
+logger = logging.getLogger(__name__)
 gemini_service = GeminiService()
+response_cache = get_response_cache()
 
 @router.post("/chat/sessions", response_model=Dict)
 def create_chat_session(
@@ -51,55 +58,79 @@ def get_chat_messages(
     return [{"role": m.role, "content": m.content} for m in messages]
 
 
+def _load_chat_turn(db: Session, session_id: int, user_id: int, message: str) -> Dict:
+    """세션 확인 후 이전 대화 기록(최근 창 + 요약)을 읽고 사용자 메시지를 저장 (스레드풀에서 실행)"""
+    session = db.query(ChatSession).filter(ChatSession.id == session_id, ChatSession.user_id == user_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="채팅 세션을 찾을 수 없습니다.")
+
+    # 이전 대화 기록 불러오기 (후속 질문 검색에도 사용, 현재 메시지는 제외)
+    # 토큰 예산 안의 최근 메시지만 읽고, 그보다 오래된 대화는 세션 요약으로 대신한다
+    history = load_history(db, session)
+
+    # 사용자 메시지를 먼저 커밋
+    db.add(ChatMessage(session_id=session_id, role="user", content=message))
+    db.commit()
+    return history
+
+
+def _save_assistant_message(session_id: int, content: str):
+    db_stream = SessionLocal()
+    try:
+        db_stream.add(ChatMessage(session_id=session_id, role="assistant", content=content))
+        db_stream.commit()
+    finally:
+        db_stream.close()
+
+
 @router.post("/chat/sessions/{session_id}")
-def post_chat_message(
+async def post_chat_message(
     session_id: int,
     message: str = Body(..., embed=True),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """사용자 메시지를 처리하고 AI의 답변을 스트리밍으로 반환합니다."""
-    session = db.query(ChatSession).filter(ChatSession.id == session_id, ChatSession.user_id == current_user.id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="채팅 세션을 찾을 수 없습니다.")
+    """사용자 메시지를 처리하고 AI의 답변을 스트리밍으로 반환합니다.
 
-    # 1. 사용자 메시지를 DB에 저장
-    user_message = ChatMessage(session_id=session.id, role="user", content=message)
-    db.add(user_message)
-    
-    # 2. Milvus에서 관련 노트 검색
-    _, query_embedding = embedding_service.process_text(message)
-    # query_embedding은 2차원 리스트이므로 첫 번째 벡터만 사용
-    search_results = search_similar("notes", query_embedding[0], top_k=3)
+    이벤트 루프를 막지 않도록 DB 작업은 스레드풀에서, 임베딩은 executor 에서,
+    벡터 검색과 Gemini 스트리밍은 async 클라이언트로 처리한다.
+    """
+    # 1~2. 세션 확인, 이전 대화 기록 불러오기, 사용자 메시지 저장
+    history = await run_in_threadpool(_load_chat_turn, db, session_id, current_user.id, message)
+    history_dicts = history["messages"]
+    logger.debug(
+        f"Chat history: messages={len(history_dicts)} tokens~{history['tokens']} "
+        f"summary={'yes' if history['summary'] else 'no'} pending={history['pending_messages']}"
+    )
+
+    # 3. 관련 노트 검색 (컨텍스트 후보를 넉넉히 가져온다)
+    # 원문/최근 턴 포함/키워드 질의를 한 배치로 임베딩하고 한 번의 배치 검색으로 찾는다
+    search_results, retrieval_stats = await retrieve_for_chat(
+        message, history_dicts, current_user.id, top_k=settings.CHAT_RETRIEVAL_TOP_K
+    )
+    logger.debug(f"Chat retrieval: {retrieval_stats}")
     
-    context = ""
-    if search_results:
-        # search_similar는 content를 포함한 딕셔너리 리스트를 반환
-        contents = [res['content'] for res in search_results if 'content' in res]
-        context = "\n---\n".join(filter(None, contents))
-    else:
+    # 겹치거나 거의 같은 청크를 빼고 MMR 로 다양하게 골라 토큰 예산 안에서 컨텍스트를 만든다
+    context, context_chunks, context_stats = await build_chat_context(search_results)
+    logger.debug(f"Chat context: {context_stats}")
+    if not context:
         context = "관련 정보를 찾지 못했습니다."
 
-    # 3. 이전 대화 기록 불러오기
-    history = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).order_by(ChatMessage.created_at.asc()).all()
-    history_dicts = [{"role": m.role, "content": m.content} for m in history]
-
-    # 4. Gemini API 호출 및 스트리밍 응답 생성
-    def stream_response(session_id_for_stream: int):
+    # 4. Gemini API 호출 및 스트리밍 응답 생성 (async 제너레이터라 스레드풀 슬롯을 잡지 않음)
+    async def stream_response(session_id_for_stream: int):
         full_response = ""
-        db_stream = SessionLocal()
-        try:
-            for chunk in gemini_service.generate_chat_response(history_dicts, message, context):
-                full_response += chunk
-                yield chunk
-
-            # 5. AI 응답을 DB에 저장 (스트림이 끝난 후)
-            if full_response.strip():
-                assistant_message = ChatMessage(session_id=session_id_for_stream, role="assistant", content=full_response)
-                db_stream.add(assistant_message)
-                db_stream.commit()
-        finally:
-            db_stream.close()
-
-    db.commit() # 사용자 메시지를 먼저 커밋
-    return StreamingResponse(stream_response(session.id), media_type="text/plain") 
\ No newline at end of file
+        # 응답 캐시가 켜져 있으면 같은 검색 청크에 대한 비슷한 질문의 답변을 재사용한다
+        answer_stream = response_cache.astream(
+            gemini_service, current_user.id, context_chunks, history_dicts, message, context, history["summary"]
+        )
+        async for chunk in answer_stream:
+            full_response += chunk
+            yield chunk
+
+        # 5. AI 응답을 DB에 저장 (스트림이 끝난 후)
+        if full_response.strip():
+            await run_in_threadpool(_save_assistant_message, session_id_for_stream, full_response)
+
+    # 6. 창 밖으로 밀려난 오래된 턴이 쌓였으면 응답을 보낸 뒤 세션 요약에 접어 넣는다
+    background = BackgroundTask(refresh_summary, session_id, gemini_service) if needs_summary(history) else None
+    return StreamingResponse(stream_response(session_id), media_type="text/plain", background=background)
@@ -1,19 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.db.session import get_db
 from app.models.note import Note
 from app.models.user import User
-from app.services.milvus_service import insert_vectors, delete_vectors
-from app.services.embedding_service import EmbeddingService
+from app.services.vector_store import get_vector_store
+from app.services.note_indexer import (
+    TruncatedContentError, content_to_reindex, index_note, note_metadata, reindex_note,
+)
+from app.services.ingest_pipeline import ingest_file
+from app.services.search_service import hybrid_search
+from app.services.response_cache import get_response_cache
+from app.services.retrieval_cache import get_retrieval_cache
+from app.services.keyword_search import TRGM_MIN_PATTERN_CHARS, prefix_tsquery
+from app.services.embedding_service import get_embedding_service
 from app.services.content_extractor import ContentExtractor
 from app.services.news_reader_service import extract_content_from_url
 from app.core.deps import get_current_user
 import os
+import shutil
+import time
 from app.core.config import settings
 
 router = APIRouter()
-embedding_service = EmbeddingService()
+embedding_service = get_embedding_service()
+vector_store = get_vector_store()
+retrieval_cache = get_retrieval_cache()
+response_cache = get_response_cache()
 content_extractor = ContentExtractor()
 
 @router.post("/notes/")
@@ -45,11 +60,13 @@ async def create_note(
             file_path = os.path.join(settings.UPLOAD_DIR, file.filename)
             os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
             
+            # 업로드 전체를 메모리에 올리지 않고 디스크로 복사
             with open(file_path, "wb") as buffer:
-                file_content = await file.read()
-                buffer.write(file_content)
+                await run_in_threadpool(shutil.copyfileobj, file.file, buffer, 1024 * 1024)
             
             note.source_path = file_path
+            if os.path.getsize(file_path) >= settings.INGEST_STREAMING_MIN_BYTES:
+                return await run_in_threadpool(_ingest_large_file, note, file_path, db)
             extracted_text = content_extractor.extract_from_file(file_path)
             
         elif source_type == "url":
@@ -65,7 +82,7 @@ async def create_note(
             note.content = content_extractor.clean_text(extracted_text)
             print(f"Setting note content: {note.content[:100]}...")
             
-            chunks, embeddings = embedding_service.process_text(note.content)
+            chunks, embeddings = await embedding_service.aprocess_text(note.content)
             
             db.add(note)
             db.commit()
@@ -73,13 +90,9 @@ async def create_note(
             print(f"Note saved with ID: {note.id}")
             
             # Milvus에 벡터 저장
-            insert_vectors(
-                collection_name="notes",
-                vectors=embeddings,
-                ids=list(range(len(chunks))),
-                note_ids=[note.id] * len(chunks),
-                contents=chunks
-            )
+            upserted = index_note(note.id, chunks, embeddings, metadata=note_metadata(note))
+            retrieval_cache.invalidate_user(current_user.id)
+            print(f"Upserted {upserted['points']} points ({upserted['points_per_sec']:.0f} points/sec)")
             
             return note
         else:
@@ -98,6 +111,52 @@ async def create_note(
             detail=str(e)
         )
 
+def _ingest_large_file(note: Note, file_path: str, db: Session) -> Note:
+    """큰 파일을 스트리밍 파이프라인으로 적재 (청크는 만들어지는 대로 배치 단위로 저장됨)"""
+    # 벡터 payload 에 note_id 가 필요하므로 노트를 먼저 만든다
+    db.add(note)
+    db.commit()
+    db.refresh(note)
+    # 적재 중에도 앞쪽 청크가 검색되므로 성공/실패와 관계없이 끝나면 캐시를 비운다
+    try:
+        stats = ingest_file(
+            note.id,
+            file_path,
+            embedding_service,
+            content_extractor,
+            batch_size=settings.INGEST_BATCH_SIZE,
+            queue_batches=settings.INGEST_QUEUE_BATCHES,
+            content_max_chars=settings.INGEST_CONTENT_MAX_CHARS,
+            metadata=note_metadata(note),
+        )
+    except Exception:
+        # 일부만 적재된 노트를 남기지 않는다
+        try:
+            vector_store.delete_vectors("notes", note.id)
+        except Exception as e:
+            print(f"Failed to delete vectors: {e}")
+        retrieval_cache.invalidate_user(note.user_id)
+        db.delete(note)
+        db.commit()
+        raise
+    retrieval_cache.invalidate_user(note.user_id)
+    if not stats["chunks"]:
+        vector_store.delete_vectors("notes", note.id)
+        db.delete(note)
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to extract content"
+        )
+
+    # 본문은 INGEST_CONTENT_MAX_CHARS 까지만 저장 (검색은 전체 청크 기준)
+    note.content = stats.pop("content")
+    note.content_truncated = stats["content_truncated"]
+    db.commit()
+    db.refresh(note)
+    print(f"Note {note.id} ingested by streaming pipeline: {stats}")
+    return note
+
 @router.get("/notes/")
 def get_notes(
     skip: int = 0,
@@ -107,7 +166,7 @@ def get_notes(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """노트 목록 조회"""
+    """노트 목록 조회 (search 가 있으면 전문 검색 인덱스로 찾고 관련도순 정렬)"""
     try:
         query = db.query(Note).filter(Note.user_id == current_user.id)
         
@@ -115,13 +174,18 @@ def get_notes(
             query = query.filter(Note.category == category)
         
         if search:
-            query = query.filter(
-                Note.title.ilike(f"%{search}%") |
-                Note.content.ilike(f"%{search}%")
-            )
+            query = _apply_search(query, search)
         
-        total = query.count()
-        notes = query.offset(skip).limit(limit).all()
+        # 전체 개수는 별도 count 쿼리 대신 같은 쿼리의 윈도 함수로 받는다
+        rows = query.add_columns(func.count().over().label("total")).offset(skip).limit(limit).all()
+        notes = [row[0] for row in rows]
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # 범위를 벗어난 페이지는 행이 없어서 개수를 따로 센다
+            total = query.order_by(None).count()
+        else:
+            total = 0
         
         return {"notes": notes, "total": total}
     except Exception as e:
@@ -130,6 +194,81 @@ def get_notes(
             detail=str(e)
         )
 
+def _apply_search(query, search: str):
+    """제목/본문 검색 조건과 관련도 정렬 추가
+
+    제목/본문의 부분 문자열 검색(ILIKE, pg_trgm 인덱스)에 search_vector(GIN) 접두어 전문 검색을 더한다.
+    전문 검색은 조사가 붙은 어절과 떨어져 있는 여러 검색어("노트를 검색" → 노트, 검색)를 찾는다.
+    2글자 검색어("학습")는 트라이그램이 없어 본문 ILIKE 가 인덱스를 못 쓰고 모든 본문을 읽으므로,
+    본문 부분 문자열 검색은 TRGM_MIN_PATTERN_CHARS 글자 이상일 때만 한다 (2글자는 전문 검색의 접두어 매칭으로 찾는다).
+    검색어가 모두 너무 짧으면 (1글자) 예전처럼 ILIKE 로만 찾는다.
+    """
+    pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    tsquery_text = prefix_tsquery(search)
+    if tsquery_text is None:
+        return query.filter(Note.title.ilike(pattern) | Note.content.ilike(pattern)).order_by(Note.created_at.desc())
+    ts_query = func.to_tsquery("simple", tsquery_text)
+    condition = Note.search_vector.op("@@")(ts_query) | Note.title.ilike(pattern)
+    if len(search.strip()) >= TRGM_MIN_PATTERN_CHARS:
+        condition = condition | Note.content.ilike(pattern)
+    return query.filter(condition).order_by(
+        func.ts_rank_cd(Note.search_vector, ts_query).desc(),
+        func.similarity(Note.title, search).desc(),
+        Note.created_at.desc(),
+    )
+
+def _load_notes(db: Session, note_ids: List[int], user_id: int) -> Dict[int, Note]:
+    """검색 결과 노트를 한 번에 조회 (스레드풀에서 실행)"""
+    if not note_ids:
+        return {}
+    return {note.id: note for note in db.query(Note).filter(Note.id.in_(note_ids), Note.user_id == user_id).all()}
+
+# /notes/{note_id} 보다 먼저 등록해야 "search" 가 note_id 로 해석되지 않는다
+@router.get("/notes/search")
+async def search_notes(
+    q: str,
+    skip: int = 0,
+    limit: int = 10,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """하이브리드 검색 (벡터 + BM25 키워드, RRF 로 합친 노트 단위 결과와 하이라이트 스니펫)"""
+    if not q.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Query is empty")
+    skip = max(skip, 0)
+    limit = min(max(limit, 1), 50)
+    # 한 노트에서 여러 청크가 나오므로 요청한 페이지보다 넉넉하게 청크 후보를 가져온다
+    candidates = min(settings.SEARCH_MAX_CANDIDATES, (skip + limit) * 4)
+    try:
+        found = await hybrid_search(q, current_user.id, candidates, category=category)
+    except Exception as e:
+        print(f"Error searching notes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+    started = time.perf_counter()
+    notes = await run_in_threadpool(_load_notes, db, [hit["note_id"] for hit in found["notes"]], current_user.id)
+    # DB 에 없는 노트(삭제 직후 남은 벡터 등)는 제외
+    hits = [hit for hit in found["notes"] if hit["note_id"] in notes]
+    results = []
+    for hit in hits[skip:skip + limit]:
+        note = notes[hit["note_id"]]
+        results.append({
+            "note_id": note.id,
+            "title": note.title,
+            "category": note.category,
+            "created_at": note.created_at,
+            "score": hit["score"],
+            "sources": hit["sources"],
+            "snippets": hit["snippets"],
+        })
+    timings = found["timings_ms"]
+    timings["db"] = (time.perf_counter() - started) * 1000
+    return {"results": results, "total": len(hits), "skip": skip, "limit": limit, "timings_ms": timings}
+
 @router.get("/notes/{note_id}")
 def get_note(
     note_id: int,
@@ -146,6 +285,74 @@ def get_note(
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
+@router.put("/notes/{note_id}")
+@router.patch("/notes/{note_id}")
+def update_note(
+    note_id: int,
+    title: Optional[str] = Form(None),
+    content: Optional[str] = Form(None),
+    category: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """노트 수정 (바뀐 청크만 다시 임베딩)"""
+    note = db.query(Note).filter(
+        Note.id == note_id,
+        Note.user_id == current_user.id
+    ).first()
+
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    if title is not None:
+        note.title = title
+    category_changed = category is not None and category != note.category
+    if category_changed:
+        note.category = category
+
+    if content is not None:
+        cleaned = content_extractor.clean_text(content)
+        if not cleaned:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Content is empty"
+            )
+        try:
+            cleaned = content_to_reindex(note, cleaned, content_extractor.clean_text)
+        except TruncatedContentError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if cleaned is not None:
+            chunks = embedding_service.split_text(cleaned)
+            try:
+                stats = reindex_note(note.id, chunks, embedding_service, metadata=note_metadata(note))
+            except Exception as e:
+                print(f"Failed to update vectors: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=str(e)
+                )
+            print(f"Note {note.id} re-indexed: {stats}")
+            note.content = cleaned
+            retrieval_cache.invalidate_user(current_user.id)
+            response_cache.invalidate_note(note.id)
+
+    if category_changed:
+        # 재사용된 기존 포인트에도 바뀐 카테고리가 반영되도록 노트 전체 payload 갱신
+        try:
+            vector_store.set_note_metadata("notes", note.id, note_metadata(note))
+        except Exception as e:
+            print(f"Failed to update vector metadata: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+        # 카테고리 필터 검색 결과가 바뀐다
+        retrieval_cache.invalidate_user(current_user.id)
+
+    db.commit()
+    db.refresh(note)
+    return note
+
 @router.delete("/notes/{note_id}")
 def delete_note(
     note_id: int,
@@ -170,9 +377,11 @@ def delete_note(
     
     # Milvus에서 벡터 삭제
     try:
-        delete_vectors("notes", note_id)
+        vector_store.delete_vectors("notes", note_id)
     except Exception as e:
         print(f"Failed to delete vectors: {e}")
+    retrieval_cache.invalidate_user(current_user.id)
+    response_cache.invalidate_note(note_id)
     
     db.delete(note)
     db.commit()
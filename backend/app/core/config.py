@@ -38,11 +38,97 @@ class Settings(BaseSettings):
     # 파일 업로드 설정
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
     MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", "10485760"))  # 10MB
+    # 이 크기 이상의 파일은 추출 → 정제 → 분할 → 임베딩 → 저장을 스트리밍 파이프라인으로 처리
+    INGEST_STREAMING_MIN_BYTES: int = int(os.getenv("INGEST_STREAMING_MIN_BYTES", "5242880"))  # 5MB
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "64"))  # 임베딩/업서트 단위 청크 수
+    INGEST_QUEUE_BATCHES: int = int(os.getenv("INGEST_QUEUE_BATCHES", "4"))  # 단계 사이 큐에 쌓아둘 최대 배치 수
+    INGEST_CONTENT_MAX_CHARS: int = int(os.getenv("INGEST_CONTENT_MAX_CHARS", "1000000"))  # DB 에 저장할 본문 최대 길이
     
     # Qdrant 설정
     QDRANT_URL: Optional[str] = os.getenv("QDRANT_URL")
     QDRANT_API_KEY: Optional[str] = os.getenv("QDRANT_API_KEY")
     
+    # 벡터 저장소: qdrant (QDRANT_URL 서버) 또는 local (프로세스 내 memmap + NumPy/HNSW 검색)
+    VECTOR_STORE_BACKEND: str = os.getenv("VECTOR_STORE_BACKEND", "qdrant")
+    VECTOR_STORE_LOCAL_DIR: str = os.getenv("VECTOR_STORE_LOCAL_DIR", "./data/vectors")
+    VECTOR_STORE_HNSW_THRESHOLD: int = int(os.getenv("VECTOR_STORE_HNSW_THRESHOLD", "20000"))  # 이 수 이상이면 HNSW (hnswlib 필요)
+    VECTOR_STORE_HNSW_EF: int = int(os.getenv("VECTOR_STORE_HNSW_EF", "128"))  # 검색 시 후보 목록 크기 (클수록 정확하고 느림)
+
+    # 하이브리드 검색 (/notes/search): 벡터 검색과 BM25 키워드 검색 결과를 RRF 로 합침
+    SEARCH_RRF_K: int = int(os.getenv("SEARCH_RRF_K", "60"))  # RRF 점수 1 / (k + 순위) 의 k
+    SEARCH_MAX_CANDIDATES: int = int(os.getenv("SEARCH_MAX_CANDIDATES", "200"))  # 검색 방식별 최대 청크 후보 수
+    SEARCH_SNIPPETS_PER_NOTE: int = int(os.getenv("SEARCH_SNIPPETS_PER_NOTE", "2"))
+    SEARCH_SNIPPET_CHARS: int = int(os.getenv("SEARCH_SNIPPET_CHARS", "160"))
+    
+    # 임베딩 모델 설정
+    EMBEDDING_MODEL_NAME: str = os.getenv("EMBEDDING_MODEL_NAME", "nlpai-lab/KURE-v1")
+    EMBEDDING_DIM: int = int(os.getenv("EMBEDDING_DIM", "1024"))
+    # 추론 백엔드: torch (fp32) 또는 onnx (scripts/export_onnx.py 로 내보낸 모델)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_DIR: str = os.getenv("EMBEDDING_ONNX_DIR", "./models/kure-v1-onnx")
+    EMBEDDING_ONNX_INT8: bool = os.getenv("EMBEDDING_ONNX_INT8", "false").lower() == "true"
+    EMBEDDING_ONNX_THREADS: int = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+    # 시작 시 모델을 미리 로드 (완료 전까지 /ready 는 503)
+    EMBEDDING_WARMUP: bool = os.getenv("EMBEDDING_WARMUP", "true").lower() == "true"
+    
+    # 임베딩 서버 설정 (예: unix:/tmp/vector_note_embedding.sock, tcp:127.0.0.1:8765)
+    EMBEDDING_SERVER_ADDRESS: Optional[str] = os.getenv("EMBEDDING_SERVER_ADDRESS")
+    EMBEDDING_SERVER_TIMEOUT_SECONDS: float = float(os.getenv("EMBEDDING_SERVER_TIMEOUT_SECONDS", "30"))
+    EMBEDDING_SERVER_RETRY_SECONDS: float = float(os.getenv("EMBEDDING_SERVER_RETRY_SECONDS", "30"))
+    EMBEDDING_SERVER_THREADS: int = int(os.getenv("EMBEDDING_SERVER_THREADS", "0"))
+    
+    # 청크 분할 설정 (CHUNK_UNIT: char 또는 token)
+    CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "500"))
+    CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "50"))
+    CHUNK_UNIT: str = os.getenv("CHUNK_UNIT", "char")
+    
+    # 임베딩 캐시 설정 (메모리 LRU + 디스크)
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_DIR: Optional[str] = os.getenv("EMBEDDING_CACHE_DIR", "./cache/embeddings")
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000"))
+    EMBEDDING_CACHE_DISK_MAX_MB: int = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_MB", "512"))
+    
+    # 쿼리 임베딩 캐시 설정
+    QUERY_CACHE_MAX_ITEMS: int = int(os.getenv("QUERY_CACHE_MAX_ITEMS", "2048"))
+    QUERY_CACHE_TTL_SECONDS: int = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "600"))
+    
+    # 사용자별 벡터 검색 결과 캐시 (노트가 바뀌면 해당 사용자 항목만 무효화)
+    RETRIEVAL_CACHE_ENABLED: bool = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+    RETRIEVAL_CACHE_MAX_MB: int = int(os.getenv("RETRIEVAL_CACHE_MAX_MB", "64"))
+    RETRIEVAL_CACHE_TTL_SECONDS: int = int(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "300"))
+    
+    # 채팅 검색: 원문 + 최근 턴을 붙인 질의 + 키워드 질의를 한 번의 배치 검색으로 조회
+    CHAT_RETRIEVAL_TOP_K: int = int(os.getenv("CHAT_RETRIEVAL_TOP_K", "12"))  # 컨텍스트 후보로 넉넉히 가져올 청크 수
+    CHAT_QUERY_HISTORY_TURNS: int = int(os.getenv("CHAT_QUERY_HISTORY_TURNS", "2"))  # 질의에 붙일 최근 사용자 질문 수
+    CHAT_QUERY_KEYWORDS: bool = os.getenv("CHAT_QUERY_KEYWORDS", "true").lower() == "true"
+    # 채팅 컨텍스트: 후보에서 겹치는 청크를 빼고 MMR 로 다양하게 골라 토큰 예산 안에 채움
+    CHAT_CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "2000"))  # 컨텍스트 토큰 예산 (추정치)
+    CHAT_CONTEXT_MAX_CHUNKS: int = int(os.getenv("CHAT_CONTEXT_MAX_CHUNKS", "6"))
+    CHAT_CONTEXT_MMR_LAMBDA: float = float(os.getenv("CHAT_CONTEXT_MMR_LAMBDA", "0.7"))  # 1 이면 관련도만, 0 이면 다양성만
+    CHAT_CONTEXT_DUPLICATE_SIMILARITY: float = float(os.getenv("CHAT_CONTEXT_DUPLICATE_SIMILARITY", "0.95"))  # 이 cosine 이상은 중복으로 제외
+
+    # 채팅 기록: 최근 턴은 토큰 예산 안에서 그대로, 그보다 오래된 턴은 세션의 누적 요약으로 전달
+    CHAT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))  # 그대로 보낼 최근 메시지의 토큰 예산 (추정치)
+    CHAT_HISTORY_MAX_TURNS: int = int(os.getenv("CHAT_HISTORY_MAX_TURNS", "10"))  # 그대로 보낼 최대 턴 수 (턴 = 질문 + 답변)
+    CHAT_SUMMARY_ENABLED: bool = os.getenv("CHAT_SUMMARY_ENABLED", "true").lower() == "true"
+    CHAT_SUMMARY_MIN_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_MIN_MESSAGES", "6"))  # 요약 대기 메시지가 이만큼 쌓이면 갱신
+    CHAT_SUMMARY_MAX_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_MAX_MESSAGES", "40"))  # 한 번의 갱신에 접어 넣을 최대 메시지 수
+    CHAT_SUMMARY_MAX_TOKENS: int = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "512"))  # 요약 응답 최대 토큰
+
+    # 채팅 응답 캐시 (opt-in): 같은 검색 청크 + 비슷한 질문(cosine)이면 이전 Gemini 답변을 다시 스트리밍
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+    RESPONSE_CACHE_SIMILARITY: float = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95"))  # 질의 임베딩 cosine 임계값
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+    RESPONSE_CACHE_WITH_HISTORY: bool = os.getenv("RESPONSE_CACHE_WITH_HISTORY", "false").lower() == "true"  # 이전 대화가 있는 질문도 캐시
+    RESPONSE_CACHE_STREAM_CHARS: int = int(os.getenv("RESPONSE_CACHE_STREAM_CHARS", "64"))  # 캐시 답변을 보낼 때 청크 크기
+    
+    # 임베딩 마이크로 배칭 설정
+    EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+    # 길이 버킷별 배치 크기를 정할 때 사용하는 forward 1회당 메모리 예산
+    EMBEDDING_BATCH_MEMORY_MB: int = int(os.getenv("EMBEDDING_BATCH_MEMORY_MB", "512"))
+    
     # 로깅 설정
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
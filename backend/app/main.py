@@ -1,7 +1,13 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import notes, chat, auth
 from app.core.config import settings
+from app.services.embedding_service import get_embedding_service
+from app.services.model_registry import model_registry
+from app.services.vector_store import get_vector_store, upsert_stats
+from app.services.response_cache import get_response_cache
+from app.services.retrieval_cache import get_retrieval_cache
 import logging
 
 # 로깅 설정
@@ -24,7 +30,7 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.get_cors_origins(),
     allow_credentials=settings.allow_credentials,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
 )
 
@@ -45,6 +51,65 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.on_event("startup")
+def warmup_models():
+    # 모델 로드는 백그라운드에서 진행하고, 완료 전까지 /ready 로 트래픽을 막는다
+    # 임베딩 서버 모드에서는 워커가 모델을 로드하지 않는다
+    if settings.EMBEDDING_WARMUP and not settings.EMBEDDING_SERVER_ADDRESS:
+        model_registry.start_warmup([settings.EMBEDDING_MODEL_NAME])
+
+@app.on_event("startup")
+def prepare_vector_store():
+    # 컬렉션 설정을 미리 확인해 두면 첫 업서트에서 확인 요청이 생기지 않는다
+    # Qdrant 에 연결할 수 없으면 첫 사용 시 다시 시도한다
+    try:
+        get_vector_store().ensure_collection("notes")
+    except Exception as e:
+        logger.warning(f"Failed to prepare vector store collection: {e}")
+
+@app.on_event("shutdown")
+async def close_vector_store():
+    await get_vector_store().aclose()
+
+@app.get("/ready")
+def readiness_check():
+    """모델 warmup 이 끝나야 ready (로드 밸런서용)"""
+    state = model_registry.warmup_state
+    if not model_registry.is_ready():
+        return JSONResponse(status_code=503, content={"status": "not ready", "warmup": state})
+    return {"status": "ready", "warmup": state}
+
+@app.get("/metrics/embedding")
+def embedding_metrics():
+    """임베딩 마이크로 배칭/캐시 통계 및 모델 로드 정보"""
+    return {
+        "service": get_embedding_service().get_stats(),
+        "models": model_registry.get_stats(),
+    }
+
+@app.get("/metrics/ingest")
+def ingest_metrics():
+    """Qdrant 업서트 누적 통계 (points/sec 포함)"""
+    return {"upsert": upsert_stats.snapshot()}
+
+@app.get("/metrics/retrieval-cache")
+def retrieval_cache_metrics():
+    """사용자별 검색 결과 캐시 적중률과 메모리 사용량"""
+    return get_retrieval_cache().get_stats()
+
+@app.get("/metrics/response-cache")
+def response_cache_metrics():
+    """채팅 응답 캐시 적중률과 절약한 생성 시간"""
+    return get_response_cache().get_stats()
+
+@app.get("/metrics/vector-store")
+def vector_store_metrics():
+    """노트 컬렉션 포인트 수와 인덱스 상태"""
+    try:
+        return get_vector_store().get_collection_stats("notes")
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"collection": "notes", "error": str(e)})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -10,12 +10,18 @@ class ChatSession(Base):
     title = Column(String, index=True, default="새로운 챗")
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 최근 대화 창 밖으로 밀려난 오래된 메시지들의 누적 요약
+    summary = Column(Text, nullable=True)
+    summary_until_id = Column(Integer, nullable=True)  # 요약에 반영된 마지막 chat_messages.id
+    summary_updated_at = Column(DateTime(timezone=True), nullable=True)
 
     user = relationship("User", back_populates="chat_sessions")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    # 세션의 최근 메시지만 역순으로 읽기 위한 인덱스
+    __table_args__ = (Index("ix_chat_messages_session_id_id", "session_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("chat_sessions.id"), nullable=False)
@@ -1,14 +1,28 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Boolean, Column, Computed, Index, Integer, String, Text, DateTime, ForeignKey, JSON, false
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.db.base_class import Base
 
+# 검색용 tsvector (제목 가중치 A, 본문 앞 100,000자 가중치 B). 마이그레이션 3f9a1c2b7d41 과 같아야 한다.
+NOTE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', left(coalesce(content, ''), 100000)), 'B')"
+)
+
 class Note(Base):
     __tablename__ = "notes"
+    __table_args__ = (
+        Index("ix_notes_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_notes_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_notes_content_trgm", "content", postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     content = Column(Text, nullable=True)
+    # 스트리밍 적재에서 본문을 INGEST_CONTENT_MAX_CHARS 까지만 저장한 경우 True (벡터 청크는 파일 전체 기준)
+    content_truncated = Column(Boolean, nullable=False, default=False, server_default=false())
     category = Column(String, index=True, nullable=True)
     
     # Source information
@@ -25,6 +39,9 @@ class Note(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # DB 가 title/content 로 계산하는 검색 컬럼 (직접 쓰지 않음)
+    search_vector = deferred(Column(TSVECTOR, Computed(NOTE_SEARCH_VECTOR, persisted=True), nullable=True))
     
     user_id = Column(Integer, ForeignKey("users.id"))
     user = relationship("User", back_populates="notes")
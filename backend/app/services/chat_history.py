@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import re
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.chat import ChatMessage, ChatSession
+
+logger = logging.getLogger(__name__)
+
+# 역할 표시 등 메시지 하나에 붙는 고정 토큰 수 (추정치)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_WIDE_CHARS = re.compile("[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u9fff\uac00-\ud7af]")
+
+# 요약을 갱신 중인 세션 (같은 프로세스에서 중복 갱신 방지)
+_refreshing: Set[int] = set()
+
+
+def estimate_tokens(text: str) -> int:
+    """Gemini 토큰 수 추정 (한글/한자/가나는 글자당 1, 나머지는 4글자당 1 토큰)
+
+    API 호출 없이 예산을 맞추기 위한 값이라 실제보다 조금 크게 잡는다.
+    """
+    text = text or ""
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+def message_tokens(message: Dict) -> int:
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message["content"])
+
+
+def select_recent(messages: List[Dict], token_budget: int, max_messages: int) -> List[Dict]:
+    """최신순 메시지에서 토큰 예산과 최대 개수 안에 드는 최근 메시지를 골라 시간순으로 반환
+
+    예산을 넘는 메시지에서 멈추고, 창이 사용자 질문으로 시작하도록 맨 앞의 답변은 뺀다 (빠진 메시지는 요약 대상).
+    """
+    window = []
+    used = 0
+    for message in messages[:max_messages]:
+        cost = message_tokens(message)
+        if used + cost > token_budget:
+            break
+        window.append(message)
+        used += cost
+    window.reverse()
+    while window and window[0]["role"] != "user":
+        window.pop(0)
+    return window
+
+
+def _load_window(db: Session, chat_session: ChatSession) -> Dict:
+    """요약 이후 메시지 중 최근 창만 DB 에서 역순으로 읽고, 창 밖에 남은 (요약 대기) 메시지 수를 센다"""
+    after_id = chat_session.summary_until_id or 0
+    limit = max(1, settings.CHAT_HISTORY_MAX_TURNS * 2)
+    rows = (
+        db.query(ChatMessage.id, ChatMessage.role, ChatMessage.content)
+        .filter(ChatMessage.session_id == chat_session.id, ChatMessage.id > after_id)
+        .order_by(ChatMessage.id.desc())
+        .limit(limit)
+        .all()
+    )
+    tail = [{"id": row.id, "role": row.role, "content": row.content} for row in rows]
+    window = select_recent(tail, settings.CHAT_HISTORY_TOKEN_BUDGET, limit)
+
+    if len(window) == len(tail) and len(tail) < limit:
+        pending = 0
+    else:
+        boundary = window[0]["id"] if window else tail[0]["id"] + 1
+        pending = (
+            db.query(func.count(ChatMessage.id))
+            .filter(
+                ChatMessage.session_id == chat_session.id,
+                ChatMessage.id > after_id,
+                ChatMessage.id < boundary,
+            )
+            .scalar()
+        )
+    return {"window": window, "pending_messages": pending, "after_id": after_id}
+
+
+def load_history(db: Session, chat_session: ChatSession) -> Dict:
+    """Gemini 에 보낼 대화 기록: 최근 메시지(토큰 예산 안) + 오래된 대화의 누적 요약
+
+    반환값: {"messages": [{"role", "content"}], "summary", "pending_messages", "tokens"}
+    """
+    loaded = _load_window(db, chat_session)
+    messages = [{"role": m["role"], "content": m["content"]} for m in loaded["window"]]
+    return {
+        "messages": messages,
+        "summary": chat_session.summary,
+        "pending_messages": loaded["pending_messages"],
+        "tokens": sum(message_tokens(m) for m in messages),
+    }
+
+
+def needs_summary(history: Dict) -> bool:
+    return settings.CHAT_SUMMARY_ENABLED and history["pending_messages"] >= settings.CHAT_SUMMARY_MIN_MESSAGES
+
+
+def _pending_messages(session_id: int) -> Optional[Dict]:
+    """창 밖으로 밀려났지만 아직 요약되지 않은 메시지를 오래된 순으로 읽음"""
+    db = SessionLocal()
+    try:
+        chat_session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+        if not chat_session:
+            return None
+        loaded = _load_window(db, chat_session)
+        if loaded["pending_messages"] < settings.CHAT_SUMMARY_MIN_MESSAGES:
+            return None
+        query = db.query(ChatMessage.id, ChatMessage.role, ChatMessage.content).filter(
+            ChatMessage.session_id == session_id, ChatMessage.id > loaded["after_id"]
+        )
+        if loaded["window"]:
+            query = query.filter(ChatMessage.id < loaded["window"][0]["id"])
+        rows = query.order_by(ChatMessage.id.asc()).limit(settings.CHAT_SUMMARY_MAX_MESSAGES).all()
+        return {
+            "summary": chat_session.summary,
+            "after_id": loaded["after_id"],
+            "messages": [{"id": row.id, "role": row.role, "content": row.content} for row in rows],
+        }
+    finally:
+        db.close()
+
+
+def _save_summary(session_id: int, after_id: int, until_id: int, summary: str) -> bool:
+    """다른 요청이 먼저 갱신하지 않았을 때만 요약을 저장 (summary_until_id 로 낙관적 잠금)"""
+    db = SessionLocal()
+    try:
+        updated = (
+            db.query(ChatSession)
+            .filter(ChatSession.id == session_id, func.coalesce(ChatSession.summary_until_id, 0) == after_id)
+            .update(
+                {"summary": summary, "summary_until_id": until_id, "summary_updated_at": func.now()},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+async def refresh_summary(session_id: int, gemini_service) -> None:
+    """창 밖으로 밀려난 메시지를 세션 요약에 접어 넣음 (응답 전송 후 백그라운드에서 실행)
+
+    한 번에 CHAT_SUMMARY_MAX_MESSAGES 개까지만 접고, 남은 메시지는 다음 갱신에서 이어서 접는다.
+    """
+    if session_id in _refreshing:
+        return
+    _refreshing.add(session_id)
+    try:
+        pending = await asyncio.to_thread(_pending_messages, session_id)
+        if not pending or not pending["messages"]:
+            return
+        summary = await gemini_service.asummarize_history(pending["summary"], pending["messages"])
+        if not summary:
+            return
+        until_id = pending["messages"][-1]["id"]
+        saved = await asyncio.to_thread(_save_summary, session_id, pending["after_id"], until_id, summary)
+        logger.debug(f"Chat summary refreshed: session={session_id} folded={len(pending['messages'])} saved={saved}")
+    except Exception as e:
+        logger.warning(f"Chat summary refresh failed for session {session_id}: {e}")
+    finally:
+        _refreshing.discard(session_id)
@@ -0,0 +1,94 @@
+import time
+from typing import Dict, List, Tuple
+
+from app.core.config import settings
+from app.services.embedding_service import get_embedding_service
+from app.services.keyword_search import keyword_terms
+from app.services.retrieval_cache import get_retrieval_cache
+from app.services.vector_store import get_vector_store
+
+# 최근 턴을 붙일 때 직전 답변에서 가져오는 최대 글자 수
+_ASSISTANT_CONTEXT_CHARS = 300
+
+
+def build_query_variants(
+    message: str,
+    history: List[Dict],
+    history_turns: int = 2,
+    with_keywords: bool = True,
+) -> List[str]:
+    """검색 질의 변형 목록 (중복 제외, 원문이 항상 첫 번째)
+
+    - 원문 메시지
+    - 최근 사용자 질문과 직전 답변 앞부분을 붙인 메시지 ("그거 더 자세히" 같은 후속 질문용)
+    - 원문과 최근 질문에서 뽑은 키워드
+    """
+    variants = [message]
+    # 방금 저장한 현재 메시지가 기록 끝에 들어 있으면 제외
+    if history and history[-1]["role"] == "user" and history[-1]["content"] == message:
+        history = history[:-1]
+    recent_questions = [turn["content"] for turn in history if turn["role"] == "user"][-history_turns:] if history_turns > 0 else []
+    if history_turns > 0 and history:
+        context = list(recent_questions)
+        last = history[-1]
+        if last["role"] != "user":
+            context.append(last["content"][:_ASSISTANT_CONTEXT_CHARS])
+        if context:
+            variants.append("\n".join(context + [message]))
+    if with_keywords:
+        keywords = " ".join(keyword_terms(" ".join(recent_questions + [message])))
+        if keywords:
+            variants.append(keywords)
+
+    unique = []
+    for variant in variants:
+        if variant.strip() and variant not in unique:
+            unique.append(variant)
+    return unique
+
+
+def merge_hits(results: List[List[Dict]], top_k: int) -> List[Dict]:
+    """질의별 검색 결과를 합쳐 같은 청크는 최고 점수 하나만 남기고 점수순 top_k 반환
+
+    같은 문서 공간의 cosine 점수이므로 질의가 달라도 그대로 비교한다.
+    동점이면 앞쪽 질의(원문)의 결과가 먼저 온다.
+    """
+    best: Dict[tuple, Dict] = {}
+    for hits in results:
+        for hit in hits:
+            key = (hit["note_id"], hit["content"])
+            if key not in best or hit["score"] > best[key]["score"]:
+                best[key] = hit
+    return sorted(best.values(), key=lambda hit: hit["score"], reverse=True)[:top_k]
+
+
+async def retrieve_for_chat(
+    message: str,
+    history: List[Dict],
+    user_id: int,
+    top_k: int = 3,
+    collection_name: str = "notes",
+) -> Tuple[List[Dict], Dict]:
+    """질의 변형들을 한 배치로 임베딩하고 한 번의 배치 검색으로 찾아 합친 결과와 통계 반환"""
+    started = time.perf_counter()
+    variants = build_query_variants(
+        message,
+        history,
+        history_turns=settings.CHAT_QUERY_HISTORY_TURNS,
+        with_keywords=settings.CHAT_QUERY_KEYWORDS,
+    )
+    vectors = await get_embedding_service().aembed_queries(variants)
+    embedded = time.perf_counter()
+    # 컨텍스트 MMR 이 청크 벡터를 다시 임베딩하지 않도록 저장된 벡터를 함께 받는다
+    results = await get_retrieval_cache().asearch_batch(
+        get_vector_store(), collection_name, list(vectors), top_k, user_id=user_id, with_vectors=True
+    )
+    searched = time.perf_counter()
+    hits = merge_hits(results, top_k)
+    stats = {
+        "queries": len(variants),
+        "embed_ms": (embedded - started) * 1000,
+        "search_ms": (searched - embedded) * 1000,
+        "total_ms": (time.perf_counter() - started) * 1000,
+    }
+    return hits, stats
@@ -1,7 +1,7 @@
 from typing import List, Optional
 import google.generativeai as genai
 from app.core.config import settings
-from app.services.milvus_service import search_similar
+from app.services.vector_store import get_vector_store
 
 class ChatService:
     def __init__(self):
@@ -19,7 +19,7 @@ class ChatService:
         """쿼리와 관련된 문서 컨텍스트 검색"""
         # 쿼리를 벡터로 변환하는 로직 필요
         query_vector = self._get_embedding(query)
-        similar_docs = search_similar(
+        similar_docs = get_vector_store().search_similar(
             collection_name=collection_name,
             query_vector=query_vector,
             top_k=3
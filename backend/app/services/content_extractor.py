@@ -1,12 +1,15 @@
 import requests
 from bs4 import BeautifulSoup
-from typing import Optional
+from typing import Iterator, Optional
 import PyPDF2
 import docx
 import io
 import os
 from pathlib import Path
 
+# 텍스트 파일을 스트리밍으로 읽을 때 한 번에 읽는 글자 수
+READ_BLOCK_CHARS = 1024 * 1024
+
 class ContentExtractor:
     def extract_from_url(self, url: str) -> Optional[str]:
         """URL에서 텍스트 컨텐츠 추출"""
@@ -60,6 +63,45 @@ class ContentExtractor:
             print(f"Failed to extract content from file: {e}")
             return None
 
+    def iter_file_segments(self, file_path: str) -> Iterator[str]:
+        """파일 텍스트를 페이지/블록 단위로 지연 추출 (파일 전체를 메모리에 올리지 않음)
+
+        조각은 공백 위치에서 끊기므로 조각별 clean_text 결과를 공백으로 이으면 전체 clean_text 와 같다.
+        """
+        ext = Path(file_path).suffix.lower()
+
+        if ext in ['.txt', '.md', '.markdown']:
+            carry = ""
+            with open(file_path, 'r', encoding='utf-8') as f:
+                while True:
+                    block = f.read(READ_BLOCK_CHARS)
+                    if not block:
+                        break
+                    block = carry + block
+                    # 단어 중간에서 끊기지 않도록 마지막 공백 이후는 다음 블록으로 넘긴다
+                    cut = max(block.rfind(' '), block.rfind('\n'))
+                    if cut == -1:
+                        carry = block
+                        continue
+                    carry = block[cut + 1:]
+                    yield block[:cut + 1]
+            if carry:
+                yield carry
+
+        elif ext == '.pdf':
+            with open(file_path, 'rb') as f:
+                pdf_reader = PyPDF2.PdfReader(f)
+                for page in pdf_reader.pages:
+                    yield (page.extract_text() or '') + '\n'
+
+        elif ext in ['.doc', '.docx']:
+            doc = docx.Document(file_path)
+            for paragraph in doc.paragraphs:
+                yield paragraph.text + '\n'
+
+        else:
+            raise ValueError(f"Unsupported file type: {ext}")
+
     def clean_text(self, text: str) -> str:
         """텍스트 정제"""
         if not text:
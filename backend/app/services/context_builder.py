@@ -0,0 +1,180 @@
+import time
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.chat_history import estimate_tokens
+from app.services.embedding_service import get_embedding_service
+
+CONTEXT_SEPARATOR = "\n---\n"
+# 이보다 짧은 앞뒤 겹침은 우연의 일치로 보고 합치지 않는다
+MIN_OVERLAP_CHARS = 20
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def iter_mmr(
+    relevance: np.ndarray,
+    vectors: np.ndarray,
+    lambda_mult: float = 0.7,
+    duplicate_similarity: float = 0.95,
+) -> Iterator[int]:
+    """후보 위치를 MMR 순서로 하나씩 반환 (이미 고른 것과 cosine 이 duplicate_similarity 이상인 후보는 제외)
+
+    점수 = λ·관련도 - (1-λ)·고른 후보들과의 최대 유사도. 유사도 행렬은 한 번에 계산하고
+    고를 때마다 최대 유사도 벡터만 np.maximum 으로 갱신한다. 필요한 만큼만 꺼내 쓰면 된다.
+    """
+    n = len(relevance)
+    if n == 0:
+        return
+    unit = _unit_rows(np.asarray(vectors, dtype=np.float32))
+    similarity = unit @ unit.T
+    max_similarity = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    while available.any():
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        yield best
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+        available &= max_similarity < duplicate_similarity
+
+
+def overlap_length(left: str, right: str, max_chars: int) -> int:
+    """left 의 끝과 right 의 앞이 겹치는 가장 긴 길이 (MIN_OVERLAP_CHARS 미만이면 0)"""
+    for length in range(min(len(left), len(right), max_chars), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:length]):
+            return length
+    return 0
+
+
+def drop_contained(hits: List[Dict]) -> List[Dict]:
+    """같은 노트의 다른 청크 안에 통째로 들어 있는 청크와 같은 본문의 청크를 제거 (점수 높은 쪽 유지)"""
+    kept_by_note: Dict[int, List[Dict]] = {}
+    removed = set()
+    for hit in hits:
+        content = (hit.get("content") or "").strip()
+        same_note = kept_by_note.setdefault(hit["note_id"], [])
+        if not content or any(content in other["content"] for other in same_note):
+            removed.add(id(hit))
+            continue
+        for other in same_note:
+            if other["content"].strip() in content:
+                removed.add(id(other))
+        same_note[:] = [other for other in same_note if id(other) not in removed]
+        same_note.append(hit)
+    return [hit for hit in hits if id(hit) not in removed]
+
+
+def merge_passages(hits: List[Dict], max_overlap: int) -> List[str]:
+    """고른 청크를 노트별로 모으고, 청크 겹침(CHUNK_OVERLAP)으로 이어지는 청크는 겹친 부분 없이 합침
+
+    노트 순서는 선택 순서를 따르고, 노트 안에서는 chunk_index 순서로 정렬해 바로 앞 조각과만 비교한다
+    (chunk_index 가 없는 청크는 선택 순서대로 뒤에 붙인다).
+    """
+    by_note: Dict[int, List[Dict]] = {}
+    for hit in hits:
+        by_note.setdefault(hit["note_id"], []).append(hit)
+
+    passages = []
+    for note_hits in by_note.values():
+        ordered = sorted(note_hits, key=lambda hit: (hit.get("chunk_index") is None, hit.get("chunk_index") or 0))
+        pieces = [ordered[0]["content"]]
+        for hit in ordered[1:]:
+            length = overlap_length(pieces[-1], hit["content"], max_overlap)
+            if length:
+                pieces[-1] += hit["content"][length:]
+            else:
+                pieces.append(hit["content"])
+        passages.extend(pieces)
+    return passages
+
+
+def pack_context(
+    hits: List[Dict],
+    vectors: np.ndarray,
+    token_budget: int,
+    max_chunks: int,
+    lambda_mult: float = 0.7,
+    duplicate_similarity: float = 0.95,
+    max_overlap: int = 100,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> Tuple[str, List[Dict], Dict]:
+    """후보 청크에서 중복을 빼고 MMR 순서로 토큰 예산에 맞게 채운 컨텍스트 문자열, 고른 청크, 통계 반환
+
+    vectors 는 hits 와 같은 순서의 청크 벡터다. 예산을 넘는 청크는 건너뛰고 다음 후보로 채운다.
+    count_tokens 는 토큰 수를 세는 함수다 (기본값은 글자 수 기반 추정).
+    """
+    candidates = drop_contained(hits)
+    positions = {id(hit): i for i, hit in enumerate(hits)}
+    candidate_vectors = np.asarray(vectors, dtype=np.float32)[[positions[id(hit)] for hit in candidates]]
+    relevance = np.array([hit["score"] for hit in candidates], dtype=np.float32)
+
+    selected: List[Dict] = []
+    used = 0
+    for i in iter_mmr(relevance, candidate_vectors, lambda_mult, duplicate_similarity):
+        if len(selected) >= max_chunks or used >= token_budget:
+            break
+        cost = count_tokens(candidates[i]["content"])
+        if used + cost > token_budget:
+            continue
+        selected.append(candidates[i])
+        used += cost
+
+    passages = merge_passages(selected, max_overlap)
+    context = CONTEXT_SEPARATOR.join(passages)
+    stats = {
+        "candidates": len(hits),
+        "after_dedup": len(candidates),
+        "selected": len(selected),
+        "passages": len(passages),
+        "tokens": count_tokens(context),
+    }
+    return context, selected, stats
+
+
+async def hit_vectors(hits: List[Dict]) -> Tuple[np.ndarray, int]:
+    """검색 결과에 담긴 저장 벡터 (with_vectors 검색) 행렬과 다시 임베딩한 청크 수
+
+    벡터가 없는 결과만 임베딩한다 (임베딩 캐시에 없으면 모델을 다시 돌림).
+    """
+    if not hits:
+        return np.zeros((0, settings.EMBEDDING_DIM), dtype=np.float32), 0
+    missing = [i for i, hit in enumerate(hits) if hit.get("vector") is None]
+    embedded = await get_embedding_service().aget_embeddings([hits[i]["content"] for i in missing]) if missing else []
+    vectors = [hit.get("vector") for hit in hits]
+    for i, vector in zip(missing, embedded):
+        vectors[i] = vector
+    return np.stack([np.asarray(vector, dtype=np.float32) for vector in vectors]), len(missing)
+
+
+async def build_chat_context(hits: List[Dict]) -> Tuple[str, List[Dict], Dict]:
+    """채팅 검색 후보로 Gemini 컨텍스트를 만든다 (청크 벡터는 검색 결과에 담긴 저장 벡터를 씀)
+
+    토큰 예산은 이미 로드된 임베딩 모델의 토크나이저로 센다. 임베딩 서버 모드처럼 프로세스에
+    토크나이저가 없으면 estimate_tokens 추정치를 쓴다. 어느 쪽이든 Gemini 토크나이저와 정확히 같지는 않다.
+    """
+    started = time.perf_counter()
+    vectors, reembedded = await hit_vectors(hits)
+    count_tokens = get_embedding_service().token_counter()
+    embedded = time.perf_counter()
+    context, selected, stats = pack_context(
+        hits,
+        vectors,
+        token_budget=settings.CHAT_CONTEXT_TOKEN_BUDGET,
+        max_chunks=settings.CHAT_CONTEXT_MAX_CHUNKS,
+        lambda_mult=settings.CHAT_CONTEXT_MMR_LAMBDA,
+        duplicate_similarity=settings.CHAT_CONTEXT_DUPLICATE_SIMILARITY,
+        max_overlap=settings.CHUNK_OVERLAP * 2,
+        count_tokens=count_tokens or estimate_tokens,
+    )
+    stats["tokenizer"] = "model" if count_tokens else "estimate"
+    stats["vectors_ms"] = (embedded - started) * 1000
+    stats["reembedded"] = reembedded
+    stats["select_ms"] = (time.perf_counter() - embedded) * 1000
+    return context, selected, stats
@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ONNX_CONFIG_FILE = "embedding_config.json"
+
+
+class TorchBackend:
+    """sentence-transformers (PyTorch fp32) 추론 백엔드"""
+
+    name = "torch"
+    # SentenceTransformer.encode 는 글자 수 내림차순으로 정렬한 뒤 batch_size 씩 나눈다
+    length_sorted_encode = True
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.model.eval()
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.model.max_seq_length
+
+    def parameters(self):
+        return self.model.parameters()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def tokenize(self, texts: List[str]) -> Dict[str, list]:
+        """패딩 없이 토큰화 (SentenceTransformer.tokenize 와 같은 전처리: 앞뒤 공백 제거, 소문자화 옵션)"""
+        texts = [text.strip() for text in texts]
+        if getattr(self.model[0], "do_lower_case", False):
+            texts = [text.lower() for text in texts]
+        return self.tokenizer(texts, truncation=True, max_length=self.max_seq_length)
+
+    def encode_tokens(self, features: Dict[str, list]) -> np.ndarray:
+        """tokenize 결과의 한 배치를 패딩해서 임베딩 (다시 토큰화하지 않음)"""
+        import torch
+        batch = self.tokenizer.pad(features, padding=True, return_tensors="pt")
+        batch = {key: value.to(self.model.device) for key, value in batch.items()}
+        with torch.inference_mode():
+            embeddings = self.model(batch)["sentence_embedding"]
+        return embeddings.float().cpu().numpy()
+
+
+class OnnxBackend:
+    """ONNX Runtime CPU 추론 백엔드 (scripts/export_onnx.py 로 내보낸 모델 사용)
+
+    풀링 방식, 정규화 여부, 최대 길이는 내보내기 시 저장한 embedding_config.json 을 따른다.
+    """
+
+    name = "onnx"
+    length_sorted_encode = False
+
+    def __init__(self, model_dir: str, file_name: str = "model.onnx", threads: int = 0):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError("ONNX backend requires onnxruntime and transformers") from e
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE), "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.pooling = config.get("pooling", "cls")
+        self.normalize = config.get("normalize", True)
+        self.max_seq_length = config.get("max_seq_length", 512)
+        self.name = f"onnx:{file_name}"
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, file_name),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            outputs.append(self._run(encoded))
+        if not outputs:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(outputs).astype(np.float32, copy=False)
+
+    def tokenize(self, texts: List[str]) -> Dict[str, list]:
+        return self.tokenizer(texts, truncation=True, max_length=self.max_seq_length)
+
+    def encode_tokens(self, features: Dict[str, list]) -> np.ndarray:
+        encoded = self.tokenizer.pad(features, padding=True, return_tensors="np")
+        return self._run(encoded).astype(np.float32, copy=False)
+
+    def _run(self, encoded) -> np.ndarray:
+        feeds = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        return self._pool(hidden, encoded["attention_mask"])
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "mean":
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        else:
+            pooled = hidden[:, 0]
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+
+class LengthBucketScheduler:
+    """토큰 길이 기준으로 입력을 정렬/버킷팅해서 패딩 연산을 줄이는 배치 스케줄러
+
+    길이가 비슷한 입력끼리 묶고, 버킷의 최대 길이에 맞춰 메모리 예산 안에서 배치 크기를
+    정한 뒤 원래 순서로 결과를 되돌린다. 백엔드가 tokenize/encode_tokens 를 제공하면
+    버킷팅에 쓴 토큰을 그대로 모델에 넘겨서 한 번만 토큰화한다.
+
+    실제 토큰 수와 패딩 포함 토큰 수를 집계하고, 같은 입력을 백엔드 encode 에
+    baseline_batch_size 로 넘겼을 때의 패딩 토큰 수(기준값)와 비교한다.
+    """
+
+    def __init__(self, memory_budget_mb: int = 512, max_batch_size: int = 128, baseline_batch_size: int = 32):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.max_batch_size = max(1, max_batch_size)
+        self.baseline_batch_size = baseline_batch_size
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.baseline_padded_tokens = 0
+
+    def encode(self, backend, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        features = self._tokenize(backend, texts)
+        if features is not None:
+            lengths = np.array([len(ids) for ids in features["input_ids"]], dtype=np.int64)
+        else:
+            lengths = self._token_lengths(backend, texts)
+        order = np.argsort(lengths, kind="stable")
+        hidden_size, num_heads = _model_dims(backend)
+
+        result = None
+        batches = 0
+        padded = 0
+        start = 0
+        while start < len(texts):
+            end = start + 1
+            # 정렬되어 있으므로 배치의 마지막 원소가 패딩 길이를 결정한다
+            while (
+                end < len(texts)
+                and end - start < self.max_batch_size
+                and self._batch_bytes(end - start + 1, int(lengths[order[end]]), hidden_size, num_heads) <= self.memory_budget
+            ):
+                end += 1
+            indices = order[start:end]
+            if features is not None:
+                vectors = backend.encode_tokens({key: [values[i] for i in indices] for key, values in features.items()})
+            else:
+                vectors = backend.encode([texts[i] for i in indices], batch_size=len(indices))
+            if result is None:
+                result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[indices] = vectors
+            batches += 1
+            padded += len(indices) * int(lengths[indices[-1]])
+            start = end
+
+        baseline = self._baseline_padded_tokens(backend, texts, lengths)
+        with self._lock:
+            self.batches += batches
+            self.real_tokens += int(lengths.sum())
+            self.padded_tokens += padded
+            self.baseline_padded_tokens += baseline
+        return result
+
+    def get_stats(self) -> Dict:
+        """실제/패딩 토큰 수와 백엔드 encode 의 자체 배치 대비 절감량"""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "real_tokens": self.real_tokens,
+                "padded_tokens": self.padded_tokens,
+                "padding_ratio": (1 - self.real_tokens / self.padded_tokens) if self.padded_tokens else 0.0,
+                "baseline_padded_tokens": self.baseline_padded_tokens,
+                "saved_tokens": self.baseline_padded_tokens - self.padded_tokens,
+            }
+
+    def _baseline_padded_tokens(self, backend, texts: List[str], lengths: np.ndarray) -> int:
+        """backend.encode(texts, batch_size=baseline_batch_size) 였다면 계산했을 패딩 포함 토큰 수
+
+        SentenceTransformer.encode 는 글자 수 내림차순으로 정렬해서 배치를 나누므로 같은 순서로 계산한다.
+        """
+        if getattr(backend, "length_sorted_encode", False):
+            order = np.argsort([-len(text) for text in texts], kind="stable")
+            lengths = lengths[order]
+        size = self.baseline_batch_size
+        return sum(
+            len(lengths[i:i + size]) * int(lengths[i:i + size].max())
+            for i in range(0, len(lengths), size)
+        )
+
+    @staticmethod
+    def _tokenize(backend, texts: List[str]) -> Optional[Dict[str, list]]:
+        if not hasattr(backend, "tokenize") or not hasattr(backend, "encode_tokens"):
+            return None
+        return backend.tokenize(texts)
+
+    def _token_lengths(self, backend, texts: List[str]) -> np.ndarray:
+        tokenizer = getattr(backend, "tokenizer", None)
+        if tokenizer is None:
+            return np.array([len(text) for text in texts], dtype=np.int64)
+        encoded = tokenizer(
+            texts,
+            truncation=True,
+            max_length=backend.max_seq_length,
+            add_special_tokens=True,
+        )
+        return np.array([len(ids) for ids in encoded["input_ids"]], dtype=np.int64)
+
+    @staticmethod
+    def _batch_bytes(batch_size: int, seq_len: int, hidden_size: int, num_heads: int) -> int:
+        # 레이어당 활성값(은닉/FFN 중간값 약 8배) + 어텐션 점수 행렬 (fp32)
+        activations = batch_size * seq_len * hidden_size * 8 * 4
+        attention = batch_size * num_heads * seq_len * seq_len * 4
+        return activations + attention
+
+
+def _model_dims(backend) -> tuple[int, int]:
+    """백엔드의 hidden size, attention head 수 (알 수 없으면 KURE-v1 기준값)"""
+    try:
+        config = backend.model[0].auto_model.config
+        return config.hidden_size, config.num_attention_heads
+    except Exception:
+        return 1024, 16
+
+
+def onnx_file_name() -> str:
+    return "model_int8.onnx" if settings.EMBEDDING_ONNX_INT8 else "model.onnx"
+
+
+def backend_signature(backend: Optional[str] = None) -> str:
+    """설정된 추론 백엔드, ONNX 파일, 양자화를 나타내는 문자열 (임베딩 캐시 키에 사용)
+
+    같은 모델이라도 백엔드/양자화가 다르면 벡터가 조금씩 달라지므로 캐시를 섞지 않는다.
+    """
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "onnx":
+        quantization = "int8" if settings.EMBEDDING_ONNX_INT8 else "fp32"
+        return f"onnx:{onnx_file_name()}:{quantization}"
+    return "torch:fp32"
+
+
+def load_embedding_backend(model_name: str, backend: Optional[str] = None):
+    """설정(EMBEDDING_BACKEND)에 따라 추론 백엔드 생성"""
+    backend = backend or settings.EMBEDDING_BACKEND
+    if backend == "onnx":
+        return OnnxBackend(
+            settings.EMBEDDING_ONNX_DIR,
+            file_name=onnx_file_name(),
+            threads=settings.EMBEDDING_ONNX_THREADS,
+        )
+    if backend != "torch":
+        logger.warning(f"Unknown embedding backend {backend}, using torch.")
+    return TorchBackend(model_name)
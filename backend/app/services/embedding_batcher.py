@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingRequest:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingBatcher:
+    """여러 요청의 텍스트를 모아 한 번의 encode 호출로 처리하는 마이크로 배칭 디스패처
+
+    첫 요청이 도착한 뒤 max_wait_ms 동안(또는 max_batch_size 개가 찰 때까지) 텍스트를 모아
+    encode_fn 을 한 번 호출하고, 결과를 각 요청의 Future 로 나눠 돌려준다.
+    스레드풀에서 호출되는 동기 엔드포인트와 async 엔드포인트 모두에서 사용할 수 있다.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Sequence],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        stats_window: int = 1000,
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # 튜닝용 통계
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._texts = 0
+        self._requests = 0
+        self._wait_ms: deque = deque(maxlen=stats_window)
+        self._encode_ms: deque = deque(maxlen=stats_window)
+        self._batch_sizes: deque = deque(maxlen=stats_window)
+
+    def submit(self, texts: List[str]) -> Future:
+        """텍스트 리스트를 큐에 넣고 임베딩 결과를 받을 Future 반환"""
+        request = _PendingRequest(list(texts))
+        if not request.texts:
+            request.future.set_result([])
+            return request.future
+
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def embed_sync(self, texts: List[str]):
+        """동기 호출자를 위한 블로킹 인터페이스"""
+        return self.submit(texts).result()
+
+    async def embed(self, texts: List[str]):
+        """async 호출자를 위한 awaitable 인터페이스"""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def get_stats(self) -> Dict:
+        """큐 깊이, 배치 크기, 대기 시간 통계 반환"""
+        with self._stats_lock:
+            batch_sizes = list(self._batch_sizes)
+            wait_ms = sorted(self._wait_ms)
+            encode_ms = sorted(self._encode_ms)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "requests": self._requests,
+                "texts": self._texts,
+                "avg_batch_size": (sum(batch_sizes) / len(batch_sizes)) if batch_sizes else 0.0,
+                "last_batch_size": batch_sizes[-1] if batch_sizes else 0,
+                "wait_ms_p50": _percentile(wait_ms, 50),
+                "wait_ms_p99": _percentile(wait_ms, 99),
+                "encode_ms_p50": _percentile(encode_ms, 50),
+                "encode_ms_p99": _percentile(encode_ms, 99),
+            }
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self) -> List[_PendingRequest]:
+        """첫 요청 기준으로 flush 윈도우가 끝나거나 배치가 찰 때까지 요청 수집"""
+        first = self._queue.get()
+        batch = [first]
+        total = len(first.texts)
+        deadline = first.enqueued_at + self.max_wait
+
+        while total < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    request = self._queue.get_nowait()
+                else:
+                    request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            total += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+            texts = [text for request in batch for text in request.texts]
+
+            try:
+                embeddings = self.encode_fn(texts)
+            except Exception as e:
+                logger.error(f"Batched embedding failed: {e}")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            finished = time.perf_counter()
+            offset = 0
+            for request in batch:
+                n = len(request.texts)
+                if not request.future.done():
+                    request.future.set_result(embeddings[offset:offset + n])
+                offset += n
+
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._texts += len(texts)
+                self._batch_sizes.append(len(texts))
+                self._encode_ms.append((finished - started) * 1000.0)
+                for request in batch:
+                    self._wait_ms.append((started - request.enqueued_at) * 1000.0)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,289 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import portalocker
+
+logger = logging.getLogger(__name__)
+
+KEY_BYTES = 32  # sha256 digest
+LOCK_FILE = "cache.lock"
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 생성을 위한 텍스트 정규화 (NFC + 공백 정리)"""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class _DiskTier:
+    """memory-mapped float32 행렬 + 슬롯별 키 다이제스트로 구성된 영구 저장소
+
+    - vectors.f32 : (capacity, dim) float32 행렬
+    - keys.u8     : (capacity, 32) 슬롯별 sha256 다이제스트. 인덱스는 시작 시 여기서 재구성한다.
+    - ticks.i64   : (capacity,) 마지막 접근 순번. 재시작 후에도 LRU 순서를 복원하기 위해 사용한다.
+    - meta.json   : 모델명, 추론 백엔드, 차원, 용량
+
+    같은 경로를 여러 워커 프로세스가 함께 쓰므로 슬롯 할당과 쓰기는 파일 잠금(cache.lock) 안에서 한다.
+    키 인덱스와 빈 슬롯 목록은 프로세스마다 따로 가지므로, 슬롯을 쓰기 전과 읽은 뒤에 디스크의 키를 다시 확인한다.
+    """
+
+    def __init__(self, path: str, model_name: str, backend: str, dim: int, max_bytes: int):
+        self.path = path
+        self.dim = dim
+        row_bytes = dim * 4 + KEY_BYTES + 8
+        self.capacity = max(1, max_bytes // row_bytes)
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, LOCK_FILE), "a+")
+        with self.locked(exclusive=True):
+            self._load(model_name, backend)
+        self.evictions = 0
+
+    def _load(self, model_name: str, backend: str):
+        meta_path = os.path.join(self.path, "meta.json")
+        meta = {"model": model_name, "backend": backend, "dim": self.dim, "capacity": self.capacity}
+        mode = "r+"
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                if json.load(f) != meta:
+                    logger.info("Embedding cache layout changed. Rebuilding disk tier.")
+                    mode = "w+"
+        except (OSError, ValueError):
+            mode = "w+"
+
+        self.vectors = self._open("vectors.f32", np.float32, (self.capacity, self.dim), mode)
+        self.keys = self._open("keys.u8", np.uint8, (self.capacity, KEY_BYTES), mode)
+        self.ticks = self._open("ticks.i64", np.int64, (self.capacity,), mode)
+
+        if mode == "w+":
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+
+        # 키 인덱스 재구성 (접근 순번이 오래된 것부터)
+        used = np.flatnonzero(self.keys.any(axis=1))
+        order = used[np.argsort(self.ticks[used], kind="stable")]
+        self.index: "OrderedDict[bytes, int]" = OrderedDict(
+            (self.keys[slot].tobytes(), int(slot)) for slot in order
+        )
+        self.tick = int(self.ticks.max()) if len(used) else 0
+        self.free_slots = sorted(set(range(self.capacity)) - set(self.index.values()), reverse=True)
+
+    @contextmanager
+    def locked(self, exclusive: bool):
+        """프로세스 간 파일 잠금 (같은 프로세스 안에서는 EmbeddingCache._lock 으로 직렬화된다)"""
+        portalocker.lock(self._lock_file, portalocker.LOCK_EX if exclusive else portalocker.LOCK_SH)
+        try:
+            yield
+        finally:
+            portalocker.unlock(self._lock_file)
+
+    def _open(self, name: str, dtype, shape, mode: str) -> np.memmap:
+        file_path = os.path.join(self.path, name)
+        if mode == "r+" and not os.path.exists(file_path):
+            mode = "w+"
+        return np.memmap(file_path, dtype=dtype, mode=mode, shape=shape)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """locked(exclusive=False) 안에서 호출"""
+        slot = self.index.get(key)
+        if slot is None:
+            return None
+        vector = np.array(self.vectors[slot])
+        # 다른 프로세스가 슬롯을 가져갔거나 비정상 종료로 덮어써진 경우 방어
+        if self.keys[slot].tobytes() != key:
+            del self.index[key]
+            return None
+        self.index.move_to_end(key)
+        self.tick += 1
+        self.ticks[slot] = self.tick
+        return vector
+
+    def put(self, key: bytes, vector: np.ndarray):
+        """locked(exclusive=True) 안에서 호출"""
+        slot = self.index.get(key)
+        if slot is not None and self.keys[slot].tobytes() != key:
+            del self.index[key]
+            slot = None
+        if slot is None:
+            slot = self._claim_slot()
+            self.index[key] = slot
+        else:
+            self.index.move_to_end(key)
+        self.tick += 1
+        self.vectors[slot] = vector
+        self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+        self.ticks[slot] = self.tick
+
+    def _claim_slot(self) -> int:
+        while self.free_slots:
+            slot = self.free_slots.pop()
+            taken = self.keys[slot]
+            if not taken.any():
+                return slot
+            # 다른 프로세스가 이미 쓴 슬롯: 인덱스에 가장 오래된 항목으로 넣어 두고 다음 빈 슬롯을 찾는다
+            self.index[taken.tobytes()] = slot
+            self.index.move_to_end(taken.tobytes(), last=False)
+        _, slot = self.index.popitem(last=False)
+        self.evictions += 1
+        return slot
+
+    def flush(self):
+        self.vectors.flush()
+        self.keys.flush()
+        self.ticks.flush()
+
+
+class EmbeddingCache:
+    """청크 임베딩 캐시 (메모리 LRU + 디스크 영구 저장소)
+
+    키는 모델명, 추론 백엔드(backend_signature: 백엔드, ONNX 파일, 양자화)와 정규화된 텍스트의 sha256 이다. 메모리 LRU 에서 먼저 찾고,
+    없으면 디스크 계층에서 찾아 메모리로 올린다. 두 계층 모두 크기 기준으로 LRU 제거한다.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "torch:fp32",
+        cache_dir: Optional[str] = None,
+        memory_items: int = 10000,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        flush_every: int = 256,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.memory_items = max(0, memory_items)
+        self.disk_max_bytes = disk_max_bytes
+        self.flush_every = max(1, flush_every)
+
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._disk: Optional[_DiskTier] = None
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+
+        if cache_dir:
+            self._open_existing_disk_tier()
+            atexit.register(self.flush)
+
+    def make_key(self, text: str) -> bytes:
+        """모델명 + 추론 백엔드 + 정규화 텍스트 기반 캐시 키"""
+        payload = f"{self.model_name}\0{self.backend}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).digest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """텍스트별 캐시된 벡터 반환 (없으면 None)"""
+        keys = [self.make_key(text) for text in texts]
+        results: List[Optional[np.ndarray]] = []
+        with self._lock, self._disk_locked(exclusive=False):
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                elif self._disk is not None and (vector := self._disk.get(key)) is not None:
+                    self.disk_hits += 1
+                    self._remember(key, vector)
+                else:
+                    self.misses += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """새로 계산한 벡터를 두 계층에 저장"""
+        with self._lock:
+            rows = []
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(text)
+                # 배치 행렬의 뷰가 아니라 행 단위 사본을 보관해서 배치 전체가 메모리에 남지 않게 한다
+                vector = np.array(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector))
+            if self.cache_dir and rows and self._disk is None:
+                self._disk = self._open_disk_tier(rows[0][1].shape[0])
+            if self._disk is not None:
+                with self._disk.locked(exclusive=True):
+                    for key, vector in rows:
+                        if self._disk.dim == vector.shape[0]:
+                            self._disk.put(key, vector)
+                            self._pending_writes += 1
+            if self._pending_writes >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        """디스크 계층을 파일에 반영"""
+        with self._lock:
+            self._flush_locked()
+
+    def get_stats(self) -> Dict:
+        """적중/미스 카운터와 계층별 크기 반환"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "model": self.model_name,
+                "backend": self.backend,
+                "memory_items": len(self._memory),
+                "memory_capacity": self.memory_items,
+                "disk_items": len(self._disk.index) if self._disk else 0,
+                "disk_capacity": self._disk.capacity if self._disk else 0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (hits / lookups) if lookups else 0.0,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self._disk.evictions if self._disk else 0,
+            }
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        if self.memory_items == 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def _disk_locked(self, exclusive: bool):
+        return self._disk.locked(exclusive) if self._disk is not None else nullcontext()
+
+    def _flush_locked(self):
+        if self._disk is not None:
+            self._disk.flush()
+        self._pending_writes = 0
+
+    def _disk_path(self) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", self.model_name)
+        return os.path.join(self.cache_dir, safe_name)
+
+    def _open_existing_disk_tier(self):
+        meta_path = os.path.join(self._disk_path(), "meta.json")
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                dim = int(json.load(f)["dim"])
+        except (OSError, ValueError, KeyError):
+            return
+        self._disk = self._open_disk_tier(dim)
+
+    def _open_disk_tier(self, dim: int) -> Optional[_DiskTier]:
+        try:
+            return _DiskTier(self._disk_path(), self.model_name, self.backend, dim, self.disk_max_bytes)
+        except Exception as e:
+            logger.error(f"Failed to open embedding disk cache: {e}")
+            self.cache_dir = None
+            return None
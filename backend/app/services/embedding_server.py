@@ -0,0 +1,193 @@
+"""임베딩 서버 프로세스
+
+하나의 로컬 프로세스가 임베딩 모델을 소유하고 Unix 소켓(또는 localhost TCP)으로
+임베딩 요청을 받아 배치 처리한다. 여러 uvicorn 워커가 모델 한 벌과 CPU 스레드를 공유한다.
+
+    python -m app.services.embedding_server --address unix:/tmp/vector_note_embedding.sock
+
+프레임 형식: 4바이트 big-endian 헤더 길이 + JSON 헤더 + (응답의 경우) float32 행렬 바이트
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_HEADER_LEN = struct.Struct(">I")
+
+
+def parse_address(address: str) -> Tuple[str, object]:
+    """'unix:/path' 또는 'tcp:host:port' 형식의 주소 파싱"""
+    scheme, _, rest = address.partition(":")
+    if scheme == "unix" and rest:
+        return "unix", rest
+    if scheme == "tcp" and rest:
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(f"Invalid embedding server address: {address}")
+
+
+def _encode_frame(header: Dict, payload: bytes = b"") -> bytes:
+    header = dict(header, payload_bytes=len(payload))
+    raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    return _HEADER_LEN.pack(len(raw)) + raw + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("Embedding server closed the connection")
+        received += n
+    return bytes(buf)
+
+
+class EmbeddingServerClient:
+    """임베딩 서버용 동기 클라이언트 (스레드별 연결 유지)"""
+
+    def __init__(self, address: str, timeout: float = 30.0):
+        self.address = address
+        self.family, self.target = parse_address(address)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """텍스트 리스트를 서버에서 임베딩. 연결 실패 시 OSError"""
+        frame = _encode_frame({"op": "encode", "texts": list(texts)})
+        try:
+            return self._request(frame)
+        except OSError:
+            # 서버 재시작 등으로 끊긴 연결은 한 번 다시 연결해서 재시도
+            self.close()
+            return self._request(frame)
+
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            finally:
+                self._local.sock = None
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            if self.family == "unix":
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            else:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.target)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _request(self, frame: bytes) -> np.ndarray:
+        sock = self._connection()
+        sock.sendall(frame)
+        header_len = _HEADER_LEN.unpack(_recv_exact(sock, _HEADER_LEN.size))[0]
+        header = json.loads(_recv_exact(sock, header_len))
+        payload = _recv_exact(sock, header["payload_bytes"]) if header["payload_bytes"] else b""
+        if not header.get("ok"):
+            raise RuntimeError(f"Embedding server error: {header.get('error')}")
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["n"], header["dim"])
+
+
+class EmbeddingServer:
+    """모델을 소유하고 여러 연결의 요청을 EmbeddingBatcher 로 묶어 처리하는 서버"""
+
+    def __init__(self, address: str, batcher):
+        self.address = address
+        self.family, self.target = parse_address(address)
+        self.batcher = batcher
+
+    async def serve_forever(self):
+        if self.family == "unix":
+            if os.path.exists(self.target):
+                os.remove(self.target)
+            server = await asyncio.start_unix_server(self._handle, path=self.target)
+        else:
+            host, port = self.target
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        logger.info(f"Embedding server listening on {self.address}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    raw_len = await reader.readexactly(_HEADER_LEN.size)
+                except asyncio.IncompleteReadError:
+                    break
+                header = json.loads(await reader.readexactly(_HEADER_LEN.unpack(raw_len)[0]))
+                if header.get("payload_bytes"):
+                    await reader.readexactly(header["payload_bytes"])
+
+                try:
+                    embeddings = np.ascontiguousarray(
+                        await self.batcher.embed(header.get("texts", [])), dtype=np.float32
+                    )
+                    n, dim = embeddings.shape if embeddings.ndim == 2 else (0, 0)
+                    writer.write(_encode_frame({"ok": True, "n": n, "dim": dim}, embeddings.tobytes()))
+                except Exception as e:
+                    logger.error(f"Embedding request failed: {e}")
+                    writer.write(_encode_frame({"ok": False, "error": str(e)}))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.core.config import settings
+    from app.services.embedding_backends import LengthBucketScheduler
+    from app.services.embedding_batcher import EmbeddingBatcher
+    from app.services.model_registry import model_registry
+
+    parser = argparse.ArgumentParser(description="Vector Note embedding server")
+    parser.add_argument("--address", default=settings.EMBEDDING_SERVER_ADDRESS or "unix:/tmp/vector_note_embedding.sock")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME)
+    parser.add_argument("--threads", type=int, default=settings.EMBEDDING_SERVER_THREADS,
+                        help="torch 연산 스레드 수 (0 이면 기본값)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL),
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    if not model_registry.warmup([args.model]):
+        raise SystemExit(f"Failed to load embedding model {args.model}")
+    model = model_registry.get(args.model)
+
+    scheduler = LengthBucketScheduler(
+        memory_budget_mb=settings.EMBEDDING_BATCH_MEMORY_MB,
+        max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+    )
+    batcher = EmbeddingBatcher(
+        lambda texts: scheduler.encode(model, texts),
+        max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+    )
+    asyncio.run(EmbeddingServer(args.address, batcher).serve_forever())
+
+
+if __name__ == "__main__":
+    main()
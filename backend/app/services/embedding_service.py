@@ -1,42 +1,289 @@
-from sentence_transformers import SentenceTransformer
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List
+from cachetools import TTLCache
+from typing import Callable, Iterator, List, Optional
 import logging
+import threading
+import time
 import numpy as np
+from app.core.config import settings
+from app.services.embedding_backends import LengthBucketScheduler, backend_signature
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import EmbeddingCache, normalize_text
+from app.services.embedding_server import EmbeddingServerClient
+from app.services.model_registry import model_registry
+from app.services.text_chunker import Chunk, TextChunker
 
 logger = logging.getLogger(__name__)
 
 class EmbeddingService:
     def __init__(self):
-        try:
-            # 한국어 특화 모델 로드
-            self.model = SentenceTransformer('nlpai-lab/KURE-v1')
-            self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-            logger.info("Embedding model loaded successfully.")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            logger.warning("EmbeddingService will be disabled.")
-            self.model = None
-            self.text_splitter = None
-
-    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """텍스트 리스트를 임베딩 벡터로 변환"""
-        if not self.model:
-            logger.warning("Embedding model not available. Returning empty embeddings.")
-            return [[0.0] * 768 for _ in texts]
-        
-        embeddings = self.model.encode(texts, convert_to_tensor=False)
-        return embeddings.tolist() if isinstance(embeddings, np.ndarray) else embeddings
+        # 한국어 특화 모델은 레지스트리에서 공유 (처음 사용할 때 또는 warmup 시 로드)
+        self.model_name = settings.EMBEDDING_MODEL_NAME
+        self._chunker = None
+
+        # 임베딩 서버 모드: 모델은 별도 프로세스가 소유하고, 연결 실패 시 프로세스 내 모델로 대체
+        self.remote = None
+        self._remote_retry_at = 0.0
+        if settings.EMBEDDING_SERVER_ADDRESS:
+            self.remote = EmbeddingServerClient(
+                settings.EMBEDDING_SERVER_ADDRESS,
+                timeout=settings.EMBEDDING_SERVER_TIMEOUT_SECONDS,
+            )
+
+        # 길이가 비슷한 입력끼리 묶어 패딩 연산을 줄이는 스케줄러
+        self.scheduler = LengthBucketScheduler(
+            memory_budget_mb=settings.EMBEDDING_BATCH_MEMORY_MB,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+        )
+
+        # 동시 요청의 텍스트를 모아 한 번에 encode
+        self.batcher = EmbeddingBatcher(
+            self._encode,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+        )
+
+        # 반복되는 청크는 모델을 거치지 않도록 캐시
+        self.cache = None
+        if settings.EMBEDDING_CACHE_ENABLED:
+            self.cache = EmbeddingCache(
+                settings.EMBEDDING_MODEL_NAME,
+                backend=backend_signature(),
+                cache_dir=settings.EMBEDDING_CACHE_DIR,
+                memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+                disk_max_bytes=settings.EMBEDDING_CACHE_DISK_MAX_MB * 1024 * 1024,
+            )
+
+        # 자주 반복되는 짧은 질문용 쿼리 임베딩 캐시 (TTL + LRU)
+        self.query_cache = TTLCache(
+            maxsize=settings.QUERY_CACHE_MAX_ITEMS,
+            ttl=settings.QUERY_CACHE_TTL_SECONDS,
+        )
+        self._query_cache_lock = threading.Lock()
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+
+    @property
+    def model(self):
+        return model_registry.get(self.model_name)
+
+    def _use_remote(self) -> bool:
+        return self.remote is not None and time.monotonic() >= self._remote_retry_at
+
+    def is_available(self) -> bool:
+        """임베딩 서버 또는 프로세스 내 모델 사용 가능 여부"""
+        return self._use_remote() or self.model is not None
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """모델 encode 호출 (배처 워커 스레드에서 실행). (n, dim) float32 행렬 반환"""
+        remote_error = None
+        if self._use_remote():
+            try:
+                return self.remote.encode(texts)
+            except OSError as e:
+                logger.warning(f"Embedding server unavailable, falling back to in-process model: {e}")
+                self._remote_retry_at = time.monotonic() + settings.EMBEDDING_SERVER_RETRY_SECONDS
+                remote_error = e
+
+        # 프로세스 내 모델은 레지스트리에서 지연 로드. 로드할 수 없으면 원래 서버 오류를 그대로 올린다
+        model = self.model
+        if model is None:
+            if remote_error is not None:
+                raise remote_error
+            raise RuntimeError(f"Embedding model '{self.model_name}' is not available")
+        return self.scheduler.encode(model, texts)
+
+    def _empty_embeddings(self, n: int) -> np.ndarray:
+        logger.warning("Embedding model not available. Returning empty embeddings.")
+        return np.zeros((n, settings.EMBEDDING_DIM), dtype=np.float32)
+
+    def get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """텍스트 리스트를 (n, dim) float32 임베딩 행렬로 변환"""
+        if not self.is_available():
+            return self._empty_embeddings(len(texts))
+
+        cached, missing = self._lookup_cache(texts)
+        computed = self.batcher.embed_sync([texts[i] for i in missing]) if missing else None
+        return self._assemble(texts, cached, missing, computed)
+
+    async def aget_embeddings(self, texts: List[str]) -> np.ndarray:
+        """이벤트 루프를 막지 않고 배처를 통해 임베딩"""
+        if not self.is_available():
+            return self._empty_embeddings(len(texts))
+
+        cached, missing = self._lookup_cache(texts)
+        computed = await self.batcher.embed([texts[i] for i in missing]) if missing else None
+        return self._assemble(texts, cached, missing, computed)
+
+    def _lookup_cache(self, texts: List[str]) -> tuple[list, List[int]]:
+        """캐시 조회 후 (캐시된 벡터 목록, 계산이 필요한 위치) 반환"""
+        if not self.cache:
+            return [None] * len(texts), list(range(len(texts)))
+        cached = self.cache.get_many(texts)
+        missing = [i for i, vec in enumerate(cached) if vec is None]
+        return cached, missing
+
+    def _assemble(self, texts: List[str], cached: list, missing: List[int], computed) -> np.ndarray:
+        """캐시 적중분과 새로 계산한 임베딩을 하나의 연속 float32 행렬로 합침"""
+        if not missing:
+            if not cached:
+                return np.zeros((0, settings.EMBEDDING_DIM), dtype=np.float32)
+            return np.stack(cached).astype(np.float32, copy=False)
+        if len(missing) == len(texts):
+            embeddings = np.asarray(computed, dtype=np.float32)
+        else:
+            embeddings = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+            embeddings[missing] = computed
+            for i, vec in enumerate(cached):
+                if vec is not None:
+                    embeddings[i] = vec
+        if self.cache:
+            self.cache.put_many([texts[i] for i in missing], computed)
+        return embeddings
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """검색 질의 하나를 (dim,) float32 벡터로 임베딩 (청크 분할 없이, 모델 최대 길이로 잘라서)"""
+        if not self.is_available():
+            return self._empty_embeddings(1)[0]
+
+        key = normalize_text(query)
+        cached = self._cached_query(key)
+        if cached is not None:
+            return cached
+        return self._remember_query(key, self.batcher.embed_sync([self._truncate_query(key)])[0])
+
+    async def aembed_query(self, query: str) -> np.ndarray:
+        """embed_query 의 async 버전"""
+        if not self.is_available():
+            return self._empty_embeddings(1)[0]
+
+        key = normalize_text(query)
+        cached = self._cached_query(key)
+        if cached is not None:
+            return cached
+        computed = await self.batcher.embed([self._truncate_query(key)])
+        return self._remember_query(key, computed[0])
+
+    async def aembed_queries(self, queries: List[str]) -> np.ndarray:
+        """여러 질의를 (n, dim) 으로 임베딩 (캐시에 없는 질의만 한 배치로 계산)"""
+        if not self.is_available():
+            return self._empty_embeddings(len(queries))
+
+        keys = [normalize_text(query) for query in queries]
+        vectors = [self._cached_query(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = await self.batcher.embed([self._truncate_query(keys[i]) for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = self._remember_query(keys[i], vector)
+        return np.stack(vectors).astype(np.float32, copy=False)
+
+    def _cached_query(self, key: str):
+        with self._query_cache_lock:
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                self.query_cache_hits += 1
+                return cached
+            self.query_cache_misses += 1
+        return None
+
+    def _remember_query(self, key: str, vector) -> np.ndarray:
+        embedding = np.array(vector, dtype=np.float32)
+        # 캐시된 벡터는 여러 요청이 공유하므로 읽기 전용으로 둔다
+        embedding.setflags(write=False)
+        with self._query_cache_lock:
+            self.query_cache[key] = embedding
+        return embedding
+
+    def _truncate_query(self, query: str) -> str:
+        """모델의 max_seq_length 토큰을 넘는 질의를 잘라냄"""
+        # 서버 모드에서는 토크나이저를 위해 모델을 로드하지 않는다 (서버 쪽 encode 가 잘라냄)
+        model = None if self._use_remote() else self.model
+        max_length = getattr(model, "max_seq_length", None)
+        tokenizer = getattr(model, "tokenizer", None)
+        # 토큰 하나는 최소 한 글자이므로 글자 수가 한도 이하면 토크나이즈할 필요가 없다
+        if not max_length or not tokenizer or len(query) <= max_length:
+            return query
+        encoded = tokenizer(
+            query,
+            truncation=True,
+            max_length=max_length,
+            return_offsets_mapping=True,
+        )
+        end = max((offset[1] for offset in encoded["offset_mapping"]), default=len(query))
+        return query[:end]
+
+    def token_counter(self) -> Optional[Callable[[str], int]]:
+        """이미 로드된 모델 토크나이저로 토큰 수를 세는 함수 (서버 모드이거나 토크나이저가 없으면 None)"""
+        model = None if self._use_remote() else self.model
+        tokenizer = getattr(model, "tokenizer", None)
+        if tokenizer is None:
+            return None
+        return lambda text: len(tokenizer.encode(text or "", add_special_tokens=False))
+
+    def get_chunker(self) -> TextChunker:
+        """청커 (CHUNK_UNIT=token 이면 모델 토크나이저 기준 길이 사용)"""
+        chunker = self._chunker
+        if chunker is None:
+            token_based = settings.CHUNK_UNIT == "token"
+            length_function = len
+            # 서버 모드에서는 토크나이저를 위해 모델을 로드하지 않고 글자 수 기준으로 나눈다
+            tokenizer = getattr(self.model, "tokenizer", None) if token_based and not self._use_remote() else None
+            if tokenizer is not None:
+                length_function = lambda t: len(tokenizer.encode(t, add_special_tokens=False))
+            else:
+                token_based = False
+            chunker = TextChunker(
+                chunk_size=settings.CHUNK_SIZE,
+                chunk_overlap=settings.CHUNK_OVERLAP,
+                length_function=length_function,
+                token_based=token_based,
+            )
+            self._chunker = chunker
+        return chunker
+
+    def iter_chunks(self, text: str) -> Iterator[Chunk]:
+        """텍스트를 오프셋 정보가 있는 청크로 지연 분할"""
+        return self.get_chunker().iter_chunks(text)
 
     def split_text(self, text: str) -> List[str]:
         """텍스트를 청크로 분할"""
-        if not self.text_splitter:
-            logger.warning("Text splitter not available. Performing basic split.")
-            return [text[i:i + 500] for i in range(0, len(text), 500)]
-        return self.text_splitter.split_text(text)
+        return [chunk.text for chunk in self.iter_chunks(text)]
 
-    def process_text(self, text: str) -> tuple[List[str], List[List[float]]]:
+    def process_text(self, text: str) -> tuple[List[str], np.ndarray]:
         """텍스트를 처리하여 청크와 임베딩 반환"""
         chunks = self.split_text(text)
         embeddings = self.get_embeddings(chunks)
-        return chunks, embeddings 
\ No newline at end of file
+        return chunks, embeddings 
+
+    async def aprocess_text(self, text: str) -> tuple[List[str], np.ndarray]:
+        """process_text 의 async 버전"""
+        chunks = self.split_text(text)
+        embeddings = await self.aget_embeddings(chunks)
+        return chunks, embeddings
+
+    def get_stats(self) -> dict:
+        """임베딩 배처/캐시 통계 반환"""
+        return {
+            "batcher": self.batcher.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
+            "cache": self.cache.get_stats() if self.cache else None,
+            "query_cache": {
+                "items": len(self.query_cache),
+                "hits": self.query_cache_hits,
+                "misses": self.query_cache_misses,
+            },
+        }
+
+
+_embedding_service = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """모든 라우터가 공유하는 EmbeddingService 반환"""
+    global _embedding_service
+    if _embedding_service is None:
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService()
+    return _embedding_service
@@ -1,6 +1,10 @@
 import os
 import google.generativeai as genai
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from app.core.config import settings
+
+ERROR_MESSAGE = "죄송합니다, 답변을 생성하는 중에 오류가 발생했습니다."
 
 class GeminiService:
     def __init__(self):
@@ -10,21 +14,28 @@ class GeminiService:
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
 
-    def generate_chat_response(self, history: List[Dict[str, str]], question: str, context: str):
-        """
-        채팅 기록과 컨텍스트를 기반으로 Gemini API로부터 스트리밍 응답을 생성합니다.
-        """
+    def _build_contents(
+        self, history: List[Dict[str, str]], question: str, context: str, summary: Optional[str] = None
+    ) -> List[Dict]:
+        """채팅 기록 + (이전 대화 요약,) 컨텍스트와 질문을 담은 프롬프트를 Gemini contents 형식으로 변환"""
         # Gemini API가 요구하는 형식으로 대화 기록 변환
         gemini_history = []
         for message in history:
             role = 'user' if message['role'] == 'user' else 'model'
             gemini_history.append({'role': role, 'parts': [message['content']]})
 
+        # 최근 대화 창보다 오래된 대화는 요약으로만 전달
+        summary_section = f"""
+        ---
+        이전 대화 요약:
+        {summary}
+        """ if summary else ""
+
         # 시스템 프롬프트와 컨텍스트, 사용자 질문을 결합
         prompt = f"""당신은 노트 내용을 기반으로 질문에 답변하는 AI 어시스턴트입니다.
         주어진 컨텍스트 정보를 최대한 활용하여 사용자의 질문에 답변하세요.
         답변은 항상 한국어로 작성해주세요.
-
+        {summary_section}
         ---
         컨텍스트 정보:
         {context}
@@ -34,18 +45,33 @@ class GeminiService:
         {question}
         """
 
+        # 최종 프롬프트를 대화 기록에 추가
+        gemini_history.append({'role': 'user', 'parts': [prompt]})
+        return gemini_history
+
+    def _generation_config(self):
+        return genai.types.GenerationConfig(
+            candidate_count=1,
+            max_output_tokens=2048,
+            temperature=0.7,
+        )
+
+    def config_key(self) -> tuple:
+        """같은 답변이 나올 수 있는 모델 설정 식별자 (응답 캐시 키에 사용)"""
+        config = self._generation_config()
+        return (self.model.model_name, config.max_output_tokens, config.temperature)
+
+    def generate_chat_response(
+        self, history: List[Dict[str, str]], question: str, context: str, summary: Optional[str] = None
+    ):
+        """
+        채팅 기록과 컨텍스트를 기반으로 Gemini API로부터 스트리밍 응답을 생성합니다.
+        """
         try:
-            # 최종 프롬프트를 대화 기록에 추가
-            gemini_history.append({'role': 'user', 'parts': [prompt]})
-            
             # 전체 대화 기록을 API에 전달하여 응답 생성
             response_stream = self.model.generate_content(
-                gemini_history,
-                generation_config=genai.types.GenerationConfig(
-                    candidate_count=1,
-                    max_output_tokens=2048,
-                    temperature=0.7,
-                ),
+                self._build_contents(history, question, context, summary),
+                generation_config=self._generation_config(),
                 stream=True
             )
             
@@ -55,4 +81,53 @@ class GeminiService:
 
         except Exception as e:
             print(f"Gemini API 호출 중 오류 발생: {e}")
-            yield "죄송합니다, 답변을 생성하는 중에 오류가 발생했습니다." 
\ No newline at end of file
+            yield ERROR_MESSAGE
+
+    async def agenerate_chat_response(
+        self, history: List[Dict[str, str]], question: str, context: str, summary: Optional[str] = None
+    ):
+        """generate_chat_response 의 async 버전 (스트림을 기다리는 동안 스레드를 잡지 않음)"""
+        try:
+            response_stream = await self.model.generate_content_async(
+                self._build_contents(history, question, context, summary),
+                generation_config=self._generation_config(),
+                stream=True
+            )
+
+            async for chunk in response_stream:
+                if chunk.text:
+                    yield chunk.text
+
+        except Exception as e:
+            print(f"Gemini API 호출 중 오류 발생: {e}")
+            yield ERROR_MESSAGE
+
+    async def asummarize_history(self, previous_summary: Optional[str], messages: List[Dict[str, str]]) -> Optional[str]:
+        """이전 요약에 새로 밀려난 대화를 접어 넣은 누적 요약 생성 (실패하면 None)"""
+        transcript = "\n".join(
+            f"{'사용자' if message['role'] == 'user' else 'AI'}: {message['content']}" for message in messages
+        )
+        prompt = f"""다음은 사용자와 AI 어시스턴트의 대화 중 오래된 부분입니다.
+        기존 요약과 새 대화를 합쳐 이후 대화에 필요한 사실, 사용자의 요청과 선호, 결정된 내용, 미해결 질문을
+        빠짐없이 담은 간결한 한국어 요약 하나로 다시 작성하세요. 요약만 출력하세요.
+
+        ---
+        기존 요약:
+        {previous_summary or "(없음)"}
+        ---
+        새 대화:
+        {transcript}
+        """
+        try:
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    candidate_count=1,
+                    max_output_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+                    temperature=0.2,
+                ),
+            )
+            return response.text.strip() or None
+        except Exception as e:
+            print(f"Gemini 대화 요약 중 오류 발생: {e}")
+            return None
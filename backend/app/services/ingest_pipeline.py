@@ -0,0 +1,191 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.services.vector_store import get_vector_store
+from app.services.note_indexer import PointIdAllocator, chunk_hash
+from app.services.text_chunker import Chunk
+
+_DONE = object()
+
+
+class IngestPipeline:
+    """추출 → 정제 → 분할 → 임베딩 → 저장을 스트리밍 단계로 연결한 노트 적재 파이프라인
+
+    단계마다 스레드 하나가 돌고, 단계 사이는 크기가 정해진 큐로 연결되어 있어서
+    뒷단계가 느리면 앞단계가 기다린다. 따라서 메모리 사용량은 문서 크기와 무관하게
+    (큐 크기 × 배치 크기) 정도로 제한되고, 앞쪽 청크는 파일 전체가 끝나기 전에 검색 가능해진다.
+    """
+
+    def __init__(
+        self,
+        embedding_service,
+        clean_fn: Callable[[str], str],
+        collection_name: str = "notes",
+        batch_size: int = 64,
+        queue_batches: int = 4,
+        content_max_chars: int = 0,
+    ):
+        self.embedding_service = embedding_service
+        self.clean_fn = clean_fn
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size)
+        self.queue_batches = max(1, queue_batches)
+        self.content_max_chars = content_max_chars
+
+    def run(self, note_id: int, segments: Iterable[str], metadata: Optional[Dict] = None) -> Dict:
+        """세그먼트 스트림을 끝까지 적재하고 통계 반환 (어느 단계든 실패하면 예외를 다시 발생)"""
+        chunk_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_batches)
+        vector_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_batches)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        stats = {
+            "chars": 0,
+            "chunks": 0,
+            "batches": 0,
+            "first_upsert_seconds": None,
+            "seconds": 0.0,
+            "upsert_seconds": 0.0,
+            "points_per_sec": 0.0,
+        }
+        content_parts: List[str] = []
+        started = time.perf_counter()
+
+        def put(q: "queue.Queue", item) -> bool:
+            # 다른 단계가 실패하면 막혀 있던 put 을 풀고 종료
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: "queue.Queue"):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def stage(fn):
+            def target():
+                try:
+                    fn()
+                except BaseException as e:
+                    errors.append(e)
+                    stop.set()
+            return threading.Thread(target=target, daemon=True)
+
+        def produce():
+            batch: List[Chunk] = []
+            for chunk in self._iter_chunks(segments, stats, content_parts):
+                batch.append(chunk)
+                if len(batch) >= self.batch_size:
+                    if not put(chunk_queue, batch):
+                        return
+                    batch = []
+            if batch and not put(chunk_queue, batch):
+                return
+            put(chunk_queue, _DONE)
+
+        def embed():
+            while True:
+                batch = get(chunk_queue)
+                if batch is _DONE:
+                    put(vector_queue, _DONE)
+                    return
+                embeddings = self.embedding_service.get_embeddings([chunk.text for chunk in batch])
+                if not put(vector_queue, (batch, embeddings)):
+                    return
+
+        def upsert():
+            chunk_index = 0
+            allocator = PointIdAllocator(note_id)
+            store = get_vector_store()
+            while True:
+                item = get(vector_queue)
+                if item is _DONE:
+                    return
+                batch, embeddings = item
+                texts = [chunk.text for chunk in batch]
+                hashes = [chunk_hash(text) for text in texts]
+                upserted = store.insert_vectors(
+                    collection_name=self.collection_name,
+                    vectors=embeddings,
+                    ids=allocator.allocate(hashes),
+                    note_ids=[note_id] * len(batch),
+                    contents=texts,
+                    chunk_indexes=list(range(chunk_index, chunk_index + len(batch))),
+                    chunk_hashes=hashes,
+                    metadata=metadata,
+                )
+                chunk_index += len(batch)
+                stats["upsert_seconds"] += upserted["seconds"]
+                stats["chunks"] = chunk_index
+                stats["batches"] += 1
+                if stats["first_upsert_seconds"] is None:
+                    stats["first_upsert_seconds"] = time.perf_counter() - started
+
+        threads = [stage(produce), stage(embed), stage(upsert)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        stats["seconds"] = time.perf_counter() - started
+        if stats["upsert_seconds"]:
+            stats["points_per_sec"] = stats["chunks"] / stats["upsert_seconds"]
+        stats["content"] = "".join(content_parts)
+        stats["content_truncated"] = stats["chars"] > len(stats["content"])
+        return stats
+
+    def _iter_chunks(self, segments: Iterable[str], stats: Dict, content_parts: List[str]) -> Iterator[Chunk]:
+        chunker = self.embedding_service.get_chunker()
+        return chunker.iter_stream(self._iter_clean(segments, stats, content_parts))
+
+    def _iter_clean(self, segments: Iterable[str], stats: Dict, content_parts: List[str]) -> Iterator[str]:
+        """세그먼트별 정제. 정제 결과를 공백으로 이어 전체 텍스트 정제와 같은 결과를 만든다."""
+        kept = 0
+        first = True
+        for segment in segments:
+            cleaned = self.clean_fn(segment)
+            if not cleaned:
+                continue
+            if not first:
+                cleaned = " " + cleaned
+            first = False
+            stats["chars"] += len(cleaned)
+            # DB 에 저장할 본문은 앞부분만 보관
+            if kept < self.content_max_chars:
+                part = cleaned[: self.content_max_chars - kept]
+                content_parts.append(part)
+                kept += len(part)
+            yield cleaned
+
+
+def ingest_file(
+    note_id: int,
+    file_path: str,
+    embedding_service,
+    content_extractor,
+    collection_name: str = "notes",
+    batch_size: int = 64,
+    queue_batches: int = 4,
+    content_max_chars: int = 0,
+    metadata: Optional[Dict] = None,
+) -> Dict:
+    """파일을 스트리밍으로 읽어 노트 벡터를 적재하고 통계(본문 앞부분과 잘림 여부 포함) 반환"""
+    pipeline = IngestPipeline(
+        embedding_service,
+        content_extractor.clean_text,
+        collection_name=collection_name,
+        batch_size=batch_size,
+        queue_batches=queue_batches,
+        content_max_chars=content_max_chars,
+    )
+    return pipeline.run(note_id, content_extractor.iter_file_segments(file_path), metadata)
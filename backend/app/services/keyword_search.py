@@ -0,0 +1,156 @@
+import logging
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# 어간으로 쓸 형태소 품사 (명사, 수사, 어근, 외국어/숫자/한자, 동사/형용사 어간)
+_KIWI_STEM_TAGS = {"NNG", "NNP", "NR", "XR", "SL", "SN", "SH", "VV", "VA"}
+
+# kiwipiepy 가 없을 때 쓰는 한국어 어절 끝 조사/어미 목록 (긴 것부터 검사)
+_KOREAN_SUFFIXES = sorted(
+    [
+        "은", "는", "이", "가", "을", "를", "의", "에", "도", "만", "와", "과", "로", "으로",
+        "에서", "에게", "한테", "께서", "까지", "부터", "보다", "처럼", "이나", "나", "랑", "이랑",
+        "이다", "입니다", "이에요", "예요", "하다", "했다", "합니다", "해요", "하는", "했던", "하기",
+    ],
+    key=len,
+    reverse=True,
+)
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+# 이 길이보다 짧은 검색어는 무시 (Qdrant prefix 인덱스의 최소 토큰 길이와 같아야 함)
+MIN_TERM_LENGTH = 2
+# pg_trgm 이 ILIKE '%검색어%' 에서 트라이그램을 뽑아 인덱스를 쓸 수 있는 최소 길이 (노트 목록 본문 검색)
+TRGM_MIN_PATTERN_CHARS = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def word_tokens(text: str) -> List[str]:
+    """본문을 소문자 어절 목록으로 분리"""
+    return _WORD_RE.findall(text.lower()) if text else []
+
+
+_kiwi = None
+_kiwi_unavailable = False
+_kiwi_lock = threading.Lock()
+
+
+def _get_kiwi():
+    """Kiwi 형태소 분석기 (처음 필요할 때 로드, kiwipiepy 가 없으면 None)"""
+    global _kiwi, _kiwi_unavailable
+    if _kiwi is None and not _kiwi_unavailable:
+        with _kiwi_lock:
+            if _kiwi is None and not _kiwi_unavailable:
+                try:
+                    from kiwipiepy import Kiwi
+                except ImportError:
+                    logger.warning("kiwipiepy is not installed; keyword search strips Korean suffixes by a fixed list")
+                    _kiwi_unavailable = True
+                else:
+                    _kiwi = Kiwi()
+    return _kiwi
+
+
+def _strip_suffix(word: str) -> str:
+    for suffix in _KOREAN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_TERM_LENGTH:
+            return word[: -len(suffix)]
+    return word
+
+
+def _stem(word: str, kiwi) -> str:
+    """한국어 어절의 어간 (어절 앞부분 그대로, 조사/어미를 뗀 것)
+
+    Kiwi 로 분석해 어절 처음부터 이어지는 명사/어근/어간 형태소를 붙인다 ("벡터검색을" → "벡터검색").
+    본문 어절과 접두어로 비교하므로 활용으로 모양이 바뀐 어간("아름다운" → "아름답")은 쓰지 않는다.
+    """
+    if not _HANGUL_RE.search(word):
+        return word
+    if kiwi is None:
+        return _strip_suffix(word)
+    end = 0
+    for token in kiwi.tokenize(word):
+        if token.start != end or token.tag.split("-")[0] not in _KIWI_STEM_TAGS:
+            break
+        if word[token.start:token.start + token.len] != token.form:
+            break
+        end += token.len
+    return word[:end] if end >= MIN_TERM_LENGTH else _strip_suffix(word)
+
+
+def keyword_terms(query: str) -> List[str]:
+    """질의어를 검색어 목록으로 변환 (중복 제거, 한국어는 Kiwi 형태소 분석으로 조사/어미를 떼어낸 어간)
+
+    검색어는 본문 어절의 접두어로 매칭된다. 예: "노트를" → "노트" 는 "노트에서", "노트들" 과 매칭.
+    """
+    kiwi = _get_kiwi()
+    terms = []
+    for word in word_tokens(query):
+        term = _stem(word, kiwi)
+        if len(term) >= MIN_TERM_LENGTH and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def prefix_tsquery(query: str) -> Optional[str]:
+    """Postgres to_tsquery 용 질의 문자열 (모든 검색어를 접두어로 AND, 검색어가 없으면 None)
+
+    예: "노트를 검색" → "'노트':* & '검색':*"
+    """
+    terms = keyword_terms(query)
+    if not terms:
+        return None
+    return " & ".join("'" + term.replace("'", "''") + "':*" for term in terms)
+
+
+def term_frequencies(words: Sequence[str], terms: Iterable[str]) -> Dict[str, int]:
+    """각 검색어로 시작하는 어절 수"""
+    return {term: sum(1 for word in words if word.startswith(term)) for term in terms}
+
+
+def bm25_score(
+    frequencies: Dict[str, int],
+    length: int,
+    avg_length: float,
+    doc_freqs: Dict[str, int],
+    total_docs: int,
+) -> float:
+    score = 0.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / max(avg_length, 1.0))
+    for term, tf in frequencies.items():
+        if not tf:
+            continue
+        df = doc_freqs.get(term, 0)
+        idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+        score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    return score
+
+
+def rank_bm25(
+    candidates: List[Dict],
+    terms: List[str],
+    doc_freqs: Dict[str, int],
+    total_docs: int,
+    top_k: int,
+    avg_length: float = 0.0,
+) -> List[Dict]:
+    """후보 청크({"note_id", "content", ...})를 BM25 점수로 정렬해 상위 top_k 반환
+
+    doc_freqs/total_docs 는 검색 범위(사용자, 필터) 전체 기준 값이다.
+    avg_length 를 모르면 후보 평균 길이를 쓴다.
+    """
+    tokenized = [word_tokens(candidate.get("content") or "") for candidate in candidates]
+    if not avg_length and tokenized:
+        avg_length = sum(len(words) for words in tokenized) / len(tokenized)
+    scored = []
+    for candidate, words in zip(candidates, tokenized):
+        score = bm25_score(term_frequencies(words, terms), len(words), avg_length, doc_freqs, total_docs)
+        if score > 0:
+            scored.append({**candidate, "score": score})
+    scored.sort(key=lambda hit: hit["score"], reverse=True)
+    return scored[:top_k]
@@ -0,0 +1,674 @@
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+import portalocker
+
+from app.core.config import settings
+from app.services.keyword_search import bm25_score, keyword_terms, term_frequencies, word_tokens
+from app.services.vector_store import PointId, VectorStore, format_hit, note_payload, upsert_stats
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = "points.sqlite"
+LOCK_FILE = "collection.lock"
+LEGACY_META_FILE = "meta.json"  # 예전 형식 (전체 payload 를 JSON 하나에 저장). 처음 열 때 DB_FILE 로 옮긴다
+_INITIAL_CAPACITY = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS points (
+    row INTEGER PRIMARY KEY,
+    point_id TEXT,
+    payload TEXT,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS points_seq ON points (seq);
+"""
+
+
+def _timestamp(value) -> float:
+    """RFC 3339 문자열/datetime 을 UTC 타임스탬프로 (없으면 nan). naive datetime 은 UTC 로 본다."""
+    if value is None:
+        return float("nan")
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class _LocalCollection:
+    """memory-mapped float32 행렬 + SQLite 포인트 테이블로 구성된 컬렉션
+
+    - vectors.<gen>.f32 : (capacity, dim) 정규화된 float32 행렬
+    - points.sqlite     : meta(차원, 용량, 세대, 행렬 파일명, seq) 와 행별 포인트 (row, point_id, payload, seq)
+    - collection.lock   : 프로세스 간 파일 잠금 (쓰기는 배타, 읽기는 공유)
+
+    쓰기는 바뀐 행만 한 트랜잭션으로 기록하고 seq 를 하나 올린다. 다른 프로세스는 잠금을 잡은 뒤
+    자신이 마지막으로 본 seq 이후에 바뀐 행만 다시 읽는다 (비워진 행은 point_id 가 NULL 인 행으로 남는다).
+    커밋된 행은 덮어쓰지 않는다 (같은 id 를 다시 쓰면 빈 행에 쓰고 커밋 후 옛 행을 비움).
+    용량이 부족하면 새 세대 파일로 복사하고 같은 트랜잭션에서 세대를 바꾸므로, 어느 시점에 중단돼도
+    마지막으로 커밋된 상태가 그대로 남는다.
+    """
+
+    def __init__(self, path: str, dim: int, hnsw_threshold: int, hnsw_ef: int = 128):
+        self.path = path
+        self.dim = dim
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_ef = hnsw_ef
+        self.lock = threading.RLock()
+        self._hnsw = None
+        self._hnsw_unavailable = False
+        os.makedirs(path, exist_ok=True)
+
+        self._lock_file = open(os.path.join(path, LOCK_FILE), "a+")
+        self._lock_depth = 0
+        self._lock_exclusive = False
+        self._db = sqlite3.connect(os.path.join(path, DB_FILE), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+
+        with self.lock, self._locked(exclusive=True):
+            self._db.executescript(_SCHEMA)
+            meta = self._read_meta()
+            if not meta:
+                self._initialize()
+                meta = self._read_meta()
+            if int(meta["dim"]) != dim:
+                raise ValueError(f"Collection at '{path}' has vector size {meta['dim']}, expected {dim}")
+            self._reset_state()
+            self._refresh()
+            self._remove_stale_files()
+
+    @staticmethod
+    def stored_dim(path: str) -> Optional[int]:
+        """디스크에 있는 컬렉션의 벡터 차원 (없으면 None)"""
+        db_path = os.path.join(path, DB_FILE)
+        if os.path.exists(db_path):
+            db = sqlite3.connect(db_path)
+            try:
+                row = db.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+            except sqlite3.OperationalError:
+                row = None
+            finally:
+                db.close()
+            if row is not None:
+                return int(row[0])
+        legacy_path = os.path.join(path, LEGACY_META_FILE)
+        if os.path.exists(legacy_path):
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                return json.load(f)["dim"]
+        return None
+
+    # ---- 잠금 ----
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """프로세스 간 파일 잠금 (같은 프로세스 안에서는 self.lock 으로 직렬화되고, 중첩 호출은 바깥 잠금을 그대로 쓴다)"""
+        if self._lock_depth:
+            if exclusive and not self._lock_exclusive:
+                raise RuntimeError("cannot upgrade a shared collection lock to exclusive")
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        portalocker.lock(self._lock_file, portalocker.LOCK_EX if exclusive else portalocker.LOCK_SH)
+        self._lock_depth = 1
+        self._lock_exclusive = exclusive
+        try:
+            yield
+        finally:
+            self._lock_depth = 0
+            portalocker.unlock(self._lock_file)
+
+    @contextmanager
+    def reading(self):
+        """공유 잠금을 잡고 다른 프로세스가 커밋한 변경을 반영한 상태로 읽기"""
+        with self.lock, self._locked(exclusive=False):
+            self._refresh()
+            yield
+
+    @contextmanager
+    def writing(self):
+        """배타 잠금을 잡고 최신 상태에서 쓰기"""
+        with self.lock, self._locked(exclusive=True):
+            self._refresh()
+            yield
+
+    # ---- 행 단위 상태 ----
+
+    def _reset_state(self):
+        self.seq = 0
+        self.generation = -1
+        self.capacity = 0
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.free_rows: Set[int] = set()
+        # 키워드 검색용 행별 어절 목록 (처음 검색될 때 만들고, 행이 바뀌면 버림)
+        self._row_words: Dict[int, List[str]] = {}
+        self._allocate_row_arrays(0)
+        self._hnsw = None
+
+    def _allocate_row_arrays(self, capacity: int):
+        self.id_to_row: Dict[PointId, int] = {}
+        self.row_ids: List[Optional[PointId]] = [None] * capacity
+        self.row_payloads: List[Optional[Dict]] = [None] * capacity
+        self.live = np.zeros(capacity, dtype=bool)
+        self.row_note = np.full(capacity, -1, dtype=np.int64)
+        self.row_user = np.full(capacity, -1, dtype=np.int64)
+        self.row_created = np.full(capacity, np.nan, dtype=np.float64)
+        self.row_category = np.empty(capacity, dtype=object)
+
+    def _grow_row_arrays(self, capacity: int):
+        extra = capacity - len(self.row_ids)
+        self.row_ids.extend([None] * extra)
+        self.row_payloads.extend([None] * extra)
+        self.live = np.concatenate([self.live, np.zeros(extra, dtype=bool)])
+        self.row_note = np.concatenate([self.row_note, np.full(extra, -1, dtype=np.int64)])
+        self.row_user = np.concatenate([self.row_user, np.full(extra, -1, dtype=np.int64)])
+        self.row_created = np.concatenate([self.row_created, np.full(extra, np.nan)])
+        self.row_category = np.concatenate([self.row_category, np.empty(extra, dtype=object)])
+
+    def _set_row(self, row: int, point_id: PointId, payload: Dict):
+        self.id_to_row[point_id] = row
+        self.row_ids[row] = point_id
+        self._set_payload(row, payload)
+        self.live[row] = True
+        self.free_rows.discard(row)
+
+    def _set_payload(self, row: int, payload: Dict):
+        self.row_payloads[row] = payload
+        self._row_words.pop(row, None)
+        note_id = payload.get("note_id")
+        user_id = payload.get("user_id")
+        self.row_note[row] = -1 if note_id is None else note_id
+        self.row_user[row] = -1 if user_id is None else user_id
+        self.row_created[row] = _timestamp(payload.get("created_at"))
+        self.row_category[row] = payload.get("category")
+
+    def _clear_row(self, row: int):
+        point_id = self.row_ids[row]
+        if point_id is not None and self.id_to_row.get(point_id) == row:
+            del self.id_to_row[point_id]
+        self._row_words.pop(row, None)
+        self.row_ids[row] = None
+        self.row_payloads[row] = None
+        self.live[row] = False
+        self.row_note[row] = -1
+        self.row_user[row] = -1
+        self.row_created[row] = np.nan
+        self.row_category[row] = None
+
+    # ---- 파일 ----
+
+    def _vectors_file(self, generation: Optional[int] = None) -> str:
+        return f"vectors.{self.generation if generation is None else generation}.f32"
+
+    def _remove_stale_files(self):
+        current = self._vectors_file()
+        for file_path in glob.glob(os.path.join(self.path, "vectors.*.f32")):
+            if os.path.basename(file_path) != current:
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    # 다른 프로세스가 아직 매핑하고 있으면 (Windows) 다음 세대 교체 때 다시 지운다
+                    pass
+
+    def _read_meta(self) -> Dict[str, str]:
+        return dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+
+    def _initialize(self):
+        """빈 컬렉션을 만들거나, 예전 meta.json 형식이 있으면 그 내용을 옮긴다 (배타 잠금 안에서 호출)"""
+        legacy_path = os.path.join(self.path, LEGACY_META_FILE)
+        if os.path.exists(legacy_path):
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+            meta = {
+                "dim": legacy["dim"],
+                "capacity": legacy["capacity"],
+                "generation": legacy["generation"],
+                "vectors_file": legacy["vectors_file"],
+            }
+            points = [(p["row"], json.dumps(p["id"]), json.dumps(p["payload"], ensure_ascii=False), 1) for p in legacy["points"]]
+        else:
+            meta = {"dim": self.dim, "capacity": _INITIAL_CAPACITY, "generation": 0, "vectors_file": self._vectors_file(0)}
+            np.memmap(
+                os.path.join(self.path, meta["vectors_file"]), dtype=np.float32, mode="w+", shape=(_INITIAL_CAPACITY, self.dim)
+            ).flush()
+            points = []
+        meta["seq"] = 1
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+            self._db.executemany("INSERT OR REPLACE INTO points (row, point_id, payload, seq) VALUES (?, ?, ?, ?)", points)
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+    def _refresh(self):
+        """마지막으로 본 seq 이후에 커밋된 변경만 반영 (잠금 안에서 호출)"""
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()
+        seq = int(row[0]) if row else 0
+        if seq == self.seq:
+            return
+        meta = self._read_meta()
+        generation = int(meta["generation"])
+        if generation != self.generation:
+            capacity = int(meta["capacity"])
+            self.vectors = np.memmap(
+                os.path.join(self.path, meta["vectors_file"]), dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+            )
+            if capacity > self.capacity:
+                self._grow_row_arrays(capacity)
+                self.free_rows.update(range(self.capacity, capacity))
+                if self._hnsw is not None:
+                    self._hnsw.resize_index(capacity)
+            self.capacity = capacity
+            self.generation = generation
+
+        changed = self._db.execute(
+            "SELECT row, point_id, payload FROM points WHERE seq > ? ORDER BY seq", (self.seq,)
+        ).fetchall()
+        added = []
+        for row, point_id, payload in changed:
+            previous_id = self.row_ids[row]
+            self._clear_row(row)
+            if point_id is None:
+                self.free_rows.add(row)
+                if previous_id is not None and self._hnsw is not None:
+                    self._hnsw.mark_deleted(row)
+            else:
+                point_id = json.loads(point_id)
+                self._set_row(row, point_id, json.loads(payload))
+                # 같은 id 가 같은 행에 그대로 있으면 payload 만 바뀐 것 (벡터는 그대로)
+                if previous_id != point_id:
+                    added.append(row)
+        if added and self._hnsw is not None:
+            self._hnsw.add_items(self.vectors[added], added)
+        self.seq = seq
+
+    def _grow(self, needed: int):
+        """빈 행이 needed 개 이상이 되도록 새 세대 파일로 확장 (커밋 전까지 옛 파일은 그대로)"""
+        capacity = self.capacity
+        while capacity - self.capacity + len(self.free_rows) < needed:
+            capacity *= 2
+        self.generation += 1
+        vectors = np.memmap(
+            os.path.join(self.path, self._vectors_file()), dtype=np.float32, mode="w+", shape=(capacity, self.dim)
+        )
+        vectors[: self.capacity] = self.vectors
+        self.free_rows.update(range(self.capacity, capacity))
+        self._grow_row_arrays(capacity)
+        self.vectors = vectors
+        self.capacity = capacity
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+    def _commit(self, rows: List[int], grown: bool = False):
+        """바뀐 행만 한 트랜잭션으로 기록 (배타 잠금 안에서 호출)"""
+        # 벡터를 먼저 디스크에 반영한 뒤 포인트 테이블을 바꾼다
+        self.vectors.flush()
+        seq = self.seq + 1
+        meta = [("seq", str(seq))]
+        if grown:
+            meta += [
+                ("capacity", str(self.capacity)),
+                ("generation", str(self.generation)),
+                ("vectors_file", self._vectors_file()),
+            ]
+        points = [
+            (
+                int(row),
+                None if self.row_ids[row] is None else json.dumps(self.row_ids[row]),
+                None if self.row_payloads[row] is None else json.dumps(self.row_payloads[row], ensure_ascii=False),
+                seq,
+            )
+            for row in rows
+        ]
+        try:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO points (row, point_id, payload, seq) VALUES (?, ?, ?, ?)", points
+                )
+                self._db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        except BaseException:
+            # 메모리 상태가 디스크와 달라졌으므로 커밋된 상태에서 다시 읽는다
+            self._reset_state()
+            self._refresh()
+            raise
+        self.seq = seq
+        if grown:
+            self._remove_stale_files()
+
+    # ---- 변경 ----
+
+    def upsert(self, vectors: np.ndarray, ids: List[PointId], payloads: List[Dict]):
+        with self.writing():
+            grown = len(ids) > len(self.free_rows)
+            if grown:
+                self._grow(len(ids))
+            rows = [self.free_rows.pop() for _ in ids]
+            self.vectors[rows] = _normalize(vectors)
+            released = [self.id_to_row[point_id] for point_id in ids if point_id in self.id_to_row]
+            for row in released:
+                self._clear_row(row)
+            for row, point_id, payload in zip(rows, ids, payloads):
+                self._set_row(row, point_id, payload)
+            self._commit(rows + released, grown=grown)
+            self.free_rows.update(released)
+            if self._hnsw is not None:
+                for row in released:
+                    self._hnsw.mark_deleted(row)
+                self._hnsw.add_items(self.vectors[rows], rows)
+
+    def delete_rows(self, rows: List[int]):
+        with self.writing():
+            if not rows:
+                return
+            for row in rows:
+                self._clear_row(row)
+            self._commit(rows)
+            self.free_rows.update(rows)
+            if self._hnsw is not None:
+                for row in rows:
+                    self._hnsw.mark_deleted(row)
+
+    def update_payloads(self, updates: Dict[int, Dict]):
+        """행별 payload 일부 갱신 (벡터는 그대로)"""
+        with self.writing():
+            if not updates:
+                return
+            for row, fields in updates.items():
+                self._set_payload(row, {**self.row_payloads[row], **fields})
+            self._commit(list(updates))
+
+    def note_rows(self, note_id: int) -> List[int]:
+        return np.flatnonzero(self.live & (self.row_note == note_id)).tolist()
+
+    # ---- 검색 ----
+
+    def search(self, query: np.ndarray, top_k: int, mask: np.ndarray, with_vectors: bool = False) -> List[Dict]:
+        with self.reading():
+            candidates = int(mask.sum())
+            if candidates == 0 or top_k <= 0:
+                return []
+            query = _normalize(np.asarray(query, dtype=np.float32))
+            k = min(top_k, candidates)
+            # 후보가 적으면 (작은 컬렉션이거나 선택적인 필터) 전수 검색이 정확하고 더 빠르다
+            rows = None
+            if candidates >= self.hnsw_threshold and self._ensure_hnsw():
+                try:
+                    rows, scores = self._search_hnsw(query, k, mask, candidates)
+                except RuntimeError:
+                    # 필터 때문에 그래프 탐색에서 k 개를 찾지 못한 경우
+                    rows = None
+            if rows is None:
+                rows, scores = self._search_brute_force(query, k, mask)
+            return [
+                format_hit(self.row_payloads[row], float(score), np.array(self.vectors[row]) if with_vectors else None)
+                for row, score in zip(rows, scores)
+            ]
+
+    def keyword_search(self, terms: List[str], top_k: int, mask: np.ndarray) -> List[Dict]:
+        """mask 범위의 청크를 BM25 로 검색 (문서 빈도와 평균 길이도 mask 범위 기준)"""
+        with self.reading():
+            rows = np.flatnonzero(mask).tolist()
+            if not terms or not rows or top_k <= 0:
+                return []
+            words_by_row = {}
+            for row in rows:
+                words = self._row_words.get(row)
+                if words is None:
+                    words = word_tokens(self.row_payloads[row].get("content") or "")
+                    self._row_words[row] = words
+                words_by_row[row] = words
+            frequencies = {row: term_frequencies(words, terms) for row, words in words_by_row.items()}
+            doc_freqs = {term: sum(1 for tf in frequencies.values() if tf[term]) for term in terms}
+            avg_length = sum(len(words) for words in words_by_row.values()) / len(rows)
+            scored = []
+            for row, tf in frequencies.items():
+                score = bm25_score(tf, len(words_by_row[row]), avg_length, doc_freqs, len(rows))
+                if score > 0:
+                    scored.append((score, row))
+            scored.sort(key=lambda item: item[0], reverse=True)
+            return [format_hit(self.row_payloads[row], score) for score, row in scored[:top_k]]
+
+    def _search_brute_force(self, query: np.ndarray, k: int, mask: np.ndarray):
+        rows = np.flatnonzero(mask)
+        scores = self.vectors[rows] @ query
+        if k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return rows[top], scores[top]
+
+    def _search_hnsw(self, query: np.ndarray, k: int, mask: np.ndarray, candidates: int):
+        self._hnsw.set_ef(max(self.hnsw_ef, k * 4))
+        # 모든 행이 후보가 아니면 탐색 중에 필터를 적용한다
+        row_filter = None if candidates == int(self.live.sum()) else (lambda row: bool(mask[row]))
+        labels, distances = self._hnsw.knn_query(query, k=k, num_threads=1, filter=row_filter)
+        # inner product 공간의 거리는 1 - 내적
+        return labels[0], 1.0 - distances[0]
+
+    def _ensure_hnsw(self) -> bool:
+        if self._hnsw is not None:
+            return True
+        if self._hnsw_unavailable:
+            return False
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("hnswlib is not installed; local vector store falls back to brute-force search")
+            self._hnsw_unavailable = True
+            return False
+        started = time.perf_counter()
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index.init_index(max_elements=self.capacity, ef_construction=200, M=16)
+        rows = np.flatnonzero(self.live)
+        if len(rows):
+            index.add_items(self.vectors[rows], rows)
+        self._hnsw = index
+        logger.info(f"Built HNSW index for {len(rows)} vectors in {time.perf_counter() - started:.1f}s")
+        return True
+
+    def stats(self) -> Dict:
+        with self.reading():
+            points = int(self.live.sum())
+            return {
+                "exists": True,
+                "points_count": points,
+                "capacity": self.capacity,
+                "dim": self.dim,
+                "search": "hnsw" if self._hnsw is not None and points >= self.hnsw_threshold else "brute_force",
+                "hnsw_threshold": self.hnsw_threshold,
+                "hnsw_built": self._hnsw is not None,
+                "vectors_bytes": self.capacity * self.dim * 4,
+            }
+
+
+class LocalVectorStore(VectorStore):
+    """프로세스 내 벡터 저장소 (작은 배포, CI 용)
+
+    컬렉션마다 base_dir 아래 디렉토리 하나를 쓴다. 후보가 hnsw_threshold 미만이면 NumPy 전수 검색,
+    이상이면 hnswlib HNSW 인덱스(설치된 경우)를 쓴다. HNSW 인덱스는 처음 필요할 때 메모리에 만든다.
+    """
+
+    name = "local"
+
+    def __init__(self, base_dir: str, hnsw_threshold: int = 20000, hnsw_ef: int = 128):
+        self.base_dir = base_dir
+        self.hnsw_threshold = hnsw_threshold
+        self.hnsw_ef = hnsw_ef
+        self._collections: Dict[str, _LocalCollection] = {}
+        self._lock = threading.Lock()
+
+    def _collection_path(self, collection_name: str) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", collection_name)
+        return os.path.join(self.base_dir, safe_name)
+
+    def _collection(self, collection_name: str, vector_size: int = settings.EMBEDDING_DIM) -> _LocalCollection:
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(collection_name)
+                if collection is None:
+                    collection = _LocalCollection(
+                        self._collection_path(collection_name), vector_size, self.hnsw_threshold, self.hnsw_ef
+                    )
+                    self._collections[collection_name] = collection
+        return collection
+
+    def _existing(self, collection_name: str) -> Optional[_LocalCollection]:
+        if collection_name in self._collections:
+            return self._collections[collection_name]
+        dim = _LocalCollection.stored_dim(self._collection_path(collection_name))
+        return None if dim is None else self._collection(collection_name, dim)
+
+    def ensure_collection(self, collection_name, vector_size=settings.EMBEDDING_DIM):
+        collection = self._collection(collection_name, vector_size)
+        if collection.dim != vector_size:
+            raise ValueError(
+                f"Collection '{collection_name}' has vector size {collection.dim}, expected {vector_size}"
+            )
+        return {"size": collection.dim, "distance": "Cosine"}
+
+    def upsert_points(self, collection_name, vectors, ids, payloads):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        started = time.perf_counter()
+        collection = self._collection(collection_name, vectors.shape[1] if vectors.ndim == 2 else settings.EMBEDDING_DIM)
+        if len(ids):
+            # 같은 호출 안에서 id 가 반복되면 마지막 것만 남긴다
+            last = {point_id: i for i, point_id in enumerate(ids)}
+            keep = sorted(last.values())
+            collection.upsert(vectors[keep], [ids[i] for i in keep], [payloads[i] for i in keep])
+        return upsert_stats.result(len(ids), 1 if len(ids) else 0, 0, time.perf_counter() - started)
+
+    def search_similar(
+        self,
+        collection_name,
+        query_vector,
+        top_k=5,
+        user_id=None,
+        category=None,
+        created_from=None,
+        created_to=None,
+        with_vectors=False,
+    ):
+        collection = self._existing(collection_name)
+        if collection is None:
+            return []
+        with collection.reading():
+            mask = self._filter_mask(collection, user_id, category, created_from, created_to)
+            return collection.search(np.asarray(query_vector, dtype=np.float32), top_k, mask, with_vectors)
+
+    def keyword_search(
+        self,
+        collection_name,
+        query,
+        top_k=5,
+        user_id=None,
+        category=None,
+        created_from=None,
+        created_to=None,
+        terms=None,
+    ):
+        collection = self._existing(collection_name)
+        if collection is None:
+            return []
+        if terms is None:
+            terms = keyword_terms(query)
+        with collection.reading():
+            mask = self._filter_mask(collection, user_id, category, created_from, created_to)
+            return collection.keyword_search(terms, top_k, mask)
+
+    @staticmethod
+    def _filter_mask(collection: _LocalCollection, user_id, category, created_from, created_to) -> np.ndarray:
+        mask = collection.live.copy()
+        if user_id is not None:
+            mask &= collection.row_user == user_id
+        if category is not None:
+            mask &= collection.row_category == category
+        if created_from is not None:
+            mask &= collection.row_created >= _timestamp(created_from)
+        if created_to is not None:
+            mask &= collection.row_created <= _timestamp(created_to)
+        return mask
+
+    def delete_vectors(self, collection_name, note_id):
+        collection = self._existing(collection_name)
+        if collection is not None:
+            with collection.writing():
+                collection.delete_rows(collection.note_rows(note_id))
+
+    def get_note_chunks(self, collection_name, note_id):
+        collection = self._existing(collection_name)
+        if collection is None:
+            return []
+        with collection.reading():
+            return [
+                {
+                    "id": collection.row_ids[row],
+                    "chunk_hash": collection.row_payloads[row].get("chunk_hash"),
+                    "chunk_index": collection.row_payloads[row].get("chunk_index"),
+                }
+                for row in collection.note_rows(note_id)
+            ]
+
+    def delete_points(self, collection_name, ids):
+        collection = self._existing(collection_name)
+        if collection is not None and ids:
+            with collection.writing():
+                rows: Set[int] = {collection.id_to_row[point_id] for point_id in ids if point_id in collection.id_to_row}
+                collection.delete_rows(sorted(rows))
+
+    def update_chunk_indexes(self, collection_name, chunk_indexes):
+        collection = self._existing(collection_name)
+        if collection is not None and chunk_indexes:
+            with collection.writing():
+                collection.update_payloads({
+                    collection.id_to_row[point_id]: {"chunk_index": index}
+                    for point_id, index in chunk_indexes.items()
+                    if point_id in collection.id_to_row
+                })
+
+    def set_notes_metadata(self, collection_name, metadata_by_note):
+        collection = self._existing(collection_name)
+        if collection is not None and metadata_by_note:
+            with collection.writing():
+                updates = {}
+                for note_id, metadata in metadata_by_note.items():
+                    fields = note_payload(**metadata)
+                    for row in collection.note_rows(note_id):
+                        updates[row] = fields
+                collection.update_payloads(updates)
+
+    def get_collection_stats(self, collection_name):
+        collection = self._existing(collection_name)
+        if collection is None:
+            return {"collection": collection_name, "exists": False}
+        return {"collection": collection_name, "backend": self.name, **collection.stats()}
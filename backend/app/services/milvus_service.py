@@ -1,70 +1,780 @@
+import asyncio
+import logging
 import os
-from qdrant_client import QdrantClient
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import grpc
+import httpx
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models as qmodels
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
 from dotenv import load_dotenv
-from typing import List
+from app.core.config import settings
+from app.services.keyword_search import MIN_TERM_LENGTH, keyword_terms, rank_bm25
+from app.services.vector_store import PointId, Vector, build_payloads, format_hit, note_payload, upsert_stats
+from datetime import datetime
+from typing import Dict, List, Optional, Union
 
 load_dotenv()
 
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+# upsert 요청 하나에 담는 포인트 수 (파이썬 float 리스트 변환을 이 크기로 제한)
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "256"))
+# 동시에 보내는 upsert 요청 수와 배치별 재시도 횟수
+QDRANT_UPSERT_PARALLEL = int(os.getenv("QDRANT_UPSERT_PARALLEL", "4"))
+QDRANT_UPSERT_MAX_RETRIES = int(os.getenv("QDRANT_UPSERT_MAX_RETRIES", "3"))
+# 전송 방식과 연결 풀 설정 (gRPC 사용 시 QDRANT_GRPC_PORT 로 연결)
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_TIMEOUT_SECONDS = int(os.getenv("QDRANT_TIMEOUT_SECONDS", "10"))
+QDRANT_MAX_CONNECTIONS = int(os.getenv("QDRANT_MAX_CONNECTIONS", "100"))
+QDRANT_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("QDRANT_MAX_KEEPALIVE_CONNECTIONS", "20"))
+QDRANT_KEEPALIVE_SECONDS = float(os.getenv("QDRANT_KEEPALIVE_SECONDS", "30"))
+# 컬렉션 저장 방식: 양자화(none | scalar | product), 원본 벡터 디스크 저장, HNSW 파라미터
+# 양자화 벡터는 QDRANT_QUANTIZATION_ALWAYS_RAM 이면 RAM 에 두고, 원본은 rescoring 할 때만 읽는다
+QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "none").lower()
+QDRANT_QUANTIZATION_ALWAYS_RAM = os.getenv("QDRANT_QUANTIZATION_ALWAYS_RAM", "true").lower() == "true"
+QDRANT_SCALAR_QUANTILE = float(os.getenv("QDRANT_SCALAR_QUANTILE", "0.99"))
+QDRANT_PQ_COMPRESSION = os.getenv("QDRANT_PQ_COMPRESSION", "x16").lower()  # x4, x8, x16, x32, x64
+QDRANT_ON_DISK_VECTORS = os.getenv("QDRANT_ON_DISK_VECTORS", "false").lower() == "true"
+QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+QDRANT_HNSW_ON_DISK = os.getenv("QDRANT_HNSW_ON_DISK", "false").lower() == "true"
+# 검색 파라미터: ef(0 이면 서버 기본값), 양자화 사용 시 원본 벡터로 다시 점수 계산(rescore)할 후보 배수
+QDRANT_SEARCH_EF = int(os.getenv("QDRANT_SEARCH_EF", "0"))
+QDRANT_RESCORE = os.getenv("QDRANT_RESCORE", "true").lower() == "true"
+QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+# 키워드 검색 후보 청크를 한 번에 읽는 수와 BM25 로 점수를 매길 최대 후보 수
+# (최대치를 넘으면 나머지 후보는 id 순서로 잘리므로 경고를 남긴다)
+QDRANT_KEYWORD_CANDIDATES = int(os.getenv("QDRANT_KEYWORD_CANDIDATES", "500"))
+QDRANT_KEYWORD_MAX_CANDIDATES = int(os.getenv("QDRANT_KEYWORD_MAX_CANDIDATES", "2000"))
 
-qdrant_client = QdrantClient(
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY,
-)
+logger = logging.getLogger(__name__)
+
+# 검색 필터에 쓰는 payload 필드 인덱스 (컬렉션 확인 시 없는 것만 생성)
+PAYLOAD_INDEXES = {
+    "user_id": qmodels.PayloadSchemaType.INTEGER,
+    "note_id": qmodels.PayloadSchemaType.INTEGER,
+    "category": qmodels.PayloadSchemaType.KEYWORD,
+    "created_at": qmodels.PayloadSchemaType.DATETIME,
+    # 키워드 검색용 본문 인덱스 (어절의 접두어를 색인해서 조사가 붙은 어절도 어간으로 찾는다)
+    "content": qmodels.TextIndexParams(
+        type=qmodels.TextIndexType.TEXT,
+        tokenizer=qmodels.TokenizerType.PREFIX,
+        min_token_len=MIN_TERM_LENGTH,
+        max_token_len=20,
+        lowercase=True,
+    ),
+}
+
+def _client_options() -> Dict:
+    """동기/비동기 클라이언트 공통 옵션 (REST 는 keep-alive 연결 풀, gRPC 는 채널 keep-alive)"""
+    options = {
+        "url": QDRANT_URL,
+        "api_key": QDRANT_API_KEY,
+        "timeout": QDRANT_TIMEOUT_SECONDS,
+        "prefer_grpc": QDRANT_PREFER_GRPC,
+        "grpc_port": QDRANT_GRPC_PORT,
+    }
+    if QDRANT_PREFER_GRPC:
+        options["grpc_options"] = {
+            "grpc.keepalive_time_ms": int(QDRANT_KEEPALIVE_SECONDS * 1000),
+            "grpc.keepalive_permit_without_calls": 1,
+        }
+    else:
+        options["limits"] = httpx.Limits(
+            max_connections=QDRANT_MAX_CONNECTIONS,
+            max_keepalive_connections=QDRANT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=QDRANT_KEEPALIVE_SECONDS,
+        )
+    return options
+
+qdrant_client = QdrantClient(**_client_options())
+
+# 이벤트 루프에서 쓰는 비동기 클라이언트 (처음 사용할 때 생성)
+_async_client: Optional[AsyncQdrantClient] = None
+
+def get_async_client() -> AsyncQdrantClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncQdrantClient(**_client_options())
+    return _async_client
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        client, _async_client = _async_client, None
+        await client.close()
 
 def get_collections():
     return qdrant_client.get_collections()
 
+def hnsw_config() -> qmodels.HnswConfigDiff:
+    return qmodels.HnswConfigDiff(m=QDRANT_HNSW_M, ef_construct=QDRANT_HNSW_EF_CONSTRUCT, on_disk=QDRANT_HNSW_ON_DISK)
+
+def quantization_config():
+    """QDRANT_QUANTIZATION 에 따른 양자화 설정 (none 이면 None)"""
+    if QDRANT_QUANTIZATION == "none":
+        return None
+    if QDRANT_QUANTIZATION == "scalar":
+        return qmodels.ScalarQuantization(scalar=qmodels.ScalarQuantizationConfig(
+            type=qmodels.ScalarType.INT8,
+            quantile=QDRANT_SCALAR_QUANTILE,
+            always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM,
+        ))
+    if QDRANT_QUANTIZATION == "product":
+        return qmodels.ProductQuantization(product=qmodels.ProductQuantizationConfig(
+            compression=qmodels.CompressionRatio(QDRANT_PQ_COMPRESSION),
+            always_ram=QDRANT_QUANTIZATION_ALWAYS_RAM,
+        ))
+    raise ValueError(f"Unknown QDRANT_QUANTIZATION: {QDRANT_QUANTIZATION}")
+
+def collection_options(vector_size: int = settings.EMBEDDING_DIM) -> Dict:
+    """컬렉션 생성 인자 (벡터, HNSW, 양자화 설정)"""
+    return {
+        "vectors_config": qmodels.VectorParams(size=vector_size, distance="Cosine", on_disk=QDRANT_ON_DISK_VECTORS),
+        "hnsw_config": hnsw_config(),
+        "quantization_config": quantization_config(),
+    }
+
+def search_params() -> Optional[qmodels.SearchParams]:
+    """검색 ef 와 양자화 rescoring 설정 (모두 기본값이면 None)"""
+    quantization = None
+    if QDRANT_QUANTIZATION != "none":
+        quantization = qmodels.QuantizationSearchParams(rescore=QDRANT_RESCORE, oversampling=QDRANT_OVERSAMPLING)
+    if not QDRANT_SEARCH_EF and quantization is None:
+        return None
+    return qmodels.SearchParams(hnsw_ef=QDRANT_SEARCH_EF or None, quantization=quantization)
+
 def create_notes_collection():
-    # 벡터 차원 1024, cosine similarity
-    qdrant_client.recreate_collection(
-        collection_name="notes",
-        vectors_config=qmodels.VectorParams(size=1024, distance="Cosine")
+    # 벡터 차원 EMBEDDING_DIM, cosine similarity (저장 방식은 collection_options 설정)
+    qdrant_client.recreate_collection(collection_name="notes", **collection_options(settings.EMBEDDING_DIM))
+    forget_collection("notes")
+
+def apply_collection_options(collection_name: str, dry_run: bool = False) -> Dict:
+    """기존 컬렉션에 현재 저장 방식 설정을 적용 (데이터는 유지되고 서버가 백그라운드에서 세그먼트를 재구성)
+
+    바뀌는 항목만 {"항목": (현재값, 목표값)} 으로 반환한다.
+    """
+    info = qdrant_client.get_collection(collection_name=collection_name)
+    params = info.config
+    vectors = params.params.vectors
+    target_hnsw = hnsw_config()
+    target_quantization = quantization_config()
+    changes = {}
+    if bool(vectors.on_disk) != QDRANT_ON_DISK_VECTORS:
+        changes["on_disk"] = (bool(vectors.on_disk), QDRANT_ON_DISK_VECTORS)
+    current_hnsw = params.hnsw_config
+    for field, current, target in (
+        ("m", current_hnsw.m, target_hnsw.m),
+        ("ef_construct", current_hnsw.ef_construct, target_hnsw.ef_construct),
+        ("on_disk", bool(current_hnsw.on_disk), target_hnsw.on_disk),
+    ):
+        if current != target:
+            changes[f"hnsw_{field}"] = (current, target)
+    if params.quantization_config != target_quantization:
+        changes["quantization"] = (params.quantization_config, target_quantization)
+    if dry_run or not changes:
+        return changes
+    qdrant_client.update_collection(
+        collection_name=collection_name,
+        vectors_config={"": qmodels.VectorParamsDiff(on_disk=QDRANT_ON_DISK_VECTORS)} if "on_disk" in changes else None,
+        hnsw_config=target_hnsw if any(key.startswith("hnsw_") for key in changes) else None,
+        quantization_config=(target_quantization or qmodels.Disabled.DISABLED) if "quantization" in changes else None,
     )
+    forget_collection(collection_name)
+    return changes
+
+# 확인된 컬렉션의 벡터 설정 캐시 (컬렉션명 -> {"size", "distance"})
+_collections: Dict[str, Dict] = {}
+_collections_lock = threading.Lock()
+
+def _rpc_code(error: Exception):
+    return error.code() if isinstance(error, grpc.RpcError) and hasattr(error, "code") else None
+
+def _is_not_found(error: Exception) -> bool:
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 404
+    # 로컬(:memory:, path) 모드는 ValueError 로 알린다
+    if isinstance(error, ValueError):
+        return "not found" in str(error)
+    return _rpc_code(error) == grpc.StatusCode.NOT_FOUND
+
+def _is_already_exists(error: Exception) -> bool:
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 409
+    if isinstance(error, ValueError):
+        return "already exists" in str(error)
+    return _rpc_code(error) == grpc.StatusCode.ALREADY_EXISTS
+
+def _is_retryable(error: Exception) -> bool:
+    """일시적인 전송 오류나 서버 오류(5xx, UNAVAILABLE)만 재시도 (4xx 검증 오류는 다시 보내도 같다)"""
+    if isinstance(error, ResponseHandlingException):
+        error = error.source
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code >= 500
+    return _rpc_code(error) in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
+def _cache_collection(collection_name: str, size: int, distance, vector_size: int) -> Dict:
+    if size != vector_size:
+        raise ValueError(
+            f"Collection '{collection_name}' has vector size {size}, expected {vector_size}"
+        )
+    config = {"size": size, "distance": str(distance)}
+    _collections[collection_name] = config
+    return config
 
-def insert_vectors(collection_name: str, vectors: List[List[float]], ids: List[int], note_ids: List[int], contents: List[str]):
-    # 컬렉션이 없으면 자동 생성
+def ensure_collection(collection_name: str, vector_size: int = settings.EMBEDDING_DIM) -> Dict:
+    """컬렉션이 있는지 한 번만 확인하고 벡터 설정을 캐시 (없으면 생성, 기존 데이터는 지우지 않음)"""
+    config = _collections.get(collection_name)
+    if config is not None:
+        return config
+    with _collections_lock:
+        config = _collections.get(collection_name)
+        if config is not None:
+            return config
+        try:
+            info = qdrant_client.get_collection(collection_name=collection_name)
+        except Exception as e:
+            # 일시적인 오류로 컬렉션을 다시 만들어 데이터를 날리지 않도록, 없다는 응답일 때만 생성한다
+            if not _is_not_found(e):
+                raise
+            info = None
+        if info is not None:
+            for field_name in _missing_indexes(info):
+                _create_payload_index(qdrant_client, collection_name, field_name)
+            vectors = info.config.params.vectors
+            return _cache_collection(collection_name, vectors.size, vectors.distance, vector_size)
+        try:
+            qdrant_client.create_collection(collection_name=collection_name, **collection_options(vector_size))
+        except Exception as e:
+            # 다른 워커가 먼저 만든 경우
+            if not _is_already_exists(e):
+                raise
+        for field_name in PAYLOAD_INDEXES:
+            _create_payload_index(qdrant_client, collection_name, field_name)
+        return _cache_collection(collection_name, vector_size, qmodels.Distance.COSINE, vector_size)
+
+def _missing_indexes(info) -> List[str]:
+    existing = info.payload_schema or {}
+    return [field_name for field_name in PAYLOAD_INDEXES if field_name not in existing]
+
+def _create_payload_index(client, collection_name: str, field_name: str):
+    # 인덱스 생성은 같은 필드에 대해 여러 번 호출해도 안전하다
+    return client.create_payload_index(
+        collection_name=collection_name,
+        field_name=field_name,
+        field_schema=PAYLOAD_INDEXES[field_name],
+        wait=True,
+    )
+
+_acollections_lock = asyncio.Lock()
+
+async def aensure_collection(collection_name: str, vector_size: int = settings.EMBEDDING_DIM) -> Dict:
+    """ensure_collection 의 비동기 버전 (캐시는 공유)"""
+    config = _collections.get(collection_name)
+    if config is not None:
+        return config
+    client = get_async_client()
+    async with _acollections_lock:
+        config = _collections.get(collection_name)
+        if config is not None:
+            return config
+        try:
+            info = await client.get_collection(collection_name=collection_name)
+        except Exception as e:
+            if not _is_not_found(e):
+                raise
+            info = None
+        if info is not None:
+            for field_name in _missing_indexes(info):
+                await _create_payload_index(client, collection_name, field_name)
+            vectors = info.config.params.vectors
+            return _cache_collection(collection_name, vectors.size, vectors.distance, vector_size)
+        try:
+            await client.create_collection(collection_name=collection_name, **collection_options(vector_size))
+        except Exception as e:
+            if not _is_already_exists(e):
+                raise
+        for field_name in PAYLOAD_INDEXES:
+            await _create_payload_index(client, collection_name, field_name)
+        return _cache_collection(collection_name, vector_size, qmodels.Distance.COSINE, vector_size)
+
+def forget_collection(collection_name: str):
+    """캐시된 컬렉션 설정 제거 (외부에서 삭제/재생성된 경우)"""
+    with _collections_lock:
+        _collections.pop(collection_name, None)
+
+def get_collection_stats(collection_name: str = "notes") -> Dict:
+    """모니터링용 포인트 수와 인덱스 상태"""
+    try:
+        info = qdrant_client.get_collection(collection_name=collection_name)
+    except Exception as e:
+        if _is_not_found(e):
+            forget_collection(collection_name)
+            return {"collection": collection_name, "exists": False}
+        raise
+    return {
+        "collection": collection_name,
+        "exists": True,
+        "status": str(info.status),
+        "optimizer_status": str(info.optimizer_status),
+        "points_count": info.points_count,
+        "indexed_vectors_count": info.indexed_vectors_count,
+        "segments_count": info.segments_count,
+        "payload_indexes": sorted(info.payload_schema or {}),
+        "vectors_on_disk": bool(info.config.params.vectors.on_disk),
+        "quantization": type(info.config.quantization_config).__name__ if info.config.quantization_config else None,
+        "hnsw": {"m": info.config.hnsw_config.m, "ef_construct": info.config.hnsw_config.ef_construct},
+        "cached_config": _collections.get(collection_name),
+    }
+
+def _as_list(vector: Vector) -> List[float]:
+    return vector.tolist() if isinstance(vector, np.ndarray) else list(vector)
+
+def insert_vectors(
+    collection_name: str,
+    vectors: Union[np.ndarray, List[List[float]]],
+    ids: List[PointId],
+    note_ids: List[int],
+    contents: List[str],
+    chunk_indexes: Optional[List[int]] = None,
+    chunk_hashes: Optional[List[str]] = None,
+    metadata: Optional[Dict] = None,
+) -> Dict:
+    payloads = build_payloads(note_ids, contents, chunk_indexes, chunk_hashes, metadata)
+    return upsert_points(collection_name, vectors, ids, payloads)
+
+async def ainsert_vectors(
+    collection_name: str,
+    vectors: Union[np.ndarray, List[List[float]]],
+    ids: List[PointId],
+    note_ids: List[int],
+    contents: List[str],
+    chunk_indexes: Optional[List[int]] = None,
+    chunk_hashes: Optional[List[str]] = None,
+    metadata: Optional[Dict] = None,
+) -> Dict:
+    payloads = build_payloads(note_ids, contents, chunk_indexes, chunk_hashes, metadata)
+    return await aupsert_points(collection_name, vectors, ids, payloads)
+
+_upsert_executor = ThreadPoolExecutor(
+    max_workers=max(1, QDRANT_UPSERT_PARALLEL), thread_name_prefix="qdrant-upsert"
+)
+
+def _upsert_batch(collection_name: str, batch: qmodels.Batch, max_retries: int) -> int:
+    """배치 하나를 업서트하고 재시도 횟수 반환 (포인트 id 가 결정적이므로 재전송해도 중복되지 않음)"""
+    for attempt in range(max_retries + 1):
+        try:
+            qdrant_client.upsert(collection_name=collection_name, points=batch, wait=True)
+            return attempt
+        except Exception as e:
+            if _is_not_found(e):
+                # 캐시 이후 컬렉션이 삭제된 경우에만 다시 확인/생성
+                forget_collection(collection_name)
+                ensure_collection(collection_name)
+            elif not _is_retryable(e):
+                raise
+            if attempt == max_retries:
+                raise
+            delay = min(0.2 * 2 ** attempt, 5.0)
+            logger.warning(f"Qdrant upsert failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def _make_batch(vectors: np.ndarray, ids: List[PointId], payloads: List[Dict], start: int, batch_size: int) -> qmodels.Batch:
+    end = start + batch_size
+    return qmodels.Batch(
+        ids=list(ids[start:end]),
+        vectors=vectors[start:end].tolist(),
+        payloads=payloads[start:end],
+    )
+
+def upsert_points(
+    collection_name: str,
+    vectors: Union[np.ndarray, List[List[float]]],
+    ids: List[PointId],
+    payloads: List[Dict],
+    batch_size: int = QDRANT_UPSERT_BATCH_SIZE,
+    max_retries: int = QDRANT_UPSERT_MAX_RETRIES,
+) -> Dict:
+    """포인트를 크기 제한 배치로 나눠 병렬 업서트하고 처리량 통계 반환"""
+    # 컬렉션 확인은 처음 한 번만 (이후에는 캐시된 설정 사용)
+    ensure_collection(collection_name)
+    # float32 행렬을 그대로 유지하고, 요청 직렬화에 필요한 리스트 변환은 배치 단위로만 수행
+    vectors = np.asarray(vectors, dtype=np.float32)
+    started = time.perf_counter()
+
+    def send(start: int) -> int:
+        return _upsert_batch(collection_name, _make_batch(vectors, ids, payloads, start, batch_size), max_retries)
+
+    starts = list(range(0, len(ids), batch_size))
+    retries = 0
     try:
-        qdrant_client.get_collection(collection_name=collection_name)
+        if len(starts) <= 1:
+            retries = sum(send(start) for start in starts)
+        else:
+            for attempt_retries in _upsert_executor.map(send, starts):
+                retries += attempt_retries
     except Exception:
-        qdrant_client.recreate_collection(
-            collection_name=collection_name,
-            vectors_config=qmodels.VectorParams(size=1024, distance="Cosine")
-        )
-    points = []
-    for idx, (vec, note_id, content) in enumerate(zip(vectors, note_ids, contents)):
-        points.append(qmodels.PointStruct(
-            id=ids[idx],
-            vector=vec,
-            payload={"note_id": note_id, "content": content}
+        upsert_stats.record(len(ids), len(starts), retries, time.perf_counter() - started, failed=True)
+        raise
+
+    return upsert_stats.result(len(ids), len(starts), retries, time.perf_counter() - started)
+
+async def _aupsert_batch(collection_name: str, batch: qmodels.Batch, max_retries: int) -> int:
+    client = get_async_client()
+    for attempt in range(max_retries + 1):
+        try:
+            await client.upsert(collection_name=collection_name, points=batch, wait=True)
+            return attempt
+        except Exception as e:
+            if _is_not_found(e):
+                forget_collection(collection_name)
+                await aensure_collection(collection_name)
+            elif not _is_retryable(e):
+                raise
+            if attempt == max_retries:
+                raise
+            delay = min(0.2 * 2 ** attempt, 5.0)
+            logger.warning(f"Qdrant upsert failed ({e}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+async def aupsert_points(
+    collection_name: str,
+    vectors: Union[np.ndarray, List[List[float]]],
+    ids: List[PointId],
+    payloads: List[Dict],
+    batch_size: int = QDRANT_UPSERT_BATCH_SIZE,
+    max_retries: int = QDRANT_UPSERT_MAX_RETRIES,
+) -> Dict:
+    """upsert_points 의 비동기 버전 (동시 요청 수는 QDRANT_UPSERT_PARALLEL 로 제한)"""
+    await aensure_collection(collection_name)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, QDRANT_UPSERT_PARALLEL))
+
+    async def send(start: int) -> int:
+        async with semaphore:
+            return await _aupsert_batch(collection_name, _make_batch(vectors, ids, payloads, start, batch_size), max_retries)
+
+    starts = list(range(0, len(ids), batch_size))
+    try:
+        retries = sum(await asyncio.gather(*(send(start) for start in starts)))
+    except Exception:
+        upsert_stats.record(len(ids), len(starts), 0, time.perf_counter() - started, failed=True)
+        raise
+    return upsert_stats.result(len(ids), len(starts), retries, time.perf_counter() - started)
+
+def build_search_filter(
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Optional[qmodels.Filter]:
+    """사용자/카테고리/작성일 범위 조건 (인덱스된 필드만 사용, 조건이 없으면 None)"""
+    must = []
+    if user_id is not None:
+        must.append(qmodels.FieldCondition(key="user_id", match=qmodels.MatchValue(value=user_id)))
+    if category is not None:
+        must.append(qmodels.FieldCondition(key="category", match=qmodels.MatchValue(value=category)))
+    if created_from is not None or created_to is not None:
+        must.append(qmodels.FieldCondition(
+            key="created_at",
+            range=qmodels.DatetimeRange(gte=created_from, lte=created_to),
         ))
-    qdrant_client.upsert(collection_name=collection_name, points=points)
+    return qmodels.Filter(must=must) if must else None
+
+def _format_hits(response: qmodels.QueryResponse) -> List[Dict]:
+    return [format_hit(hit.payload, hit.score, hit.vector) for hit in response.points]
+
+def search_similar(
+    collection_name: str,
+    query_vector: Vector,
+    top_k: int = 5,
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    with_vectors: bool = False,
+):
+    """유사도 검색. 조건은 검색 중에 payload 인덱스로 적용된다 (top-k 이후 후처리 필터가 아님)
+
+    with_vectors=True 면 결과에 저장된 청크 벡터도 담는다 (채팅 컨텍스트의 MMR 용).
+    """
+    result = qdrant_client.query_points(
+        collection_name=collection_name,
+        query=_as_list(query_vector),
+        query_filter=build_search_filter(user_id, category, created_from, created_to),
+        search_params=search_params(),
+        limit=top_k,
+        with_payload=True,
+        with_vectors=with_vectors,
+    )
+    return _format_hits(result)
 
-def search_similar(collection_name: str, query_vector: List[float], top_k: int = 5):
-    result = qdrant_client.search(
+async def asearch_similar(
+    collection_name: str,
+    query_vector: Vector,
+    top_k: int = 5,
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    with_vectors: bool = False,
+):
+    """이벤트 루프를 막지 않는 유사도 검색"""
+    result = await get_async_client().query_points(
         collection_name=collection_name,
-        query_vector=query_vector,
+        query=_as_list(query_vector),
+        query_filter=build_search_filter(user_id, category, created_from, created_to),
+        search_params=search_params(),
         limit=top_k,
-        with_payload=True
+        with_payload=True,
+        with_vectors=with_vectors,
     )
+    return _format_hits(result)
+
+def _query_requests(
+    query_vectors: List[Vector], top_k: int, filters: Dict, with_vectors: bool = False
+) -> List[qmodels.QueryRequest]:
+    query_filter = build_search_filter(**filters)
+    params = search_params()
     return [
-        {
-            "note_id": hit.payload.get("note_id"),
-            "content": hit.payload.get("content"),
-            "score": hit.score
-        }
-        for hit in result
+        qmodels.QueryRequest(
+            query=_as_list(vector), filter=query_filter, params=params, limit=top_k,
+            with_payload=True, with_vector=with_vectors,
+        )
+        for vector in query_vectors
     ]
 
+def search_similar_batch(
+    collection_name: str,
+    query_vectors: List[Vector],
+    top_k: int = 5,
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    with_vectors: bool = False,
+) -> List[List[Dict]]:
+    """여러 질의 벡터를 query_batch_points 한 번의 요청으로 검색"""
+    if not len(query_vectors):
+        return []
+    filters = {"user_id": user_id, "category": category, "created_from": created_from, "created_to": created_to}
+    results = qdrant_client.query_batch_points(
+        collection_name=collection_name, requests=_query_requests(query_vectors, top_k, filters, with_vectors)
+    )
+    return [_format_hits(result) for result in results]
+
+async def asearch_similar_batch(
+    collection_name: str,
+    query_vectors: List[Vector],
+    top_k: int = 5,
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    with_vectors: bool = False,
+) -> List[List[Dict]]:
+    """search_similar_batch 의 비동기 버전"""
+    if not len(query_vectors):
+        return []
+    filters = {"user_id": user_id, "category": category, "created_from": created_from, "created_to": created_to}
+    results = await get_async_client().query_batch_points(
+        collection_name=collection_name, requests=_query_requests(query_vectors, top_k, filters, with_vectors)
+    )
+    return [_format_hits(result) for result in results]
+
+def _text_condition(term: str) -> qmodels.FieldCondition:
+    return qmodels.FieldCondition(key="content", match=qmodels.MatchText(text=term))
+
+def _keyword_requests(terms: List[str], top_k: int, filters: Dict):
+    """키워드 검색에 필요한 범위 필터, 검색어별 문서 빈도 필터, 후보 조회 필터"""
+    base = build_search_filter(**filters)
+    must = list(base.must) if base else []
+    term_filters = [qmodels.Filter(must=must + [_text_condition(term)]) for term in terms]
+    candidate_filter = qmodels.Filter(must=must or None, should=[_text_condition(term) for term in terms])
+    return base, term_filters, candidate_filter, max(QDRANT_KEYWORD_MAX_CANDIDATES, top_k)
+
+def _warn_truncated(collection_name: str, query: str, limit: int):
+    logger.warning(
+        f"Keyword search in '{collection_name}' matched more than {limit} chunks for {query!r}; "
+        f"only the first {limit} by point id were scored (raise QDRANT_KEYWORD_MAX_CANDIDATES)"
+    )
+
+def _scroll_candidates(collection_name: str, candidate_filter: qmodels.Filter, limit: int):
+    """검색어가 들어간 청크를 limit 개까지 페이지 단위로 모두 읽음 (limit 에서 잘렸으면 truncated=True)"""
+    records, offset = [], None
+    while len(records) < limit:
+        page, offset = qdrant_client.scroll(
+            collection_name, scroll_filter=candidate_filter, offset=offset,
+            limit=min(QDRANT_KEYWORD_CANDIDATES, limit - len(records)), with_payload=["note_id", "content"],
+        )
+        records.extend(page)
+        if offset is None:
+            return records, False
+    return records, True
+
+async def _ascroll_candidates(collection_name: str, candidate_filter: qmodels.Filter, limit: int):
+    """_scroll_candidates 의 비동기 버전"""
+    records, offset = [], None
+    while len(records) < limit:
+        page, offset = await get_async_client().scroll(
+            collection_name, scroll_filter=candidate_filter, offset=offset,
+            limit=min(QDRANT_KEYWORD_CANDIDATES, limit - len(records)), with_payload=["note_id", "content"],
+        )
+        records.extend(page)
+        if offset is None:
+            return records, False
+    return records, True
+
+def keyword_search(
+    collection_name: str,
+    query: str,
+    top_k: int = 5,
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    terms: Optional[List[str]] = None,
+) -> List[Dict]:
+    """본문 전문 인덱스로 검색어가 들어간 청크를 찾고 BM25 로 점수 계산
+
+    문서 빈도는 필터 범위 전체에서 count 로 구하고, 점수는 검색어가 들어간 청크를 페이지 단위로 모두 읽어
+    (최대 QDRANT_KEYWORD_MAX_CANDIDATES 개) 계산한다. terms 는 미리 계산한 keyword_terms(query) 이다.
+    """
+    if terms is None:
+        terms = keyword_terms(query)
+    if not terms:
+        return []
+    filters = {"user_id": user_id, "category": category, "created_from": created_from, "created_to": created_to}
+    base, term_filters, candidate_filter, limit = _keyword_requests(terms, top_k, filters)
+    total = qdrant_client.count(collection_name, count_filter=base, exact=True).count
+    doc_freqs = {
+        term: qdrant_client.count(collection_name, count_filter=term_filter, exact=True).count
+        for term, term_filter in zip(terms, term_filters)
+    }
+    records, truncated = _scroll_candidates(collection_name, candidate_filter, limit)
+    if truncated:
+        _warn_truncated(collection_name, query, limit)
+    hits = rank_bm25([record.payload for record in records], terms, doc_freqs, total, top_k)
+    return [format_hit(hit, hit["score"]) for hit in hits]
+
+async def akeyword_search(
+    collection_name: str,
+    query: str,
+    top_k: int = 5,
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    terms: Optional[List[str]] = None,
+) -> List[Dict]:
+    """keyword_search 의 비동기 버전 (count 와 후보 조회를 동시에 요청)"""
+    if terms is None:
+        # Kiwi 형태소 분석(처음 호출 시 모델 로드 포함)이 이벤트 루프를 막지 않도록 스레드에서 실행
+        terms = await asyncio.to_thread(keyword_terms, query)
+    if not terms:
+        return []
+    filters = {"user_id": user_id, "category": category, "created_from": created_from, "created_to": created_to}
+    base, term_filters, candidate_filter, limit = _keyword_requests(terms, top_k, filters)
+    client = get_async_client()
+    counts, (records, truncated) = await asyncio.gather(
+        asyncio.gather(*(
+            client.count(collection_name, count_filter=count_filter, exact=True)
+            for count_filter in [base] + term_filters
+        )),
+        _ascroll_candidates(collection_name, candidate_filter, limit),
+    )
+    if truncated:
+        _warn_truncated(collection_name, query, limit)
+    doc_freqs = {term: result.count for term, result in zip(terms, counts[1:])}
+    hits = rank_bm25([record.payload for record in records], terms, doc_freqs, counts[0].count, top_k)
+    return [format_hit(hit, hit["score"]) for hit in hits]
+
+def _note_filter(note_id: int) -> qmodels.Filter:
+    return qmodels.Filter(
+        must=[qmodels.FieldCondition(
+            key="note_id",
+            match=qmodels.MatchValue(value=note_id)
+        )]
+    )
+
 def delete_vectors(collection_name: str, note_id: int):
     qdrant_client.delete(
         collection_name=collection_name,
-        filter=qmodels.Filter(
-            must=[qmodels.FieldCondition(
-                key="note_id",
-                match=qmodels.MatchValue(value=note_id)
-            )]
+        points_selector=qmodels.FilterSelector(filter=_note_filter(note_id))
+    )
+
+async def adelete_vectors(collection_name: str, note_id: int):
+    await get_async_client().delete(
+        collection_name=collection_name,
+        points_selector=qmodels.FilterSelector(filter=_note_filter(note_id))
+    )
+
+def set_note_metadata(collection_name: str, note_id: int, metadata: Dict):
+    """노트의 모든 포인트에 메타데이터 payload 를 설정 (카테고리 변경 등)"""
+    set_notes_metadata(collection_name, {note_id: metadata})
+
+def set_notes_metadata(collection_name: str, metadata_by_note: Dict[int, Dict]):
+    """여러 노트의 메타데이터 payload 를 한 번의 요청으로 설정 (기존 포인트 backfill)"""
+    if not metadata_by_note:
+        return
+    qdrant_client.batch_update_points(
+        collection_name=collection_name,
+        update_operations=[
+            qmodels.SetPayloadOperation(
+                set_payload=qmodels.SetPayload(payload=note_payload(**metadata), filter=_note_filter(note_id))
+            )
+            for note_id, metadata in metadata_by_note.items()
+        ],
+    )
+
+def get_note_chunks(collection_name: str, note_id: int) -> List[Dict]:
+    """노트에 저장된 청크 포인트의 id, chunk_hash, chunk_index 조회 (벡터 제외)"""
+    chunks = []
+    offset = None
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=_note_filter(note_id),
+            limit=256,
+            offset=offset,
+            with_payload=["chunk_hash", "chunk_index"],
+            with_vectors=False,
+        )
+        for record in records:
+            payload = record.payload or {}
+            chunks.append({
+                "id": record.id,
+                "chunk_hash": payload.get("chunk_hash"),
+                "chunk_index": payload.get("chunk_index"),
+            })
+        if offset is None:
+            return chunks
+
+def delete_points(collection_name: str, ids: List[PointId]):
+    if ids:
+        qdrant_client.delete(
+            collection_name=collection_name,
+            points_selector=qmodels.PointIdsList(points=list(ids))
         )
+
+def update_chunk_indexes(collection_name: str, chunk_indexes: Dict[PointId, int]):
+    """청크 위치만 바뀐 포인트의 chunk_index 를 한 번의 요청으로 갱신"""
+    if not chunk_indexes:
+        return
+    qdrant_client.batch_update_points(
+        collection_name=collection_name,
+        update_operations=[
+            qmodels.SetPayloadOperation(
+                set_payload=qmodels.SetPayload(payload={"chunk_index": index}, points=[point_id])
+            )
+            for point_id, index in chunk_indexes.items()
+        ],
     ) 
\ No newline at end of file
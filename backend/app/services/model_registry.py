@@ -0,0 +1,116 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.services.embedding_backends import load_embedding_backend
+
+logger = logging.getLogger(__name__)
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """현재 프로세스 RSS (Linux 에서만 측정 가능)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _parameter_bytes(model: Any) -> Optional[int]:
+    """torch 모델의 파라미터 메모리 합계"""
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    """프로세스 전역 모델 레지스트리
+
+    모델은 이름별로 한 번만 로드되어 모든 라우터가 공유한다. 처음 사용할 때
+    지연 로드하거나, 시작 시 warmup() 으로 미리 로드할 수 있다.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = load_embedding_backend):
+        self.loader = loader
+        self._models: Dict[str, Any] = {}
+        self._load_info: Dict[str, Dict] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self._warmup_state = "idle"  # idle | warming | ready | failed
+
+    def get(self, name: str) -> Optional[Any]:
+        """모델 반환 (없으면 로드). 로드 실패 시 None"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock_for(name):
+            model = self._models.get(name)
+            # 실패한 모델은 요청마다 다시 로드하지 않는다
+            if model is None and self._load_info.get(name, {}).get("status") != "failed":
+                model = self._load(name)
+            return model
+
+    def warmup(self, names: Iterable[str]) -> bool:
+        """지정한 모델들을 미리 로드. 모두 성공하면 True"""
+        self._warmup_state = "warming"
+        ok = all([self.get(name) is not None for name in names])
+        self._warmup_state = "ready" if ok else "failed"
+        return ok
+
+    def start_warmup(self, names: Iterable[str]) -> threading.Thread:
+        """백그라운드 스레드에서 warmup 실행"""
+        names = list(names)
+        self._warmup_state = "warming"
+        thread = threading.Thread(target=self.warmup, args=(names,), name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def warmup_state(self) -> str:
+        return self._warmup_state
+
+    def is_ready(self) -> bool:
+        """warmup 을 시작하지 않았으면 지연 로드 모드이므로 준비된 것으로 간주"""
+        return self._warmup_state in ("idle", "ready")
+
+    def get_stats(self) -> Dict:
+        """모델별 로드 시간, 메모리 사용량"""
+        return {
+            "warmup_state": self._warmup_state,
+            "models": {name: dict(info) for name, info in self._load_info.items()},
+        }
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._registry_lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _load(self, name: str) -> Optional[Any]:
+        rss_before = _current_rss_bytes()
+        started = time.perf_counter()
+        try:
+            model = self.loader(name)
+        except Exception as e:
+            logger.error(f"Failed to load model {name}: {e}")
+            self._load_info[name] = {"status": "failed", "error": str(e)}
+            return None
+
+        load_seconds = time.perf_counter() - started
+        rss_after = _current_rss_bytes()
+        self._models[name] = model
+        self._load_info[name] = {
+            "status": "loaded",
+            "backend": getattr(model, "name", type(model).__name__),
+            "load_seconds": round(load_seconds, 3),
+            "parameter_bytes": _parameter_bytes(model),
+            "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            "loaded_at": time.time(),
+        }
+        logger.info(f"Model {name} loaded in {load_seconds:.2f}s")
+        return model
+
+
+model_registry = ModelRegistry()
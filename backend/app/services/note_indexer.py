@@ -0,0 +1,151 @@
+import hashlib
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.vector_store import PointId, get_vector_store
+
+
+# 청크 포인트 id 네임스페이스 (uuid5)
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "vector_note/chunk")
+
+
+def chunk_hash(text: str) -> str:
+    """청크 내용 해시 (원문 기준)
+
+    공백만 바뀐 청크도 다른 포인트가 되어야 payload 의 content 가 갱신된다.
+    임베딩 캐시는 정규화된 텍스트로 찾으므로 이런 청크는 모델을 다시 거치지 않는다.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PointIdAllocator:
+    """노트 청크의 결정적 포인트 id 생성기
+
+    id 는 uuid5(note_id, 청크 해시, 같은 해시의 등장 순번) 이다. 청크 위치 대신 등장 순번을 쓰므로
+    앞쪽에 문단이 추가돼도 뒤쪽 청크의 id 가 바뀌지 않고, 같은 내용을 다시 적재하면 같은 id 를 덮어쓴다.
+    여러 배치에 걸쳐 호출하면 등장 순번이 이어진다.
+    """
+
+    def __init__(self, note_id: int):
+        self.note_id = note_id
+        self._seen: Dict[str, int] = defaultdict(int)
+
+    def allocate(self, hashes: List[str]) -> List[str]:
+        ids = []
+        for digest in hashes:
+            occurrence = self._seen[digest]
+            self._seen[digest] += 1
+            ids.append(str(uuid.uuid5(POINT_ID_NAMESPACE, f"{self.note_id}:{digest}:{occurrence}")))
+        return ids
+
+
+def chunk_point_ids(note_id: int, hashes: List[str]) -> List[str]:
+    """노트 전체 청크 해시 목록에 대한 포인트 id"""
+    return PointIdAllocator(note_id).allocate(hashes)
+
+
+def note_metadata(note) -> Dict:
+    """검색 필터에 쓰는 노트 메타데이터 (포인트 payload 에 복사됨)"""
+    return {"user_id": note.user_id, "category": note.category, "created_at": note.created_at}
+
+
+def index_note(
+    note_id: int,
+    chunks: List[str],
+    embeddings: np.ndarray,
+    collection_name: str = "notes",
+    metadata: Optional[Dict] = None,
+) -> Dict:
+    """새 노트의 청크를 벡터 저장소에 저장 (같은 내용을 다시 적재하면 덮어씀)"""
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+    return get_vector_store().insert_vectors(
+        collection_name=collection_name,
+        vectors=embeddings,
+        ids=chunk_point_ids(note_id, hashes),
+        note_ids=[note_id] * len(chunks),
+        contents=chunks,
+        chunk_indexes=list(range(len(chunks))),
+        chunk_hashes=hashes,
+        metadata=metadata,
+    )
+
+
+def plan_chunk_update(
+    existing: List[Dict], new_ids: List[str]
+) -> Tuple[List[int], Dict[PointId, int], List[PointId]]:
+    """저장된 포인트와 새 청크의 포인트 id 를 비교
+
+    반환값: (임베딩이 필요한 새 청크 위치, 위치만 바뀐 포인트의 새 chunk_index, 삭제할 포인트 id)
+    id 가 내용 해시에서 결정되므로 id 가 같으면 내용도 같다.
+    결정적 id 이전에 저장된 포인트(uuid4, 정수 id)는 모두 다시 임베딩된다.
+    """
+    stored = {str(point["id"]): point for point in existing}
+    to_embed: List[int] = []
+    reindex: Dict[PointId, int] = {}
+    for index, point_id in enumerate(new_ids):
+        point = stored.pop(point_id, None)
+        if point is None:
+            to_embed.append(index)
+        elif point.get("chunk_index") != index:
+            reindex[point["id"]] = index
+    to_delete = [point["id"] for point in stored.values()]
+    return to_embed, reindex, to_delete
+
+
+class TruncatedContentError(ValueError):
+    """본문 앞부분만 저장된 노트의 본문을 수정하려는 경우"""
+
+
+def content_to_reindex(note, cleaned: str, clean_fn: Callable[[str], str]) -> Optional[str]:
+    """수정 요청 본문 중 다시 색인해야 하는 본문 (바뀌지 않았으면 None)
+
+    스트리밍 적재 노트(content_truncated)는 DB 에 파일 앞부분만 있고 청크는 파일 전체 기준이다.
+    받은 본문을 그대로 돌려보낸 경우는 변경 없음으로 보고, 실제 수정은 나머지 청크가 지워지므로 거부한다.
+    """
+    if cleaned == note.content:
+        return None
+    if note.content_truncated:
+        if cleaned == clean_fn(note.content):
+            return None
+        raise TruncatedContentError("Content of a truncated file note cannot be edited. Upload the file again instead.")
+    return cleaned
+
+
+def reindex_note(
+    note_id: int,
+    chunks: List[str],
+    embedding_service,
+    collection_name: str = "notes",
+    metadata: Optional[Dict] = None,
+) -> Dict[str, int]:
+    """노트 내용 변경 시 바뀐 청크만 다시 임베딩하고 영향받은 포인트만 갱신"""
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+    ids = chunk_point_ids(note_id, hashes)
+    store = get_vector_store()
+    existing = store.get_note_chunks(collection_name, note_id)
+    to_embed, reindex, to_delete = plan_chunk_update(existing, ids)
+
+    if to_embed:
+        embeddings = embedding_service.get_embeddings([chunks[i] for i in to_embed])
+        store.insert_vectors(
+            collection_name=collection_name,
+            vectors=embeddings,
+            ids=[ids[i] for i in to_embed],
+            note_ids=[note_id] * len(to_embed),
+            contents=[chunks[i] for i in to_embed],
+            chunk_indexes=to_embed,
+            chunk_hashes=[hashes[i] for i in to_embed],
+            metadata=metadata,
+        )
+    store.update_chunk_indexes(collection_name, reindex)
+    store.delete_points(collection_name, to_delete)
+
+    return {
+        "embedded": len(to_embed),
+        "reused": len(chunks) - len(to_embed),
+        "reindexed": len(reindex),
+        "deleted": len(to_delete),
+    }
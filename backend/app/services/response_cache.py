@@ -0,0 +1,235 @@
+import hashlib
+import itertools
+import threading
+import time
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+import numpy as np
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.services.embedding_service import get_embedding_service
+from app.services.gemini_service import ERROR_MESSAGE
+
+
+def chunk_key(hit: Dict) -> tuple:
+    """검색 결과 청크 식별자 (검색 결과에는 포인트 id 가 없어 노트 id + 본문 해시를 쓴다)"""
+    content = (hit.get("content") or "").encode("utf-8")
+    return hit["note_id"], hashlib.blake2b(content, digest_size=8).hexdigest()
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class _EntryCache(TTLCache):
+    """TTL 만료나 LRU 로 빠지는 항목을 on_remove 로 알려주는 TTLCache"""
+
+    def __init__(self, maxsize: int, ttl: float, on_remove):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_remove = on_remove
+
+    def popitem(self):
+        entry_id, entry = super().popitem()
+        self._on_remove(entry_id, entry)
+        return entry_id, entry
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for entry_id, entry in expired:
+            self._on_remove(entry_id, entry)
+        return expired
+
+
+class ResponseCache:
+    """비슷한 질문에 대한 Gemini 답변 캐시
+
+    같은 사용자, 같은 검색 청크 집합, 같은 모델 설정 안에서 질의 임베딩의 cosine 유사도가
+    임계값 이상인 이전 답변을 다시 스트리밍한다. 출처 노트가 수정/삭제되면 그 노트를 쓴 답변을 지우고,
+    생성 중에 출처 노트가 바뀐 답변은 저장하지 않는다.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, similarity: float):
+        self.similarity = similarity
+        self._entries = _EntryCache(max_entries, ttl_seconds, self._forget)
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._by_note: Dict[int, Set[int]] = {}
+        self._note_generations: Dict[int, int] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.invalidations = 0
+        self.saved_ms = 0.0
+
+    def cacheable(self, history: List[Dict], summary: Optional[str]) -> bool:
+        """이전 대화에 기대는 후속 질문은 같은 문장이라도 답이 달라서 기본적으로 캐시하지 않는다"""
+        return settings.RESPONSE_CACHE_WITH_HISTORY or (not history and not summary)
+
+    def _bucket(self, user_id: int, hits: List[Dict], config_key: tuple) -> tuple:
+        return user_id, frozenset(chunk_key(hit) for hit in hits), config_key
+
+    def lookup(self, user_id: int, query_vector, hits: List[Dict], config_key: tuple) -> Optional[Dict]:
+        """가장 비슷한 캐시 답변 (임계값 미만이면 None)"""
+        query = _unit(query_vector)
+        with self._lock:
+            ids = [entry_id for entry_id in self._buckets.get(self._bucket(user_id, hits, config_key), []) if entry_id in self._entries]
+            best = None
+            if ids:
+                entries = [self._entries[entry_id] for entry_id in ids]
+                scores = np.stack([entry["vector"] for entry in entries]) @ query
+                index = int(np.argmax(scores))
+                if scores[index] >= self.similarity:
+                    best = entries[index]
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_ms += best["generation_ms"]
+            return best
+
+    def note_generations(self, hits: List[Dict]) -> Dict[int, int]:
+        with self._lock:
+            return {hit["note_id"]: self._note_generations.get(hit["note_id"], 0) for hit in hits}
+
+    def store(
+        self,
+        user_id: int,
+        query_vector,
+        hits: List[Dict],
+        config_key: tuple,
+        answer: str,
+        generation_ms: float,
+        generations: Dict[int, int],
+    ):
+        with self._lock:
+            # 생성 중에 출처 노트가 바뀌었으면 저장하지 않음
+            if any(self._note_generations.get(note_id, 0) != generation for note_id, generation in generations.items()):
+                return
+            entry_id = next(self._ids)
+            bucket = self._bucket(user_id, hits, config_key)
+            self._entries[entry_id] = {
+                "vector": _unit(query_vector),
+                "answer": answer,
+                "generation_ms": generation_ms,
+                "bucket": bucket,
+                "note_ids": list(generations),
+            }
+            self._buckets.setdefault(bucket, []).append(entry_id)
+            for note_id in generations:
+                self._by_note.setdefault(note_id, set()).add(entry_id)
+
+    def _forget(self, entry_id: int, entry: Dict):
+        """캐시에서 빠진 항목을 버킷/노트 색인에서도 지움 (빈 버킷과 빈 노트 집합은 없앤다, 잠금 안에서 호출)"""
+        ids = self._buckets.get(entry["bucket"])
+        if ids is not None:
+            if entry_id in ids:
+                ids.remove(entry_id)
+            if not ids:
+                del self._buckets[entry["bucket"]]
+        for note_id in entry["note_ids"]:
+            entry_ids = self._by_note.get(note_id)
+            if entry_ids is not None:
+                entry_ids.discard(entry_id)
+                if not entry_ids:
+                    del self._by_note[note_id]
+
+    def invalidate_note(self, note_id: int):
+        """노트 본문이 바뀌거나 삭제되었을 때 호출"""
+        with self._lock:
+            self._note_generations[note_id] = self._note_generations.get(note_id, 0) + 1
+            for entry_id in list(self._by_note.get(note_id, ())):
+                entry = self._entries.pop(entry_id, None)
+                if entry is not None:
+                    self._forget(entry_id, entry)
+            # 이미 만료됐지만 아직 정리되지 않은 항목은 다음 expire 때 나머지 색인에서 빠진다
+            self._by_note.pop(note_id, None)
+            self.invalidations += 1
+
+    async def astream(
+        self,
+        gemini_service,
+        user_id: int,
+        hits: List[Dict],
+        history: List[Dict],
+        question: str,
+        context: str,
+        summary: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """캐시에 비슷한 질문의 답변이 있으면 그것을, 없으면 Gemini 스트림을 흘려보내고 완성된 답변을 저장"""
+        if not hits or not self.cacheable(history, summary):
+            with self._lock:
+                self.skipped += 1
+            async for chunk in gemini_service.agenerate_chat_response(history, question, context, summary):
+                yield chunk
+            return
+
+        # 채팅 검색에서 이미 임베딩한 질문이라 쿼리 임베딩 캐시에서 바로 나온다
+        query_vector = await get_embedding_service().aembed_query(question)
+        config_key = gemini_service.config_key()
+        cached = self.lookup(user_id, query_vector, hits, config_key)
+        if cached is not None:
+            answer = cached["answer"]
+            step = max(1, settings.RESPONSE_CACHE_STREAM_CHARS)
+            for start in range(0, len(answer), step):
+                yield answer[start:start + step]
+            return
+
+        generations = self.note_generations(hits)
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in gemini_service.agenerate_chat_response(history, question, context, summary):
+            chunks.append(chunk)
+            yield chunk
+        answer = "".join(chunks)
+        if answer.strip() and ERROR_MESSAGE not in answer:
+            generation_ms = (time.perf_counter() - started) * 1000
+            self.store(user_id, query_vector, hits, config_key, answer, generation_ms, generations)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+                "similarity": self.similarity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "latency_saved_ms": self.saved_ms,
+                "invalidations": self.invalidations,
+            }
+
+
+class _DisabledResponseCache(ResponseCache):
+    """RESPONSE_CACHE_ENABLED=false 일 때 (항상 Gemini 로 생성)"""
+
+    async def astream(self, gemini_service, user_id, hits, history, question, context, summary=None):
+        async for chunk in gemini_service.agenerate_chat_response(history, question, context, summary):
+            yield chunk
+
+    def get_stats(self) -> Dict:
+        return {**super().get_stats(), "enabled": False}
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                cls = ResponseCache if settings.RESPONSE_CACHE_ENABLED else _DisabledResponseCache
+                _response_cache = cls(
+                    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+                    similarity=settings.RESPONSE_CACHE_SIMILARITY,
+                )
+    return _response_cache
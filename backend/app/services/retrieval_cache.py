@@ -0,0 +1,172 @@
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from cachetools import TTLCache
+
+from app.core.config import settings
+
+# 캐시 항목 하나의 고정 비용 추정치 (키, dict, 점수 등)
+_ENTRY_OVERHEAD_BYTES = 256
+_HIT_OVERHEAD_BYTES = 200
+
+
+def _hits_size(hits: List[Dict]) -> int:
+    """검색 결과의 대략적인 메모리 크기 (본문 글자당 최대 4바이트, 벡터가 있으면 그 크기도)"""
+    return _ENTRY_OVERHEAD_BYTES + sum(
+        _HIT_OVERHEAD_BYTES + 4 * len(hit.get("content") or "") + (hit["vector"].nbytes if "vector" in hit else 0)
+        for hit in hits
+    )
+
+
+def vector_key(query_vector) -> str:
+    """질의 벡터의 해시 (같은 질문은 쿼리 임베딩 캐시 덕분에 같은 벡터가 된다)"""
+    vector = np.ascontiguousarray(query_vector, dtype=np.float32)
+    return hashlib.blake2b(vector.tobytes(), digest_size=16).hexdigest()
+
+
+def _filter_key(filters: Dict) -> tuple:
+    return tuple(
+        (name, value.isoformat() if isinstance(value, datetime) else value)
+        for name, value in sorted(filters.items())
+        if value is not None
+    )
+
+
+class RetrievalCache:
+    """사용자별 벡터 검색 결과 캐시 (TTL + 메모리 한도 LRU)
+
+    키는 (user_id, 사용자 세대, 컬렉션, 질의 벡터 해시, 필터, top_k, 벡터 포함 여부) 이다. 사용자의 노트가 바뀌면 세대를 올리고
+    그 사용자의 항목만 지우므로, 변경 전에 시작된 검색이 끝나면서 넣는 결과도 다시 읽히지 않는다.
+    무효화는 프로세스 안에서만 일어나므로 여러 워커에서는 다른 워커의 변경이 TTL 까지 늦게 반영될 수 있다.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: int):
+        self._cache = TTLCache(maxsize=max_bytes, ttl=ttl_seconds, getsizeof=_hits_size)
+        self._lock = threading.Lock()
+        self._generations: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _key(
+        self, collection_name: str, user_id: int, query_vector, top_k: int, filters: Dict, with_vectors: bool
+    ) -> tuple:
+        return (
+            user_id, self._generations.get(user_id, 0), collection_name,
+            vector_key(query_vector), _filter_key(filters), top_k, with_vectors,
+        )
+
+    def get(self, collection_name: str, user_id: int, query_vector, top_k: int, with_vectors: bool = False, **filters):
+        """(키, 결과) 반환. 결과가 None 이면 검색 후 같은 키로 put 한다."""
+        with self._lock:
+            key = self._key(collection_name, user_id, query_vector, top_k, filters, with_vectors)
+            hits = self._cache.get(key)
+            if hits is None:
+                self.misses += 1
+                return key, None
+            self.hits += 1
+        # 호출하는 쪽이 결과를 고쳐도 캐시가 바뀌지 않도록 복사본을 준다
+        return key, [dict(hit) for hit in hits]
+
+    def put(self, key: tuple, hits: List[Dict]):
+        with self._lock:
+            # 검색 중에 무효화된 사용자의 결과는 넣지 않는다
+            if key[1] != self._generations.get(key[0], 0):
+                return
+            try:
+                self._cache[key] = [dict(hit) for hit in hits]
+            except ValueError:
+                # 한도보다 큰 결과는 캐시하지 않음
+                pass
+
+    def invalidate_user(self, user_id: int):
+        """사용자의 노트가 추가/수정/삭제되었을 때 호출"""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for key in [key for key in self._cache.keys() if key[0] == user_id]:
+                self._cache.pop(key, None)
+            self.invalidations += 1
+
+    def search(
+        self, store, collection_name: str, query_vector, top_k: int, user_id: int, with_vectors: bool = False, **filters
+    ) -> List[Dict]:
+        key, hits = self.get(collection_name, user_id, query_vector, top_k, with_vectors, **filters)
+        if hits is None:
+            hits = store.search_similar(
+                collection_name, query_vector, top_k, user_id=user_id, with_vectors=with_vectors, **filters
+            )
+            self.put(key, hits)
+        return hits
+
+    async def asearch(
+        self, store, collection_name: str, query_vector, top_k: int, user_id: int, with_vectors: bool = False, **filters
+    ) -> List[Dict]:
+        key, hits = self.get(collection_name, user_id, query_vector, top_k, with_vectors, **filters)
+        if hits is None:
+            hits = await store.asearch_similar(
+                collection_name, query_vector, top_k, user_id=user_id, with_vectors=with_vectors, **filters
+            )
+            self.put(key, hits)
+        return hits
+
+    async def asearch_batch(
+        self, store, collection_name: str, query_vectors, top_k: int, user_id: int, with_vectors: bool = False, **filters
+    ) -> List[List[Dict]]:
+        """캐시에 없는 질의 벡터만 모아 한 번의 배치 검색으로 조회"""
+        lookups = [self.get(collection_name, user_id, vector, top_k, with_vectors, **filters) for vector in query_vectors]
+        missing = [i for i, (_, hits) in enumerate(lookups) if hits is None]
+        results = [hits for _, hits in lookups]
+        if missing:
+            searched = await store.asearch_similar_batch(
+                collection_name, [query_vectors[i] for i in missing], top_k,
+                user_id=user_id, with_vectors=with_vectors, **filters,
+            )
+            for i, hits in zip(missing, searched):
+                self.put(lookups[i][0], hits)
+                results[i] = hits
+        return results
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "items": len(self._cache),
+                "bytes": self._cache.currsize,
+                "max_bytes": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+class _DisabledRetrievalCache(RetrievalCache):
+    """RETRIEVAL_CACHE_ENABLED=false 일 때 (항상 미스, 저장하지 않음)"""
+
+    def get(self, collection_name, user_id, query_vector, top_k, with_vectors=False, **filters):
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def put(self, key, hits):
+        pass
+
+
+_retrieval_cache: Optional[RetrievalCache] = None
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        with _retrieval_cache_lock:
+            if _retrieval_cache is None:
+                cls = RetrievalCache if settings.RETRIEVAL_CACHE_ENABLED else _DisabledRetrievalCache
+                _retrieval_cache = cls(
+                    max_bytes=settings.RETRIEVAL_CACHE_MAX_MB * 1024 * 1024,
+                    ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+                )
+    return _retrieval_cache
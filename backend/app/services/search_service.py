@@ -0,0 +1,121 @@
+import asyncio
+import html
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.embedding_service import get_embedding_service
+from app.services.keyword_search import keyword_terms
+from app.services.retrieval_cache import get_retrieval_cache
+from app.services.vector_store import get_vector_store
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[Dict]], k: int = 60) -> List[Dict]:
+    """검색 방식별 청크 순위를 RRF(점수 = Σ 1 / (k + 순위))로 합친다
+
+    같은 청크는 (note_id, content) 로 식별하고, 결과 청크에는 fused score 와 찾은 방식 목록(sources)이 붙는다.
+    """
+    fused: Dict[tuple, Dict] = {}
+    for source, hits in rankings.items():
+        for rank, hit in enumerate(hits, start=1):
+            key = (hit["note_id"], hit["content"])
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {"note_id": hit["note_id"], "content": hit["content"], "score": 0.0, "sources": []}
+            entry["score"] += 1.0 / (k + rank)
+            if source not in entry["sources"]:
+                entry["sources"].append(source)
+    return sorted(fused.values(), key=lambda hit: hit["score"], reverse=True)
+
+
+def group_by_note(hits: List[Dict]) -> List[Dict]:
+    """점수순 청크를 노트 단위로 묶음 (노트 점수는 가장 높은 청크 점수, 청크는 점수순 유지)"""
+    notes: Dict[int, Dict] = {}
+    for hit in hits:
+        note = notes.get(hit["note_id"])
+        if note is None:
+            note = notes[hit["note_id"]] = {"note_id": hit["note_id"], "score": hit["score"], "sources": [], "chunks": []}
+        note["chunks"].append(hit)
+        for source in hit["sources"]:
+            if source not in note["sources"]:
+                note["sources"].append(source)
+    return list(notes.values())
+
+
+def make_snippet(content: str, terms: List[str], max_chars: int = 160) -> str:
+    """첫 번째 검색어 주변을 잘라 HTML 이스케이프하고 검색어를 <mark> 로 감싼 스니펫 (검색어가 없으면 앞부분)"""
+    content = content or ""
+    pattern = None
+    if terms:
+        alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+        pattern = re.compile(alternatives, re.IGNORECASE)
+    match = pattern.search(content) if pattern else None
+    start = max(0, match.start() - max_chars // 3) if match else 0
+    end = min(len(content), start + max_chars)
+    snippet = content[start:end]
+    if pattern:
+        parts = []
+        last = 0
+        for found in pattern.finditer(snippet):
+            parts.append(html.escape(snippet[last:found.start()]))
+            parts.append(f"<mark>{html.escape(found.group())}</mark>")
+            last = found.end()
+        parts.append(html.escape(snippet[last:]))
+        snippet = "".join(parts)
+    else:
+        snippet = html.escape(snippet)
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(content) else "")
+
+
+async def _timed(coro, timings: Dict[str, float], name: str):
+    started = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+
+
+async def hybrid_search(
+    query: str,
+    user_id: int,
+    candidates: int,
+    category: Optional[str] = None,
+    collection_name: str = "notes",
+) -> Dict:
+    """벡터 검색과 BM25 키워드 검색을 동시에 실행하고 RRF 로 합쳐 노트 단위 결과를 반환
+
+    반환값: {"notes": [{"note_id", "score", "sources", "snippets"}], "timings_ms": {단계별 ms}}
+    노트는 점수순이며 DB 확인(삭제된 노트 제외)과 페이지 나누기는 호출하는 쪽에서 한다.
+    """
+    embedding_service = get_embedding_service()
+    store = get_vector_store()
+    timings: Dict[str, float] = {}
+    filters = {"user_id": user_id, "category": category}
+    started = time.perf_counter()
+
+    async def dense() -> List[Dict]:
+        # 임베딩 모델이 없으면 키워드 검색만 사용
+        if not embedding_service.is_available():
+            return []
+        query_vector = await _timed(embedding_service.aembed_query(query), timings, "embed")
+        dense_search = get_retrieval_cache().asearch(store, collection_name, query_vector, candidates, **filters)
+        return await _timed(dense_search, timings, "dense")
+
+    async def sparse() -> Tuple[List[str], List[Dict]]:
+        # 검색어는 한 번만 분석해서 키워드 검색과 스니펫 강조에 같이 쓴다 (Kiwi 는 이벤트 루프 밖에서)
+        terms = await asyncio.to_thread(keyword_terms, query)
+        return terms, await store.akeyword_search(collection_name, query, candidates, terms=terms, **filters)
+
+    dense_hits, (terms, keyword_hits) = await asyncio.gather(dense(), _timed(sparse(), timings, "keyword"))
+
+    fusion_started = time.perf_counter()
+    notes = group_by_note(
+        reciprocal_rank_fusion({"dense": dense_hits, "keyword": keyword_hits}, k=settings.SEARCH_RRF_K)
+    )
+    for note in notes:
+        chunks = note.pop("chunks")[: settings.SEARCH_SNIPPETS_PER_NOTE]
+        note["snippets"] = [make_snippet(chunk["content"], terms, settings.SEARCH_SNIPPET_CHARS) for chunk in chunks]
+    timings["fusion"] = (time.perf_counter() - fusion_started) * 1000
+    timings["search"] = (time.perf_counter() - started) * 1000
+    return {"notes": notes, "timings_ms": timings}
@@ -0,0 +1,195 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+# 구분자 우선순위 (RecursiveCharacterTextSplitter 기본값과 같음). 구간에 들어 있는 첫 구분자로 나누고,
+# 조각이 여전히 크면 그 조각만 다음 구분자로 나눈다. 빈 문자열은 마지막 수단인 글자 단위 분할을 뜻한다.
+DEFAULT_SEPARATORS: List[str] = ["\n\n", "\n", " ", ""]
+
+# 토큰 하나가 평균적으로 이보다 많은 글자를 담지 않는다고 보고, 아주 긴 구간은 길이 계산 없이 바로 나눈다
+_MAX_CHARS_PER_TOKEN = 8
+
+
+@dataclass
+class Chunk:
+    text: str
+    start: int  # 원문 기준 시작 오프셋 (포함)
+    end: int    # 원문 기준 끝 오프셋 (미포함)
+
+
+class TextChunker:
+    """구분자 우선순위와 overlap 을 지원하는 제너레이터 기반 청커
+
+    RecursiveCharacterTextSplitter(keep_separator=True) 와 같은 방식으로 나눈다. 구분자는 다음 조각의 앞에 붙고,
+    chunk_size 미만인 조각은 같은 단계 안에서 overlap 을 남기며 합치고, 큰 조각만 다음 구분자로 재귀 분할한다.
+    글자 수 기준(기본)에서는 결과가 langchain 과 같고, 청크를 지연 생성하며 원문 오프셋을 함께 돌려준다.
+    length_function 으로 토크나이저 기반 길이를 쓸 수 있다.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        separators: Optional[List[str]] = None,
+        length_function: Callable[[str], int] = len,
+        token_based: bool = False,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators if separators is not None else DEFAULT_SEPARATORS
+        self.length_function = length_function
+        self.token_based = token_based
+
+    def split_text(self, text: str) -> List[str]:
+        return [chunk.text for chunk in self.iter_chunks(text)]
+
+    def iter_chunks(self, text: str, base_offset: int = 0) -> Iterator[Chunk]:
+        """텍스트를 청크로 나눠 하나씩 반환 (오프셋은 base_offset 기준)"""
+        for _, chunk in self._split(text, 0, len(text), self.separators, base_offset, None):
+            yield chunk
+
+    def iter_stream(self, segments: Iterable[str], window: Optional[int] = None) -> Iterator[Chunk]:
+        """이어지는 텍스트 조각 스트림을 청크 (버퍼는 window 글자 + 조각 하나 크기로 제한)
+
+        조각을 이어 붙인 버퍼가 window 를 넘으면 끝부분에 걸린 청크 전까지만 내보내고,
+        아직 확정되지 않은 청크의 재개 위치부터 버퍼를 다시 채운다. 결과는 전체를 한 번에 나눈 것과 같고,
+        오프셋은 스트림 전체 기준이다. 구분자 없이 window 보다 길게 이어지는 구간은 통째로 버퍼에 남는다.
+        """
+        # 버퍼 끝에서 이 거리 안에 끝나는 청크는 다음 조각에 따라 달라질 수 있으므로 보류한다
+        margin = self.chunk_size * (_MAX_CHARS_PER_TOKEN if self.token_based else 1)
+        window = max(window or margin * 8, margin * 2)
+        pending = ""
+        base = 0
+        last = None  # 마지막으로 내보낸 청크의 (start, end). 버퍼를 다시 나눌 때 이미 내보낸 청크는 건너뛴다
+        for segment in segments:
+            pending += segment
+            if len(pending) < window:
+                continue
+            resume = len(pending)
+            for chunk_resume, chunk in self._split(pending, 0, len(pending), self.separators, base, None):
+                if last is not None and (chunk.start, chunk.end) <= last:
+                    continue
+                if chunk.end - base > len(pending) - margin:
+                    resume = chunk_resume - base
+                    break
+                last = (chunk.start, chunk.end)
+                yield chunk
+            base += resume
+            pending = pending[resume:]
+        if pending:
+            for _, chunk in self._split(pending, 0, len(pending), self.separators, base, None):
+                if last is None or (chunk.start, chunk.end) > last:
+                    yield chunk
+
+    def _length(self, text: str, start: int, end: int) -> int:
+        size = end - start
+        if not self.token_based:
+            return size
+        if size > self.chunk_size * _MAX_CHARS_PER_TOKEN:
+            # 토큰 수를 세지 않아도 한도를 넘는다
+            return self.chunk_size
+        return self.length_function(text[start:end])
+
+    def _split(
+        self, text: str, start: int, end: int, separators: List[str], base_offset: int, resume: Optional[int]
+    ) -> Iterator[Tuple[int, Chunk]]:
+        """(재개 위치, 청크) 생성. 재개 위치부터 다시 나누면 이 청크와 이후 청크가 그대로 나온다.
+
+        최상위 단계에서는 합치는 중인 첫 조각의 시작, 큰 조각을 재귀 분할할 때는 그 큰 조각의 시작이다.
+        """
+        # 구간에 들어 있는 첫 구분자를 고른다
+        separator = separators[-1]
+        remaining: List[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = ""
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                remaining = separators[i + 1:]
+                break
+
+        if separator == "":
+            for chunk in self._hard_split(text, start, end, base_offset):
+                yield (base_offset + start) if resume is None else resume, chunk
+            return
+
+        window: Deque[Tuple[int, int, int]] = deque()  # 합치는 중인 조각 (start, end, length)
+        total = 0
+
+        def flush():
+            chunk = self._make_chunk(text, window[0][0], window[-1][1], base_offset)
+            return chunk and ((base_offset + window[0][0]) if resume is None else resume, chunk)
+
+        for seg_start, seg_end in _split_points(text, start, end, separator):
+            length = self._length(text, seg_start, seg_end)
+            if length >= self.chunk_size:
+                # 큰 조각 앞까지 합친 것을 내보내고, 큰 조각은 다음 구분자로 나눈다 (청크가 큰 조각을 넘어 이어지지 않음)
+                if window:
+                    item = flush()
+                    if item:
+                        yield item
+                    window.clear()
+                    total = 0
+                seg_resume = (base_offset + seg_start) if resume is None else resume
+                if remaining:
+                    yield from self._split(text, seg_start, seg_end, remaining, base_offset, seg_resume)
+                else:
+                    chunk = self._make_chunk(text, seg_start, seg_end, base_offset)
+                    if chunk:
+                        yield seg_resume, chunk
+                continue
+            if window and total + length > self.chunk_size:
+                item = flush()
+                if item:
+                    yield item
+                # overlap 길이만큼 뒤쪽 조각을 남기고 다음 청크를 시작
+                while window and (total > self.chunk_overlap or total + length > self.chunk_size):
+                    total -= window.popleft()[2]
+            window.append((seg_start, seg_end, length))
+            total += length
+        if window:
+            item = flush()
+            if item:
+                yield item
+
+    def _hard_split(self, text: str, start: int, end: int, base_offset: int) -> Iterator[Chunk]:
+        """글자 단위 분할. 한 글자씩 합치는 것과 같은 결과(chunk_size 글자 창을 overlap 만큼 겹쳐 이동)를 바로 계산한다."""
+        # 토큰 기준일 때는 글자 수 = 최대 토큰 수이므로 항상 한도 안에 든다
+        step = self.chunk_size - self.chunk_overlap
+        position = start
+        while position < end:
+            stop = min(end, position + self.chunk_size)
+            chunk = self._make_chunk(text, position, stop, base_offset)
+            if chunk:
+                yield chunk
+            if stop >= end:
+                return
+            position += step
+
+    def _make_chunk(self, text: str, start: int, end: int, base_offset: int) -> Optional[Chunk]:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            return None
+        return Chunk(text=text[start:end], start=base_offset + start, end=base_offset + end)
+
+
+def _split_points(text: str, start: int, end: int, separator: str) -> Iterator[Tuple[int, int]]:
+    """구분자 위치에서 구간을 나눔. 구분자는 다음 조각의 앞에 붙고, 빈 조각은 건너뛴다."""
+    position = start
+    search_from = start
+    while True:
+        index = text.find(separator, search_from, end)
+        if index == -1:
+            break
+        if index > position:
+            yield position, index
+            position = index
+        search_from = index + len(separator)
+    if position < end:
+        yield position, end
@@ -0,0 +1,331 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.core.config import settings
+
+Vector = Union[np.ndarray, Sequence[float]]
+PointId = Union[int, str]
+
+
+def note_payload(
+    user_id: Optional[int] = None,
+    category: Optional[str] = None,
+    created_at: Optional[datetime] = None,
+) -> Dict:
+    """필터용 노트 메타데이터 payload (created_at 은 RFC 3339 문자열)"""
+    return {
+        "user_id": user_id,
+        "category": category,
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+    }
+
+
+def build_payloads(
+    note_ids: List[int],
+    contents: List[str],
+    chunk_indexes: Optional[List[int]] = None,
+    chunk_hashes: Optional[List[str]] = None,
+    metadata: Optional[Dict] = None,
+) -> List[Dict]:
+    """포인트 payload 생성. metadata(user_id, category, created_at)는 모든 포인트에 공통으로 들어간다."""
+    common = note_payload(**metadata) if metadata else {}
+    payloads = []
+    for i, (note_id, content) in enumerate(zip(note_ids, contents)):
+        payload = {"note_id": note_id, "content": content, **common}
+        if chunk_indexes is not None:
+            payload["chunk_index"] = chunk_indexes[i]
+        if chunk_hashes is not None:
+            payload["chunk_hash"] = chunk_hashes[i]
+        payloads.append(payload)
+    return payloads
+
+
+def format_hit(payload: Dict, score: float, vector=None) -> Dict:
+    hit = {
+        "note_id": payload.get("note_id"),
+        "content": payload.get("content"),
+        "chunk_index": payload.get("chunk_index"),
+        "score": score,
+    }
+    if vector is not None:
+        hit["vector"] = np.asarray(vector, dtype=np.float32)
+    return hit
+
+
+class UpsertStats:
+    """누적 업서트 통계 (수집 대시보드용)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.points = 0
+        self.batches = 0
+        self.retries = 0
+        self.failures = 0
+        self.seconds = 0.0
+        self.last_points_per_sec = 0.0
+
+    def record(self, points: int, batches: int, retries: int, seconds: float, failed: bool):
+        with self._lock:
+            self.batches += batches
+            self.retries += retries
+            if failed:
+                self.failures += 1
+                return
+            self.points += points
+            self.seconds += seconds
+            if seconds > 0:
+                self.last_points_per_sec = points / seconds
+
+    def result(self, points: int, batches: int, retries: int, seconds: float) -> Dict:
+        """성공한 업서트를 기록하고 호출별 처리량 반환"""
+        self.record(points, batches, retries, seconds, failed=False)
+        return {
+            "points": points,
+            "batches": batches,
+            "retries": retries,
+            "seconds": seconds,
+            "points_per_sec": (points / seconds) if seconds else 0.0,
+        }
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "points": self.points,
+                "batches": self.batches,
+                "retries": self.retries,
+                "failures": self.failures,
+                "points_per_sec": (self.points / self.seconds) if self.seconds else 0.0,
+                "last_points_per_sec": self.last_points_per_sec,
+            }
+
+
+upsert_stats = UpsertStats()
+
+
+class VectorStore(ABC):
+    """노트 청크 벡터 저장소 인터페이스
+
+    포인트 payload 는 note_id, content, chunk_index, chunk_hash 와 필터용 user_id, category, created_at 이다.
+    유사도는 cosine 이며, 검색 결과는 {"note_id", "content", "score"} 목록이다.
+    with_vectors=True 로 검색하면 결과에 저장된 청크 벡터("vector", float32)도 담는다.
+    async 메서드의 기본 구현은 동기 메서드를 스레드에서 실행한다.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def ensure_collection(self, collection_name: str, vector_size: int = settings.EMBEDDING_DIM) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_points(
+        self,
+        collection_name: str,
+        vectors: Union[np.ndarray, List[List[float]]],
+        ids: List[PointId],
+        payloads: List[Dict],
+    ) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def search_similar(
+        self,
+        collection_name: str,
+        query_vector: Vector,
+        top_k: int = 5,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        with_vectors: bool = False,
+    ) -> List[Dict]:
+        raise NotImplementedError
+
+    def search_similar_batch(
+        self,
+        collection_name: str,
+        query_vectors: Sequence[Vector],
+        top_k: int = 5,
+        **filters,
+    ) -> List[List[Dict]]:
+        """질의 벡터 여러 개를 같은 조건으로 검색 (질의 순서대로 결과 목록 반환)
+
+        기본 구현은 하나씩 검색한다. 원격 백엔드는 한 번의 요청으로 보내도록 재정의한다.
+        """
+        return [self.search_similar(collection_name, vector, top_k, **filters) for vector in query_vectors]
+
+    @abstractmethod
+    def keyword_search(
+        self,
+        collection_name: str,
+        query: str,
+        top_k: int = 5,
+        user_id: Optional[int] = None,
+        category: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        terms: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """청크 본문 BM25 검색 (검색어는 keyword_terms 기준, score 는 BM25 점수)
+
+        terms 를 넘기면 질의어를 다시 분석하지 않고 그 검색어를 쓴다.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_vectors(self, collection_name: str, note_id: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_note_chunks(self, collection_name: str, note_id: int) -> List[Dict]:
+        """노트에 저장된 청크 포인트의 id, chunk_hash, chunk_index 조회"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_points(self, collection_name: str, ids: List[PointId]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_chunk_indexes(self, collection_name: str, chunk_indexes: Dict[PointId, int]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_notes_metadata(self, collection_name: str, metadata_by_note: Dict[int, Dict]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_collection_stats(self, collection_name: str) -> Dict:
+        raise NotImplementedError
+
+    def insert_vectors(
+        self,
+        collection_name: str,
+        vectors: Union[np.ndarray, List[List[float]]],
+        ids: List[PointId],
+        note_ids: List[int],
+        contents: List[str],
+        chunk_indexes: Optional[List[int]] = None,
+        chunk_hashes: Optional[List[str]] = None,
+        metadata: Optional[Dict] = None,
+    ) -> Dict:
+        payloads = build_payloads(note_ids, contents, chunk_indexes, chunk_hashes, metadata)
+        return self.upsert_points(collection_name, vectors, ids, payloads)
+
+    def set_note_metadata(self, collection_name: str, note_id: int, metadata: Dict):
+        """노트의 모든 포인트에 메타데이터 payload 를 설정 (카테고리 변경 등)"""
+        self.set_notes_metadata(collection_name, {note_id: metadata})
+
+    async def ainsert_vectors(self, collection_name: str, *args, **kwargs) -> Dict:
+        return await asyncio.to_thread(self.insert_vectors, collection_name, *args, **kwargs)
+
+    async def asearch_similar(self, collection_name: str, query_vector: Vector, top_k: int = 5, **filters) -> List[Dict]:
+        return await asyncio.to_thread(self.search_similar, collection_name, query_vector, top_k, **filters)
+
+    async def asearch_similar_batch(
+        self, collection_name: str, query_vectors: Sequence[Vector], top_k: int = 5, **filters
+    ) -> List[List[Dict]]:
+        return await asyncio.to_thread(self.search_similar_batch, collection_name, query_vectors, top_k, **filters)
+
+    async def akeyword_search(self, collection_name: str, query: str, top_k: int = 5, **filters) -> List[Dict]:
+        return await asyncio.to_thread(self.keyword_search, collection_name, query, top_k, **filters)
+
+    async def adelete_vectors(self, collection_name: str, note_id: int):
+        await asyncio.to_thread(self.delete_vectors, collection_name, note_id)
+
+    async def aclose(self):
+        pass
+
+
+class QdrantVectorStore(VectorStore):
+    """Qdrant 서버 백엔드 (milvus_service 의 클라이언트와 함수 사용)"""
+
+    name = "qdrant"
+
+    def __init__(self):
+        # QdrantClient 는 import 시 만들어지므로 이 백엔드를 고를 때만 불러온다
+        from app.services import milvus_service
+        self._qdrant = milvus_service
+
+    def ensure_collection(self, collection_name, vector_size=settings.EMBEDDING_DIM):
+        return self._qdrant.ensure_collection(collection_name, vector_size)
+
+    def upsert_points(self, collection_name, vectors, ids, payloads):
+        return self._qdrant.upsert_points(collection_name, vectors, ids, payloads)
+
+    def search_similar(self, collection_name, query_vector, top_k=5, **filters):
+        return self._qdrant.search_similar(collection_name, query_vector, top_k, **filters)
+
+    def search_similar_batch(self, collection_name, query_vectors, top_k=5, **filters):
+        return self._qdrant.search_similar_batch(collection_name, query_vectors, top_k, **filters)
+
+    def keyword_search(self, collection_name, query, top_k=5, **filters):
+        return self._qdrant.keyword_search(collection_name, query, top_k, **filters)
+
+    def delete_vectors(self, collection_name, note_id):
+        self._qdrant.delete_vectors(collection_name, note_id)
+
+    def get_note_chunks(self, collection_name, note_id):
+        return self._qdrant.get_note_chunks(collection_name, note_id)
+
+    def delete_points(self, collection_name, ids):
+        self._qdrant.delete_points(collection_name, ids)
+
+    def update_chunk_indexes(self, collection_name, chunk_indexes):
+        self._qdrant.update_chunk_indexes(collection_name, chunk_indexes)
+
+    def set_notes_metadata(self, collection_name, metadata_by_note):
+        self._qdrant.set_notes_metadata(collection_name, metadata_by_note)
+
+    def get_collection_stats(self, collection_name):
+        return self._qdrant.get_collection_stats(collection_name)
+
+    async def ainsert_vectors(self, collection_name, *args, **kwargs):
+        return await self._qdrant.ainsert_vectors(collection_name, *args, **kwargs)
+
+    async def asearch_similar(self, collection_name, query_vector, top_k=5, **filters):
+        return await self._qdrant.asearch_similar(collection_name, query_vector, top_k, **filters)
+
+    async def asearch_similar_batch(self, collection_name, query_vectors, top_k=5, **filters):
+        return await self._qdrant.asearch_similar_batch(collection_name, query_vectors, top_k, **filters)
+
+    async def akeyword_search(self, collection_name, query, top_k=5, **filters):
+        return await self._qdrant.akeyword_search(collection_name, query, top_k, **filters)
+
+    async def adelete_vectors(self, collection_name, note_id):
+        await self._qdrant.adelete_vectors(collection_name, note_id)
+
+    async def aclose(self):
+        await self._qdrant.close_async_client()
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    backend = backend or settings.VECTOR_STORE_BACKEND
+    if backend == "qdrant":
+        return QdrantVectorStore()
+    if backend == "local":
+        from app.services.local_vector_store import LocalVectorStore
+        return LocalVectorStore(
+            settings.VECTOR_STORE_LOCAL_DIR,
+            hnsw_threshold=settings.VECTOR_STORE_HNSW_THRESHOLD,
+            hnsw_ef=settings.VECTOR_STORE_HNSW_EF,
+        )
+    raise ValueError(f"Unknown vector store backend: {backend}")
+
+
+_vector_store = None
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """설정(VECTOR_STORE_BACKEND)에 따른 공유 벡터 저장소 반환"""
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                _vector_store = create_vector_store()
+    return _vector_store
@@ -0,0 +1,57 @@
+"""기존 벡터 포인트에 필터용 payload(user_id, category, created_at)를 채우는 backfill
+
+payload 인덱스가 없으면 먼저 만들고, DB 의 노트를 id 순으로 읽어 노트 단위로 payload 를 설정한다.
+여러 번 실행해도 결과가 같으므로 중간에 멈췄다면 --start-id 로 이어서 실행하면 된다.
+
+    cd backend
+    python scripts/backfill_vector_payload.py --batch 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+from app.models.note import Note
+from app.services.vector_store import get_vector_store
+from app.services.note_indexer import note_metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill filter payload on existing note vectors")
+    parser.add_argument("--collection", default="notes")
+    parser.add_argument("--batch", type=int, default=200, help="요청 하나에 담을 노트 수")
+    parser.add_argument("--start-id", type=int, default=0)
+    args = parser.parse_args()
+
+    store = get_vector_store()
+    store.ensure_collection(args.collection)
+    db = SessionLocal()
+    started = time.perf_counter()
+    done = 0
+    last_id = args.start_id - 1
+    try:
+        while True:
+            notes = (
+                db.query(Note)
+                .filter(Note.id > last_id)
+                .order_by(Note.id.asc())
+                .limit(args.batch)
+                .all()
+            )
+            if not notes:
+                break
+            store.set_notes_metadata(args.collection, {note.id: note_metadata(note) for note in notes})
+            last_id = notes[-1].id
+            done += len(notes)
+            print(f"{done} notes backfilled (last id {last_id})")
+            db.expunge_all()
+    finally:
+        db.close()
+    print(f"Done: {done} notes in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
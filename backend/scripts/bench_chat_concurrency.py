@@ -0,0 +1,129 @@
+"""채팅 스트리밍 동시성 비교: sync 제너레이터 vs async 제너레이터 (가짜 LLM)
+
+실제 Gemini 대신 토큰마다 --token-ms 만큼 기다리는 가짜 모델을 GeminiService 에 넣고
+- sync : generate_chat_response (StreamingResponse 가 스레드풀에서 제너레이터를 돌림)
+- async: agenerate_chat_response (이벤트 루프에서 generate_content_async 스트림을 기다림)
+두 엔드포인트에 동시 요청 수(--concurrency)를 바꿔 가며 보내 전체 시간, 요청 p50/p95,
+동시에 진행된 생성 수의 최대값을 출력한다. 네트워크/API 키 없이 프로세스 안에서 실행된다.
+
+    cd backend
+    python scripts/bench_chat_concurrency.py --concurrency 50 200 500 --tokens 20 --token-ms 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.gemini_service import GeminiService
+
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """generate_content / generate_content_async 를 흉내내는 가짜 모델 (동시 생성 수를 센다)"""
+
+    def __init__(self, tokens: int, token_seconds: float):
+        self.tokens = tokens
+        self.token_seconds = token_seconds
+        self.active = 0
+        self.max_active = 0
+
+    def _enter(self):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+
+    def generate_content(self, contents, generation_config=None, stream=False):
+        def chunks():
+            self._enter()
+            try:
+                for i in range(self.tokens):
+                    time.sleep(self.token_seconds)
+                    yield FakeChunk(f"t{i} ")
+            finally:
+                self.active -= 1
+        return chunks()
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False):
+        async def chunks():
+            self._enter()
+            try:
+                for i in range(self.tokens):
+                    await asyncio.sleep(self.token_seconds)
+                    yield FakeChunk(f"t{i} ")
+            finally:
+                self.active -= 1
+        return chunks()
+
+
+def build_app(gemini_service: GeminiService) -> FastAPI:
+    app = FastAPI()
+    history = [{"role": "user", "content": "이전 질문"}, {"role": "assistant", "content": "이전 답변"}]
+
+    @app.post("/sync")
+    def sync_chat():
+        return StreamingResponse(
+            gemini_service.generate_chat_response(history, "질문", "컨텍스트"), media_type="text/plain"
+        )
+
+    @app.post("/async")
+    async def async_chat():
+        return StreamingResponse(
+            gemini_service.agenerate_chat_response(history, "질문", "컨텍스트"), media_type="text/plain"
+        )
+
+    return app
+
+
+async def run_level(app, path: str, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one():
+            started = time.perf_counter()
+            response = await client.post(path)
+            assert response.status_code == 200 and response.text
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async chat streaming with a fake LLM")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--tokens", type=int, default=20, help="응답당 청크 수")
+    parser.add_argument("--token-ms", type=float, default=20.0, help="청크 사이 지연 (ms)")
+    args = parser.parse_args()
+
+    # API 키 없이 쓰기 위해 __init__ 을 건너뛰고 가짜 모델을 넣는다
+    gemini_service = GeminiService.__new__(GeminiService)
+    fake_model = FakeModel(args.tokens, args.token_ms / 1000)
+    gemini_service.model = fake_model
+    app = build_app(gemini_service)
+
+    ideal = args.tokens * args.token_ms
+    print(f"tokens={args.tokens} token_ms={args.token_ms} (요청 하나의 이상적인 시간 {ideal:.0f}ms)")
+    for concurrency in args.concurrency:
+        for path in ("/sync", "/async"):
+            fake_model.max_active = 0
+            wall, latencies = asyncio.run(run_level(app, path, concurrency))
+            print(
+                f"{path:>7} c={concurrency:<4}: wall {wall * 1000:8.0f}ms  "
+                f"p50 {np.percentile(latencies, 50) * 1000:8.0f}ms  p95 {np.percentile(latencies, 95) * 1000:8.0f}ms  "
+                f"max concurrent generations {fake_model.max_active}"
+            )
+
+
+if __name__ == "__main__":
+    main()
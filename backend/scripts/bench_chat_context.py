@@ -0,0 +1,90 @@
+"""채팅 컨텍스트 구성 비교: 상위 청크 단순 연결 vs 중복 제거 + MMR + 토큰 예산 패킹
+
+합성 노트를 TextChunker(CHUNK_SIZE/CHUNK_OVERLAP)로 나눠 겹치는 청크 후보를 만들고,
+같은 본문의 중복 청크와 비슷한 벡터를 섞은 뒤
+- naive : 점수 상위 --top-k 청크를 "\\n---\\n" 로 연결 (예전 방식)
+- packed: pack_context (겹침/중복 제거, MMR, 토큰 예산)
+의 추정 토큰 수, 고유 문장 수, 선택 시간(p50/p95)을 출력한다. 모델이나 서버 없이 실행된다.
+
+    cd backend
+    python scripts/bench_chat_context.py --candidates 12 50 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.chat_history import estimate_tokens
+from app.services.context_builder import CONTEXT_SEPARATOR, pack_context
+from app.services.text_chunker import TextChunker
+
+
+def make_candidates(rng, n: int, dim: int):
+    """겹치는 청크, 같은 본문 중복, 비슷한 벡터가 섞인 (후보, 벡터) 생성"""
+    chunker = TextChunker(chunk_size=settings.CHUNK_SIZE, chunk_overlap=settings.CHUNK_OVERLAP)
+    hits, vectors = [], []
+    note_id = 0
+    while len(hits) < n:
+        note_id += 1
+        sentences = [f"노트 {note_id}의 {i}번째 문장은 벡터 검색과 컨텍스트 구성에 대한 내용입니다." for i in range(40)]
+        topic = rng.standard_normal(dim).astype(np.float32)
+        for chunk in chunker.split_text(" ".join(sentences)):
+            vector = topic + 0.3 * rng.standard_normal(dim).astype(np.float32)
+            hits.append({"note_id": note_id, "content": chunk})
+            vectors.append(vector)
+            # 같은 청크가 다른 질의 변형에서 한 번 더 나온 경우
+            if rng.random() < 0.2:
+                hits.append({"note_id": note_id, "content": chunk})
+                vectors.append(vector)
+    hits, vectors = hits[:n], np.stack(vectors[:n])
+    scores = np.sort(rng.uniform(0.5, 0.9, n))[::-1]
+    for hit, score in zip(hits, scores):
+        hit["score"] = float(score)
+    return hits, vectors
+
+
+def unique_sentences(text: str) -> int:
+    return len({sentence.strip() for sentence in text.replace(CONTEXT_SEPARATOR, " ").split(".") if sentence.strip()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark naive vs packed chat context")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[12, 50, 200])
+    parser.add_argument("--dim", type=int, default=settings.EMBEDDING_DIM)
+    parser.add_argument("--top-k", type=int, default=6, help="naive 방식에서 연결할 청크 수")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"budget={settings.CHAT_CONTEXT_TOKEN_BUDGET} max_chunks={settings.CHAT_CONTEXT_MAX_CHUNKS} lambda={settings.CHAT_CONTEXT_MMR_LAMBDA}")
+    for n in args.candidates:
+        hits, vectors = make_candidates(rng, n, args.dim)
+        naive = CONTEXT_SEPARATOR.join(hit["content"] for hit in hits[: args.top_k])
+
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            packed, _, stats = pack_context(
+                hits,
+                vectors,
+                token_budget=settings.CHAT_CONTEXT_TOKEN_BUDGET,
+                max_chunks=settings.CHAT_CONTEXT_MAX_CHUNKS,
+                lambda_mult=settings.CHAT_CONTEXT_MMR_LAMBDA,
+                duplicate_similarity=settings.CHAT_CONTEXT_DUPLICATE_SIMILARITY,
+                max_overlap=settings.CHUNK_OVERLAP * 2,
+            )
+            timings.append(time.perf_counter() - started)
+
+        print(f"candidates={n}: {stats}")
+        print(f"  naive : tokens~{estimate_tokens(naive):5d}  unique sentences {unique_sentences(naive):3d}")
+        print(f"  packed: tokens~{estimate_tokens(packed):5d}  unique sentences {unique_sentences(packed):3d}  "
+              f"select p50 {np.percentile(timings, 50) * 1000:.2f}ms  p95 {np.percentile(timings, 95) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
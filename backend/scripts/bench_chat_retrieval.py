@@ -0,0 +1,86 @@
+"""채팅 검색 지연 시간 비교: 단일 검색 vs 질의 변형 순차 검색 vs 배치 검색
+
+임시 컬렉션을 채운 뒤 질의 변형 수(--variants)만큼
+- single     : 원문 질의 하나만 검색 (예전 방식)
+- sequential : 변형마다 asearch_similar 를 차례로 호출
+- batch      : asearch_similar_batch 한 번 (Qdrant query_batch_points 요청 하나)
+의 p50/p95 를 출력한다. 임베딩 시간은 제외한 검색 왕복만 잰다.
+QDRANT_URL 의 서버를 사용하며 끝나면 임시 컬렉션을 지운다.
+
+    cd backend
+    python scripts/bench_chat_retrieval.py --points 50000 --variants 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import milvus_service
+from app.services.vector_store import build_payloads, get_vector_store
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+async def measure(store, collection, rng, dim, args):
+    single, sequential, batch = [], [], []
+    for _ in range(args.queries):
+        vectors = list(rng.standard_normal((args.variants, dim), dtype=np.float32))
+        user_id = int(rng.integers(0, args.users))
+
+        started = time.perf_counter()
+        await store.asearch_similar(collection, vectors[0], args.top_k, user_id=user_id)
+        single.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for vector in vectors:
+            await store.asearch_similar(collection, vector, args.top_k, user_id=user_id)
+        sequential.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await store.asearch_similar_batch(collection, vectors, args.top_k, user_id=user_id)
+        batch.append(time.perf_counter() - started)
+    await store.aclose()
+    return single, sequential, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single vs sequential vs batched chat retrieval")
+    parser.add_argument("--points", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    store = get_vector_store()
+    collection = f"bench_chat_retrieval_{os.getpid()}"
+    rng = np.random.default_rng(0)
+    store.ensure_collection(collection, vector_size=args.dim)
+    try:
+        for start in range(0, args.points, 1000):
+            n = min(1000, args.points - start)
+            payloads = build_payloads(list(range(start, start + n)), [f"chunk {i}" for i in range(start, start + n)])
+            for payload in payloads:
+                payload["user_id"] = int(rng.integers(0, args.users))
+            store.upsert_points(collection, rng.standard_normal((n, args.dim), dtype=np.float32), list(range(start, start + n)), payloads)
+
+        single, sequential, batch = asyncio.run(measure(store, collection, rng, args.dim, args))
+        print(f"backend={store.name} points={args.points} variants={args.variants} top_k={args.top_k}")
+        for name, samples in (("single", single), ("sequential", sequential), ("batch", batch)):
+            print(f"{name:>12}: p50 {percentile_ms(samples, 50):7.2f}ms  p95 {percentile_ms(samples, 95):7.2f}ms")
+    finally:
+        if store.name == "qdrant":
+            milvus_service.qdrant_client.delete_collection(collection)
+            milvus_service.forget_collection(collection)
+
+
+if __name__ == "__main__":
+    main()
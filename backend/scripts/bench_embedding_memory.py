@@ -0,0 +1,91 @@
+"""임베딩 → 벡터 저장 경로의 최대 메모리 사용량 벤치마크
+
+큰 문서 하나를 청크로 나눈 상황을 가정하고, 예전 경로(임베딩.tolist() → PointStruct 목록 → upsert 한 번)와
+현재 경로(float32 행렬 유지 → 배치 단위 리스트 변환)의 파이썬 힙 최대 사용량을 tracemalloc 으로 비교한다.
+네트워크 비용을 빼기 위해 upsert 요청은 받기만 하고 버리는 클라이언트로 보낸다.
+
+    cd backend
+    python scripts/bench_embedding_memory.py --chunks 20000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client.http import models as qmodels
+
+from app.core.config import settings
+from app.services import milvus_service
+
+
+class _DiscardingClient:
+    """upsert 요청을 받기만 하는 클라이언트 (컬렉션은 있다고 가정)"""
+
+    def get_collection(self, collection_name):
+        vectors = SimpleNamespace(size=settings.EMBEDDING_DIM, distance=qmodels.Distance.COSINE)
+        return SimpleNamespace(
+            config=SimpleNamespace(params=SimpleNamespace(vectors=vectors)),
+            payload_schema=dict.fromkeys(milvus_service.PAYLOAD_INDEXES),
+        )
+
+    def upsert(self, collection_name, points, **kwargs):
+        return None
+
+
+def legacy_insert(vectors: np.ndarray, contents, note_id: int):
+    embeddings = vectors.tolist()
+    points = [
+        qmodels.PointStruct(id=i, vector=vec, payload={"note_id": note_id, "content": content})
+        for i, (vec, content) in enumerate(zip(embeddings, contents))
+    ]
+    milvus_service.qdrant_client.upsert(collection_name="notes", points=points)
+
+
+def current_insert(vectors: np.ndarray, contents, note_id: int):
+    milvus_service.insert_vectors(
+        collection_name="notes",
+        vectors=vectors,
+        ids=list(range(len(contents))),
+        note_ids=[note_id] * len(contents),
+        contents=contents,
+    )
+
+
+def measure(label, fn, vectors, contents):
+    gc.collect()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    fn(vectors, contents, 1)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} peak {(peak - base) / 1024 / 1024:>9.1f} MB   {elapsed:>6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding to vector store memory benchmark")
+    parser.add_argument("--chunks", type=int, default=20000, help="청크 수 (500자 청크 기준 약 10MB 문서 = 20000)")
+    parser.add_argument("--dim", type=int, default=settings.EMBEDDING_DIM)
+    args = parser.parse_args()
+
+    milvus_service.qdrant_client = _DiscardingClient()
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.chunks, args.dim), dtype=np.float32)
+    contents = [f"청크 {i} " + "가나다라마바사 " * 60 for i in range(args.chunks)]
+
+    print(f"{args.chunks} chunks x {args.dim} dims (float32 matrix {vectors.nbytes / 1024 / 1024:.1f} MB)")
+    measure("legacy", legacy_insert, vectors, contents)
+    measure("float32", current_insert, vectors, contents)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""사용자 필터 검색 지연 시간 벤치마크 (코퍼스 크기별)
+
+임시 컬렉션에 여러 사용자의 포인트를 단계적으로 채우면서, 단계마다
+- 필터 없는 검색 (예전 방식: 전체 사용자 벡터를 검색하고 top-k 중 본인 것만 남김)
+- user_id payload 인덱스를 쓴 필터 검색
+의 p50/p95 지연 시간과, 예전 방식에서 top-k 안에 본인 노트가 몇 개 남는지를 출력한다.
+QDRANT_URL 의 서버를 사용하며 끝나면 임시 컬렉션을 지운다.
+
+    cd backend
+    python scripts/bench_filtered_search.py --sizes 10000,50000,100000 --users 100
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services import milvus_service
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+def fill(collection, rng, start, end, dim, users):
+    vectors = rng.standard_normal((end - start, dim), dtype=np.float32)
+    user_ids = rng.integers(0, users, size=end - start)
+    payloads = [
+        {
+            "note_id": int(i),
+            "content": f"chunk {i}",
+            **milvus_service.note_payload(user_id=int(user_ids[i - start]), category=f"c{i % 10}"),
+        }
+        for i in range(start, end)
+    ]
+    milvus_service.upsert_points(collection, vectors, list(range(start, end)), payloads)
+
+
+def measure(collection, rng, dim, users, queries, top_k):
+    unfiltered, filtered, kept = [], [], []
+    for _ in range(queries):
+        query = rng.standard_normal(dim, dtype=np.float32)
+        user_id = int(rng.integers(0, users))
+
+        started = time.perf_counter()
+        hits = milvus_service.qdrant_client.query_points(
+            collection_name=collection, query=query.tolist(), limit=top_k, with_payload=True
+        ).points
+        unfiltered.append(time.perf_counter() - started)
+        kept.append(sum(1 for hit in hits if hit.payload.get("user_id") == user_id))
+
+        started = time.perf_counter()
+        milvus_service.search_similar(collection, query, top_k=top_k, user_id=user_id)
+        filtered.append(time.perf_counter() - started)
+    return unfiltered, filtered, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtered vector search latency benchmark")
+    parser.add_argument("--sizes", default="10000,50000,100000")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=settings.EMBEDDING_DIM)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="임시 컬렉션을 지우지 않음")
+    args = parser.parse_args()
+
+    collection = f"bench_filtered_{os.getpid()}"
+    milvus_service.ensure_collection(collection, vector_size=args.dim)
+    rng = np.random.default_rng(0)
+    print(f"{'points':>10}{'unfiltered p50':>16}{'p95':>8}{'filtered p50':>15}{'p95':>8}{'own hits/top-k':>16}")
+    try:
+        size = 0
+        for target in sorted(int(s) for s in args.sizes.split(",")):
+            for start in range(size, target, 10000):
+                fill(collection, rng, start, min(target, start + 10000), args.dim, args.users)
+            size = target
+            unfiltered, filtered, kept = measure(collection, rng, args.dim, args.users, args.queries, args.top_k)
+            print(
+                f"{size:>10}{percentile_ms(unfiltered, 50):>14.2f}ms{percentile_ms(unfiltered, 95):>6.2f}ms"
+                f"{percentile_ms(filtered, 50):>13.2f}ms{percentile_ms(filtered, 95):>6.2f}ms"
+                f"{np.mean(kept):>12.2f}/{args.top_k}"
+            )
+    finally:
+        if not args.keep:
+            milvus_service.qdrant_client.delete_collection(collection)
+            milvus_service.forget_collection(collection)
+
+
+if __name__ == "__main__":
+    main()
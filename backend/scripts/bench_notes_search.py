@@ -0,0 +1,152 @@
+"""노트 목록 검색 (GET /notes/?search=) 쿼리 플랜/지연 시간 비교
+
+임시 테이블에 합성 노트를 넣고, 같은 데이터에서
+  before: 제목/본문 ILIKE '%검색어%' + 별도 count 쿼리 (인덱스 없음)
+  after : search_vector @@ 접두어 tsquery OR 제목 ILIKE (+ 3글자 이상이면 본문 ILIKE) (GIN/pg_trgm 인덱스)
+          + count(*) OVER ()
+를 EXPLAIN (ANALYZE, BUFFERS) 로 실행해 플랜과 시간을 출력한다. 테이블은 끝나면 지운다 (--keep 이면 유지).
+
+    cd backend
+    python scripts/bench_notes_search.py --notes 100000 --query "벡터 검색"
+    python scripts/bench_notes_search.py --notes 100000 --query "학습"   # 자주 나오는 2글자 검색어
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.models.note import NOTE_SEARCH_VECTOR
+from app.services.keyword_search import TRGM_MIN_PATTERN_CHARS, prefix_tsquery
+
+VOCABULARY = (
+    "노트 정리 회의 프로젝트 일정 검색 벡터 임베딩 모델 데이터 서버 배포 테스트 문서 요약 아이디어 "
+    "독서 여행 운동 예산 계약 고객 보고서 발표 자료 설계 성능 개선 버그 수정 리뷰 학습 강의 "
+    "python fastapi postgres qdrant docker kubernetes index query latency cache release"
+).split()
+PARTICLES = ["", "", "을", "를", "은", "는", "에서", "으로", "의"]
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후"
+
+
+def build_vocabulary(rng: random.Random, size: int):
+    """실제 문서처럼 어휘 빈도가 Zipf 분포를 따르도록 합성 어휘와 가중치를 만든다
+
+    VOCABULARY 의 단어들은 여러 순위에 흩어 놓아, 자주 나오는 검색어와 드문 검색어가 모두 생긴다.
+    """
+    words = list(VOCABULARY)
+    while len(words) < size:
+        words.append("".join(rng.choices(SYLLABLES, k=rng.choice([2, 3]))))
+    rng.shuffle(words)
+    return words, [1.0 / (rank + 1) for rank in range(len(words))]
+
+
+def explain(conn, sql: str, params: dict, runs: int):
+    plan = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params).scalars().all()
+    started = time.perf_counter()
+    for _ in range(runs):
+        conn.execute(text(sql), params).all()
+    return plan, (time.perf_counter() - started) * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notes listing search before/after FTS indexes")
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--words", type=int, default=300, help="노트당 본문 어절 수")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="합성 어휘 크기 (Zipf 분포)")
+    parser.add_argument("--query", default="벡터 검색")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--table", default="bench_notes_search")
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+    table = args.table
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text(f"""
+            CREATE TABLE {table} (
+                id serial PRIMARY KEY,
+                user_id integer,
+                category varchar,
+                title varchar,
+                content text,
+                created_at timestamptz DEFAULT now(),
+                search_vector tsvector GENERATED ALWAYS AS ({NOTE_SEARCH_VECTOR}) STORED
+            )
+        """))
+        conn.execute(text(f"CREATE INDEX ON {table} (user_id)"))
+
+    rng = random.Random(0)
+    vocabulary, weights = build_vocabulary(rng, args.vocabulary)
+
+    def sample_words(k):
+        return " ".join(word + rng.choice(PARTICLES) for word in rng.choices(vocabulary, weights, k=k))
+    started = time.perf_counter()
+    batch = 2000
+    with engine.begin() as conn:
+        for start in range(0, args.notes, batch):
+            rows = [
+                {
+                    "user_id": rng.randrange(args.users),
+                    "title": sample_words(4),
+                    "content": sample_words(args.words),
+                }
+                for _ in range(min(batch, args.notes - start))
+            ]
+            conn.execute(text(f"INSERT INTO {table} (user_id, title, content) VALUES (:user_id, :title, :content)"), rows)
+        conn.execute(text(f"ANALYZE {table}"))
+    print(f"Inserted {args.notes} notes in {time.perf_counter() - started:.1f}s")
+
+    pattern = "%" + args.query + "%"
+    params = {"user_id": 0, "pattern": pattern, "tsquery": prefix_tsquery(args.query), "search": args.query, "limit": 5}
+    before_sql = (
+        f"SELECT id, title FROM {table} WHERE user_id = :user_id "
+        f"AND (title ILIKE :pattern OR content ILIKE :pattern) LIMIT :limit"
+    )
+    before_count_sql = (
+        f"SELECT count(*) FROM {table} WHERE user_id = :user_id AND (title ILIKE :pattern OR content ILIKE :pattern)"
+    )
+    # notes._apply_search 와 같은 조건 (본문 ILIKE 는 트라이그램 인덱스를 쓸 수 있는 길이일 때만)
+    content_match = " OR content ILIKE :pattern" if len(args.query.strip()) >= TRGM_MIN_PATTERN_CHARS else ""
+    after_sql = (
+        f"SELECT id, title, count(*) OVER () AS total FROM {table} WHERE user_id = :user_id "
+        f"AND (search_vector @@ to_tsquery('simple', :tsquery) OR title ILIKE :pattern{content_match}) "
+        f"ORDER BY ts_rank_cd(search_vector, to_tsquery('simple', :tsquery)) DESC, "
+        f"similarity(title, :search) DESC, created_at DESC LIMIT :limit"
+    )
+
+    try:
+        with engine.connect() as conn:
+            plan, page_ms = explain(conn, before_sql, params, args.runs)
+            count_plan, count_ms = explain(conn, before_count_sql, params, args.runs)
+            print(f"\n=== before: ILIKE page + count ({page_ms:.1f}ms + {count_ms:.1f}ms) ===")
+            print("\n".join(plan))
+            print("\n".join(count_plan))
+
+        with engine.begin() as conn:
+            started = time.perf_counter()
+            conn.execute(text(f"CREATE INDEX ON {table} USING gin (search_vector)"))
+            conn.execute(text(f"CREATE INDEX ON {table} USING gin (title gin_trgm_ops)"))
+            conn.execute(text(f"CREATE INDEX ON {table} USING gin (content gin_trgm_ops)"))
+            conn.execute(text(f"ANALYZE {table}"))
+            print(f"\nCreated GIN indexes in {time.perf_counter() - started:.1f}s")
+
+        with engine.connect() as conn:
+            plan, page_ms = explain(conn, after_sql, params, args.runs)
+            print(f"\n=== after: full-text + trigram, ranked, window count ({page_ms:.1f}ms) ===")
+            print("\n".join(plan))
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+if __name__ == "__main__":
+    main()
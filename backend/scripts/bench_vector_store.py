@@ -0,0 +1,112 @@
+"""벡터 저장소 백엔드 검색 벤치마크
+
+코퍼스 크기별 삽입 속도, 검색 지연 시간(필터 유무)과 recall@k 를 잰다.
+백엔드 공통 동작 검사는 tests/test_vector_store_conformance.py (pytest) 에 있다.
+
+    cd backend
+    python scripts/bench_vector_store.py --backend local --bench 10000,50000 --dim 1024
+    python scripts/bench_vector_store.py --backend qdrant --bench 10000              # QDRANT_URL 서버
+    python scripts/bench_vector_store.py --backend qdrant --qdrant-memory --bench 10000 # 서버 없이 qdrant-client 로컬 모드
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.vector_store import build_payloads, create_vector_store
+
+
+def make_store(args, workdir):
+    if args.backend == "local":
+        from app.services.local_vector_store import LocalVectorStore
+        return LocalVectorStore(workdir, hnsw_threshold=args.hnsw_threshold)
+    store = create_vector_store("qdrant")
+    if args.qdrant_memory:
+        from qdrant_client import QdrantClient
+        from app.services import milvus_service
+        milvus_service.qdrant_client = QdrantClient(":memory:")
+    return store
+
+
+def drop(store, args, collection):
+    if args.backend == "qdrant":
+        from app.services import milvus_service
+        milvus_service.qdrant_client.delete_collection(collection)
+        milvus_service.forget_collection(collection)
+
+
+def benchmark(store, args, collection):
+    rng = np.random.default_rng(1)
+    dim = args.dim
+    store.ensure_collection(collection, vector_size=dim)
+    # 실제 임베딩처럼 군집이 있는 분포 (균일한 가우시안은 근사 검색에 비현실적으로 불리하다)
+    centers = rng.standard_normal((200, dim), dtype=np.float32)
+
+    def sample(n):
+        return centers[rng.integers(0, len(centers), n)] + 0.3 * rng.standard_normal((n, dim), dtype=np.float32)
+    corpus = np.zeros((0, dim), dtype=np.float32)
+    print(f"[benchmark] backend={store.name} dim={dim} top_k={args.top_k}")
+    print(f"{'points':>10}{'insert pts/s':>14}{'p50':>9}{'p95':>9}{'filtered p50':>14}{'recall@k':>10}")
+    for target in sorted(int(s) for s in args.bench.split(",")):
+        started = time.perf_counter()
+        previous = len(corpus)
+        while len(corpus) < target:
+            n = min(256, target - len(corpus))
+            vecs = sample(n)
+            batch_users = rng.integers(0, 100, size=n)
+            start = len(corpus)
+            payloads = build_payloads(list(range(start, start + n)), [""] * n)
+            for payload, user_id in zip(payloads, batch_users):
+                payload["user_id"] = int(user_id)
+            store.upsert_points(collection, vecs, list(range(start, start + n)), payloads)
+            corpus = np.concatenate([corpus, vecs])
+        insert_rate = (len(corpus) - previous) / max(time.perf_counter() - started, 1e-9)
+
+        normalized = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        latencies, filtered, recalls = [], [], []
+        for _ in range(args.queries):
+            query = sample(1)[0]
+            t0 = time.perf_counter()
+            hits = store.search_similar(collection, query, top_k=args.top_k)
+            latencies.append(time.perf_counter() - t0)
+            exact = set(np.argsort(-(normalized @ query))[: args.top_k].tolist())
+            recalls.append(len(exact & {h["note_id"] for h in hits}) / args.top_k)
+            t0 = time.perf_counter()
+            store.search_similar(collection, query, top_k=args.top_k, user_id=int(rng.integers(0, 100)))
+            filtered.append(time.perf_counter() - t0)
+        print(
+            f"{target:>10}{insert_rate:>14.0f}{np.percentile(latencies, 50) * 1000:>7.2f}ms"
+            f"{np.percentile(latencies, 95) * 1000:>7.2f}ms{np.percentile(filtered, 50) * 1000:>12.2f}ms"
+            f"{np.mean(recalls):>10.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store search benchmark")
+    parser.add_argument("--backend", choices=["local", "qdrant"], default="local")
+    parser.add_argument("--qdrant-memory", action="store_true", help="qdrant-client 로컬(:memory:) 모드 사용")
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--hnsw-threshold", type=int, default=20000)
+    parser.add_argument("--bench", default="10000", help="벤치마크 코퍼스 크기 목록 (예: 10000,50000)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="vector_store_")
+    store = make_store(args, workdir)
+    suffix = os.getpid()
+    try:
+        benchmark(store, args, f"benchmark_{suffix}")
+    finally:
+        drop(store, args, f"benchmark_{suffix}")
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
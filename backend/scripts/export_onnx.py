@@ -0,0 +1,78 @@
+"""KURE-v1 (sentence-transformers) 모델을 ONNX 로 내보내고 선택적으로 int8 동적 양자화
+
+    cd backend
+    python scripts/export_onnx.py --output ./models/kure-v1-onnx --int8
+
+결과 디렉토리를 EMBEDDING_ONNX_DIR 로 지정하고 EMBEDDING_BACKEND=onnx 로 실행한다.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.embedding_backends import ONNX_CONFIG_FILE
+
+
+def export(model_name: str, output_dir: str, int8: bool, opset: int):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    # 풀링/정규화 설정을 sentence-transformers 모듈 구성에서 가져온다
+    pooling = "cls"
+    normalize = False
+    for module in st_model:
+        module_name = type(module).__name__
+        if module_name == "Pooling":
+            pooling = "mean" if module.get_pooling_mode_str() == "mean" else "cls"
+        elif module_name == "Normalize":
+            normalize = True
+
+    sample = tokenizer(["샘플 문장입니다."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    onnx_path = os.path.join(output_dir, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, ONNX_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "model": model_name,
+            "pooling": pooling,
+            "normalize": normalize,
+            "max_seq_length": st_model.max_seq_length,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Exported {onnx_path}")
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        int8_path = os.path.join(output_dir, "model_int8.onnx")
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"Quantized {int8_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export embedding model to ONNX")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output", default=settings.EMBEDDING_ONNX_DIR)
+    parser.add_argument("--int8", action="store_true", help="int8 동적 양자화 모델도 생성")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+    export(args.model, args.output, args.int8, args.opset)
@@ -0,0 +1,58 @@
+"""기존 Qdrant 컬렉션에 현재 저장 방식 설정(양자화, 원본 벡터 디스크 저장, HNSW 파라미터)을 적용
+
+설정은 환경 변수(QDRANT_QUANTIZATION, QDRANT_ON_DISK_VECTORS, QDRANT_HNSW_M, ...)에서 읽는다.
+데이터는 그대로 두고 컬렉션 설정만 바꾸며, 서버가 백그라운드에서 세그먼트를 다시 만든다.
+--wait 를 주면 재구성이 끝날 때(status green)까지 기다린다.
+
+    cd backend
+    QDRANT_QUANTIZATION=scalar QDRANT_ON_DISK_VECTORS=true python scripts/migrate_vector_collection.py --dry-run
+    QDRANT_QUANTIZATION=scalar QDRANT_ON_DISK_VECTORS=true python scripts/migrate_vector_collection.py --wait
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qdrant_client.http import models as qmodels
+
+from app.services import milvus_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply quantization/on-disk/HNSW settings to an existing collection")
+    parser.add_argument("--collection", default="notes")
+    parser.add_argument("--dry-run", action="store_true", help="바뀔 항목만 출력")
+    parser.add_argument("--wait", action="store_true", help="세그먼트 재구성이 끝날 때까지 대기")
+    parser.add_argument("--timeout", type=int, default=3600, help="--wait 최대 대기 시간(초)")
+    args = parser.parse_args()
+
+    changes = milvus_service.apply_collection_options(args.collection, dry_run=args.dry_run)
+    if not changes:
+        print(f"Collection '{args.collection}' already matches the configured settings")
+        return
+    for name, (current, target) in changes.items():
+        print(f"  {name}: {current} -> {target}")
+    if args.dry_run:
+        print("Dry run: nothing changed")
+        return
+    print(f"Updated collection '{args.collection}'")
+
+    if args.wait:
+        started = time.perf_counter()
+        while True:
+            info = milvus_service.qdrant_client.get_collection(collection_name=args.collection)
+            if info.status == qmodels.CollectionStatus.GREEN:
+                break
+            if time.perf_counter() - started > args.timeout:
+                print(f"Timed out waiting for optimization (status {info.status})")
+                sys.exit(1)
+            print(f"  status {info.status}, indexed {info.indexed_vectors_count}/{info.points_count}")
+            time.sleep(5)
+        print(f"Optimization finished in {time.perf_counter() - started:.0f}s")
+    print(milvus_service.get_collection_stats(args.collection))
+
+
+if __name__ == "__main__":
+    main()
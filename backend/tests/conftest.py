@@ -0,0 +1,21 @@
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from app.services import milvus_service
+
+
+@pytest.fixture
+def qdrant_memory(monkeypatch):
+    """milvus_service 의 동기/비동기 클라이언트를 qdrant-client 로컬(:memory:) 모드로 교체
+
+    로컬 모드의 두 클라이언트는 원래 저장소를 따로 쓰므로, 같은 컬렉션을 보도록 저장소를 공유시킨다.
+    """
+    client = QdrantClient(":memory:")
+    async_client = AsyncQdrantClient(":memory:")
+    async_client._client.collections = client._client.collections
+    async_client._client.aliases = client._client.aliases
+    monkeypatch.setattr(milvus_service, "qdrant_client", client)
+    monkeypatch.setattr(milvus_service, "_async_client", async_client)
+    monkeypatch.setattr(milvus_service, "_collections", {})
+    yield client
+    client.close()
@@ -0,0 +1,35 @@
+"""채팅 컨텍스트 조립 (중복 제거, 청크 합치기, 토큰 예산) 검사"""
+import numpy as np
+import pytest
+
+pytest.importorskip("psycopg")  # chat_history 가 app.db.session 을 불러온다
+
+from app.services.context_builder import merge_passages, pack_context  # noqa: E402
+
+OVERLAP = "겹치는 부분은 청크 경계에서 두 번 저장된다 "
+
+
+def hit(note_id, chunk_index, content, score=1.0):
+    return {"note_id": note_id, "chunk_index": chunk_index, "content": content, "score": score}
+
+
+def test_merge_passages_joins_neighbours_in_chunk_order():
+    hits = [
+        hit(1, 2, OVERLAP + "셋째 청크"),
+        hit(2, 0, "다른 노트"),
+        hit(1, 0, "첫째 청크 " + OVERLAP),
+        hit(1, 5, "떨어진 청크"),
+    ]
+    assert merge_passages(hits, max_overlap=100) == [
+        "첫째 청크 " + OVERLAP + "셋째 청크",
+        "떨어진 청크",
+        "다른 노트",
+    ]
+
+
+def test_pack_context_uses_given_token_counter():
+    hits = [hit(1, i, f"청크 {i} " * 10, score=1.0 - i * 0.1) for i in range(3)]
+    vectors = np.eye(3, dtype=np.float32)
+    context, selected, stats = pack_context(hits, vectors, token_budget=2, max_chunks=10, count_tokens=lambda text: 1)
+    assert [h["chunk_index"] for h in selected] == [0, 1]
+    assert stats["tokens"] == 1
@@ -0,0 +1,40 @@
+"""임베딩 캐시 디스크 계층 검사"""
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache
+
+DIM = 8
+
+
+def open_cache(path):
+    # 메모리 계층을 끄고 디스크 계층만 쓰게 한다
+    return EmbeddingCache("test-model", cache_dir=str(path), memory_items=0, disk_max_bytes=4 * (DIM * 4 + 40))
+
+
+def test_disk_tier_survives_reopening(tmp_path):
+    cache = open_cache(tmp_path)
+    cache.put_many(["hello"], [np.ones(DIM)])
+    cache.flush()
+    np.testing.assert_array_equal(open_cache(tmp_path).get_many(["hello"])[0], np.ones(DIM, dtype=np.float32))
+
+
+def test_two_processes_do_not_share_a_slot(tmp_path):
+    # 같은 디렉토리를 여는 두 인스턴스 = 같은 캐시를 쓰는 두 워커 프로세스
+    first = open_cache(tmp_path)
+    first.put_many(["seed"], [np.zeros(DIM)])
+    second = open_cache(tmp_path)
+    first.put_many(["first"], [np.full(DIM, 1.0)])
+    second.put_many(["second"], [np.full(DIM, 2.0)])
+
+    assert first.get_many(["first"])[0][0] == 1.0
+    assert second.get_many(["second"])[0][0] == 2.0
+    assert first.get_many(["seed"])[0] is not None
+
+
+def test_disk_tier_evicts_when_full(tmp_path):
+    cache = open_cache(tmp_path)
+    texts = [f"text {i}" for i in range(6)]
+    cache.put_many(texts, np.arange(6, dtype=np.float32)[:, None].repeat(DIM, axis=1))
+    hits = cache.get_many(texts)
+    assert [h is not None for h in hits] == [False, False, True, True, True, True]
+    assert cache.get_stats()["disk_evictions"] == 2
@@ -0,0 +1,37 @@
+"""임베딩 서비스의 서버 → 프로세스 내 모델 대체 경로 검사"""
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.embedding_service import EmbeddingService
+
+
+class DownServer:
+    def encode(self, texts):
+        raise ConnectionRefusedError("embedding server down")
+
+
+class FakeScheduler:
+    def encode(self, model, texts):
+        return np.full((len(texts), 4), model, dtype=np.float32)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_ENABLED", False)
+    service = EmbeddingService()
+    service.remote = DownServer()
+    service.scheduler = FakeScheduler()
+    return service
+
+
+def test_remote_failure_without_local_model_reraises_server_error(service, monkeypatch):
+    monkeypatch.setattr(EmbeddingService, "model", property(lambda self: None))
+    with pytest.raises(ConnectionRefusedError):
+        service._encode(["안녕하세요"])
+
+
+def test_remote_failure_falls_back_to_local_model(service, monkeypatch):
+    monkeypatch.setattr(EmbeddingService, "model", property(lambda self: 1.0))
+    assert service._encode(["안녕하세요"]).shape == (1, 4)
+    assert not service._use_remote()
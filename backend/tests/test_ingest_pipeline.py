@@ -0,0 +1,70 @@
+"""스트리밍 적재 후 노트 수정 검사"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import ingest_pipeline, note_indexer
+from app.services.ingest_pipeline import ingest_file
+from app.services.local_vector_store import LocalVectorStore
+from app.services.note_indexer import TruncatedContentError, content_to_reindex
+from app.services.text_chunker import TextChunker
+
+DIM = 8
+COLLECTION = "notes"
+
+
+def clean_text(text):
+    return " ".join(text.split())
+
+
+class FakeExtractor:
+    clean_text = staticmethod(clean_text)
+
+    def iter_file_segments(self, file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            yield from f
+
+
+class FakeEmbeddingService:
+    def get_chunker(self):
+        return TextChunker(chunk_size=100, chunk_overlap=0)
+
+    def get_embeddings(self, texts):
+        return np.ones((len(texts), DIM), dtype=np.float32)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalVectorStore(str(tmp_path / "vectors"))
+    store.ensure_collection(COLLECTION, vector_size=DIM)
+    monkeypatch.setattr(ingest_pipeline, "get_vector_store", lambda: store)
+    monkeypatch.setattr(note_indexer, "get_vector_store", lambda: store)
+    return store
+
+
+def ingest(tmp_path, lines, content_max_chars):
+    path = tmp_path / "large.txt"
+    path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+    stats = ingest_file(1, str(path), FakeEmbeddingService(), FakeExtractor(), batch_size=4,
+                        content_max_chars=content_max_chars)
+    return SimpleNamespace(content=stats["content"], content_truncated=stats["content_truncated"]), stats
+
+
+def test_put_of_unchanged_truncated_content_keeps_all_chunks(store, tmp_path):
+    note, stats = ingest(tmp_path, [f"문단 {i} 의 내용입니다." for i in range(200)], content_max_chars=150)
+    assert note.content_truncated and len(note.content) == 150
+
+    # 클라이언트가 GET 으로 받은 본문을 그대로 PUT (정제하면 끝 공백이 달라질 수 있다)
+    assert content_to_reindex(note, clean_text(note.content + " "), clean_text) is None
+    assert len(store.get_note_chunks(COLLECTION, 1)) == stats["chunks"]
+
+    with pytest.raises(TruncatedContentError):
+        content_to_reindex(note, clean_text(note.content + " 추가"), clean_text)
+
+
+def test_untruncated_ingest_can_be_edited(store, tmp_path):
+    note, _ = ingest(tmp_path, ["짧은 문서"], content_max_chars=1000)
+    assert not note.content_truncated
+    assert content_to_reindex(note, note.content, clean_text) is None
+    assert content_to_reindex(note, "고친 문서", clean_text) == "고친 문서"
@@ -0,0 +1,23 @@
+import pytest
+
+from app.services import keyword_search
+from app.services.keyword_search import keyword_terms, prefix_tsquery
+
+
+def test_keyword_terms_without_kiwi_strips_listed_suffixes(monkeypatch):
+    monkeypatch.setattr(keyword_search, "_kiwi_unavailable", True)
+    monkeypatch.setattr(keyword_search, "_kiwi", None)
+    assert keyword_terms("노트를 검색했다 python을 노트를") == ["노트", "검색", "python"]
+
+
+def test_keyword_terms_with_kiwi_keeps_leading_stem():
+    pytest.importorskip("kiwipiepy")
+    # 목록에 없는 조사/어미도 떼고, 복합 명사는 붙인 채로 어절 앞부분만 남긴다
+    assert keyword_terms("벡터검색을 노트에서부터 검색해서") == ["벡터검색", "노트", "검색"]
+    # 활용으로 모양이 바뀐 어간은 본문 어절의 접두어가 아니므로 쓰지 않는다
+    assert keyword_terms("아름다운") == ["아름다운"]
+
+
+def test_prefix_tsquery_quotes_terms():
+    assert prefix_tsquery("노트를 it's") == "'노트':* & 'it':*"
+    assert prefix_tsquery("a") is None
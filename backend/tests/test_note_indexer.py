@@ -0,0 +1,47 @@
+"""노트 재색인 (바뀐 청크만 다시 임베딩) 검사"""
+import numpy as np
+import pytest
+
+from app.services import note_indexer
+from app.services.local_vector_store import LocalVectorStore
+
+DIM = 8
+COLLECTION = "notes"
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.calls = []
+
+    def get_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return np.random.default_rng(len(self.calls)).standard_normal((len(texts), DIM), dtype=np.float32)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalVectorStore(str(tmp_path))
+    store.ensure_collection(COLLECTION, vector_size=DIM)
+    monkeypatch.setattr(note_indexer, "get_vector_store", lambda: store)
+    return store
+
+
+def stored_contents(store):
+    hits = store.search_similar(COLLECTION, np.ones(DIM, dtype=np.float32), top_k=10)
+    return sorted(hit["content"] for hit in hits)
+
+
+def test_reindex_reuses_unchanged_chunks(store):
+    service = FakeEmbeddingService()
+    note_indexer.reindex_note(1, ["첫 문단", "둘째 문단"], service)
+    stats = note_indexer.reindex_note(1, ["새 문단", "첫 문단", "둘째 문단"], service)
+    assert stats == {"embedded": 1, "reused": 2, "reindexed": 2, "deleted": 0}
+    assert service.calls[-1] == ["새 문단"]
+
+
+def test_reindex_updates_content_of_whitespace_only_change(store):
+    service = FakeEmbeddingService()
+    note_indexer.reindex_note(1, ["첫 문단", "둘째 문단"], service)
+    stats = note_indexer.reindex_note(1, ["첫 문단", "둘째  문단\n"], service)
+    assert stats["embedded"] == 1 and stats["deleted"] == 1
+    assert stored_contents(store) == ["둘째  문단\n", "첫 문단"]
@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.services import milvus_service
+
+DIM = 16
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+NOTES = {
+    1: {"user_id": 1, "category": "work", "created_at": BASE},
+    2: {"user_id": 1, "category": "home", "created_at": BASE + timedelta(days=10)},
+    3: {"user_id": 2, "category": "work", "created_at": BASE + timedelta(days=20)},
+}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def point_ids(note_id):
+    return [f"00000000-0000-0000-0000-{note_id:06d}{i:06d}" for i in range(3)]
+
+
+async def insert_notes(collection):
+    await milvus_service.aensure_collection(collection, vector_size=DIM)
+    rng = np.random.default_rng(0)
+    vectors = {}
+    for note_id, metadata in NOTES.items():
+        vecs = rng.standard_normal((3, DIM), dtype=np.float32)
+        await milvus_service.ainsert_vectors(
+            collection, vecs, point_ids(note_id), [note_id] * 3,
+            [f"note {note_id} chunk {i}" for i in range(3)],
+            chunk_indexes=[0, 1, 2], chunk_hashes=[f"h{note_id}{i}" for i in range(3)], metadata=metadata,
+        )
+        vectors[note_id] = vecs
+    return vectors
+
+
+def test_aensure_collection_creates_and_caches(qdrant_memory):
+    async def scenario():
+        config = await milvus_service.aensure_collection("notes_async", vector_size=DIM)
+        # 두 번째 호출은 Qdrant 에 묻지 않고 캐시된 설정을 그대로 돌려준다
+        cached = await milvus_service.aensure_collection("notes_async", vector_size=DIM)
+        return config, cached
+
+    config, cached = run(scenario())
+    assert config == {"size": DIM, "distance": "Cosine"}
+    assert cached is config
+    assert qdrant_memory.collection_exists("notes_async")
+
+
+def test_aensure_collection_keeps_existing_data(qdrant_memory):
+    async def scenario():
+        await insert_notes("notes_async")
+        milvus_service.forget_collection("notes_async")
+        await milvus_service.aensure_collection("notes_async", vector_size=DIM)
+
+    run(scenario())
+    assert qdrant_memory.count("notes_async").count == 9
+
+
+def test_aensure_collection_rejects_other_vector_size(qdrant_memory):
+    async def scenario():
+        await milvus_service.aensure_collection("notes_async", vector_size=DIM)
+        milvus_service.forget_collection("notes_async")
+        await milvus_service.aensure_collection("notes_async", vector_size=DIM * 2)
+
+    with pytest.raises(ValueError, match="vector size"):
+        run(scenario())
+
+
+def test_aupsert_points_batches_and_overwrites(qdrant_memory):
+    async def scenario():
+        vectors = await insert_notes("notes_async")
+        # 같은 id 로 다시 쓰면 덮어쓴다 (배치 크기 1 로 여러 요청을 동시에 보냄)
+        stats = await milvus_service.aupsert_points(
+            "notes_async", vectors[1], point_ids(1),
+            [{"note_id": 1, "content": f"rewritten {i}", **milvus_service.note_payload(**NOTES[1])} for i in range(3)],
+            batch_size=1,
+        )
+        hits = await milvus_service.asearch_similar("notes_async", vectors[1][0], top_k=1)
+        return stats, hits
+
+    stats, hits = run(scenario())
+    assert stats["points"] == 3 and stats["batches"] == 3
+    assert qdrant_memory.count("notes_async").count == 9
+    assert hits[0]["content"] == "rewritten 0"
+
+
+def test_asearch_similar_applies_filters(qdrant_memory):
+    async def scenario():
+        vectors = await insert_notes("notes_async")
+        query = vectors[2][1]
+        return {
+            "all": await milvus_service.asearch_similar("notes_async", query, top_k=3),
+            "user": await milvus_service.asearch_similar("notes_async", query, top_k=10, user_id=2),
+            "category": await milvus_service.asearch_similar("notes_async", query, top_k=10, category="work"),
+            "range": await milvus_service.asearch_similar(
+                "notes_async", query, top_k=10,
+                created_from=BASE + timedelta(days=5), created_to=BASE + timedelta(days=15),
+            ),
+            "none": await milvus_service.asearch_similar("notes_async", query, top_k=10, user_id=99),
+        }
+
+    hits = run(scenario())
+    assert hits["all"][0]["content"] == "note 2 chunk 1"
+    assert hits["all"][0]["score"] == pytest.approx(1.0, abs=1e-3)
+    assert [h["score"] for h in hits["all"]] == sorted((h["score"] for h in hits["all"]), reverse=True)
+    assert {h["note_id"] for h in hits["user"]} == {3}
+    assert {h["note_id"] for h in hits["category"]} == {1, 3}
+    assert {h["note_id"] for h in hits["range"]} == {2}
+    assert hits["none"] == []
+
+
+def test_asearch_similar_batch_keeps_query_order(qdrant_memory):
+    async def scenario():
+        vectors = await insert_notes("notes_async")
+        queries = [vectors[3][0], vectors[1][2]]
+        return await milvus_service.asearch_similar_batch("notes_async", queries, top_k=1, user_id=1)
+
+    results = run(scenario())
+    assert len(results) == 2
+    # 사용자 1 로 제한했으므로 노트 3 의 벡터로 찾아도 노트 3 은 나오지 않는다
+    assert results[0][0]["note_id"] in {1, 2}
+    assert results[1][0]["content"] == "note 1 chunk 2"
+
+
+def test_akeyword_search_counts_and_filters(qdrant_memory):
+    async def scenario():
+        await insert_notes("notes_async")
+        await milvus_service.ainsert_vectors(
+            "notes_async", np.ones((1, DIM), dtype=np.float32), ["00000000-0000-0000-0000-000009000000"], [9],
+            ["rewritten note"], metadata={"user_id": 1},
+        )
+        return (
+            await milvus_service.akeyword_search("notes_async", "rewritten note", top_k=3),
+            await milvus_service.akeyword_search("notes_async", "rewritten", top_k=3, user_id=2),
+        )
+
+    hits, filtered = run(scenario())
+    assert hits[0]["content"] == "rewritten note"
+    assert filtered == []
+
+
+def test_adelete_vectors_removes_one_note(qdrant_memory):
+    async def scenario():
+        vectors = await insert_notes("notes_async")
+        await milvus_service.adelete_vectors("notes_async", 3)
+        return await milvus_service.asearch_similar("notes_async", vectors[3][0], top_k=10)
+
+    hits = run(scenario())
+    assert hits and 3 not in {h["note_id"] for h in hits}
+    assert qdrant_memory.count("notes_async").count == 6
+
+
+def test_akeyword_search_pages_through_all_candidates(qdrant_memory, monkeypatch, caplog):
+    monkeypatch.setattr(milvus_service, "QDRANT_KEYWORD_CANDIDATES", 2)
+
+    async def scenario():
+        await insert_notes("notes_async")
+        # 마지막으로 넣은 청크만 검색어가 두 번 나와 가장 높은 점수를 받아야 한다
+        await milvus_service.ainsert_vectors(
+            "notes_async", np.ones((1, DIM), dtype=np.float32), ["00000000-0000-0000-0000-000009000000"], [9],
+            ["note chunk chunk"], metadata={"user_id": 1},
+        )
+        return await milvus_service.akeyword_search("notes_async", "chunk", top_k=1)
+
+    hits = run(scenario())
+    assert hits[0]["note_id"] == 9
+    assert "matched more than" not in caplog.text
+
+    monkeypatch.setattr(milvus_service, "QDRANT_KEYWORD_MAX_CANDIDATES", 3)
+    run(milvus_service.akeyword_search("notes_async", "chunk", top_k=1))
+    assert "matched more than 3 chunks" in caplog.text
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from app.services.response_cache import ResponseCache  # noqa: E402
+
+CONFIG = ("model", 0.2)
+
+
+def hits_for(note_id):
+    return [{"note_id": note_id, "content": f"note {note_id}"}]
+
+
+def store(cache, note_id, vector=None):
+    vector = np.ones(4, dtype=np.float32) if vector is None else vector
+    cache.store(1, vector, hits_for(note_id), CONFIG, f"answer {note_id}", 100.0, {note_id: 0})
+
+
+def test_lru_eviction_prunes_buckets_and_note_index():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60, similarity=0.9)
+    for note_id in (1, 2, 3):
+        store(cache, note_id)
+
+    assert len(cache._entries) == 2
+    assert len(cache._buckets) == 2
+    assert set(cache._by_note) == {2, 3}
+    assert cache.lookup(1, np.ones(4), hits_for(1), CONFIG) is None
+    assert cache.lookup(1, np.ones(4), hits_for(3), CONFIG)["answer"] == "answer 3"
+
+
+def test_expired_entries_are_pruned_on_next_store():
+    cache = ResponseCache(max_entries=10, ttl_seconds=0.05, similarity=0.9)
+    store(cache, 1)
+    store(cache, 2)
+    time.sleep(0.1)
+    store(cache, 3)
+
+    assert len(cache._entries) == 1
+    assert set(cache._by_note) == {3}
+    assert len(cache._buckets) == 1
+
+
+def test_invalidate_note_drops_empty_buckets():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity=0.9)
+    store(cache, 1)
+    store(cache, 1, np.array([1, 0, 0, 0], dtype=np.float32))
+    store(cache, 2)
+
+    cache.invalidate_note(1)
+    assert set(cache._by_note) == {2}
+    assert len(cache._buckets) == 1
+    assert cache.lookup(1, np.ones(4), hits_for(1), CONFIG) is None
+    # 무효화 전에 시작된 생성 결과는 저장하지 않는다
+    store(cache, 1)
+    assert 1 not in cache._by_note
@@ -0,0 +1,53 @@
+import numpy as np
+
+from app.services.retrieval_cache import RetrievalCache
+
+
+class FakeStore:
+    """컬렉션마다 다른 결과를 돌려주고 호출 수를 센다"""
+
+    def __init__(self):
+        self.calls = []
+
+    def search_similar(self, collection_name, query_vector, top_k, with_vectors=False, **filters):
+        self.calls.append(collection_name)
+        hit = {"note_id": 1, "content": collection_name, "score": 1.0}
+        if with_vectors:
+            hit["vector"] = np.asarray(query_vector, dtype=np.float32)
+        return [hit]
+
+
+def test_search_keys_results_by_collection():
+    cache = RetrievalCache(max_bytes=1 << 20, ttl_seconds=60)
+    store = FakeStore()
+    query = np.ones(4, dtype=np.float32)
+
+    assert cache.search(store, "notes_a", query, 5, user_id=1)[0]["content"] == "notes_a"
+    # 같은 사용자/질의라도 다른 컬렉션의 결과를 돌려주면 안 된다
+    assert cache.search(store, "notes_b", query, 5, user_id=1)[0]["content"] == "notes_b"
+    assert cache.search(store, "notes_a", query, 5, user_id=1)[0]["content"] == "notes_a"
+    assert store.calls == ["notes_a", "notes_b"]
+
+
+def test_invalidate_user_drops_only_that_user():
+    cache = RetrievalCache(max_bytes=1 << 20, ttl_seconds=60)
+    store = FakeStore()
+    query = np.ones(4, dtype=np.float32)
+    cache.search(store, "notes", query, 5, user_id=1)
+    cache.search(store, "notes", query, 5, user_id=2)
+
+    cache.invalidate_user(1)
+    cache.search(store, "notes", query, 5, user_id=1)
+    cache.search(store, "notes", query, 5, user_id=2)
+    assert len(store.calls) == 3
+
+
+def test_results_with_vectors_are_cached_separately():
+    cache = RetrievalCache(max_bytes=1 << 20, ttl_seconds=60)
+    store = FakeStore()
+    query = np.ones(4, dtype=np.float32)
+
+    assert "vector" not in cache.search(store, "notes", query, 5, user_id=1)[0]
+    assert cache.search(store, "notes", query, 5, user_id=1, with_vectors=True)[0]["vector"].shape == (4,)
+    assert cache.search(store, "notes", query, 5, user_id=1, with_vectors=True)[0]["vector"].shape == (4,)
+    assert len(store.calls) == 2
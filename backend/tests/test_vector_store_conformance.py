@@ -0,0 +1,190 @@
+"""VectorStore 백엔드 공통 동작 검사 (local 과 qdrant 로컬 모드에 같은 시나리오를 실행)"""
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.services.local_vector_store import LocalVectorStore
+from app.services.vector_store import VectorStore, create_vector_store
+
+DIM = 16
+COLLECTION = "conformance"
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# 노트 1, 2 는 사용자 1, 노트 3 은 사용자 2
+NOTES = {
+    1: {"user_id": 1, "category": "work", "created_at": BASE},
+    2: {"user_id": 1, "category": "home", "created_at": BASE + timedelta(days=10)},
+    3: {"user_id": 2, "category": "work", "created_at": BASE + timedelta(days=20)},
+}
+
+
+def point_ids(note_id):
+    return [f"00000000-0000-0000-0000-{note_id:06d}{i:06d}" for i in range(3)]
+
+
+@pytest.fixture(params=["local", "qdrant"])
+def store(request, tmp_path):
+    if request.param == "local":
+        return LocalVectorStore(str(tmp_path))
+    request.getfixturevalue("qdrant_memory")
+    return create_vector_store("qdrant")
+
+
+@pytest.fixture
+def vectors(store):
+    store.ensure_collection(COLLECTION, vector_size=DIM)
+    rng = np.random.default_rng(0)
+    vectors = {}
+    for note_id, metadata in NOTES.items():
+        vecs = rng.standard_normal((3, DIM), dtype=np.float32)
+        store.insert_vectors(
+            COLLECTION, vecs, point_ids(note_id), [note_id] * 3, [f"note {note_id} chunk {i}" for i in range(3)],
+            chunk_indexes=[0, 1, 2], chunk_hashes=[f"h{note_id}{i}" for i in range(3)], metadata=metadata,
+        )
+        vectors[note_id] = vecs
+    return vectors
+
+
+def rewrite_first_chunk(store, vectors):
+    store.insert_vectors(
+        COLLECTION, vectors[1][:1], point_ids(1)[:1], [1], ["note 1 chunk 0 (rewritten)"],
+        chunk_indexes=[0], chunk_hashes=["h10"], metadata=NOTES[1],
+    )
+
+
+def test_vector_store_is_abstract():
+    with pytest.raises(TypeError):
+        VectorStore()
+
+
+def test_ensure_collection_reports_vector_size(store):
+    assert store.ensure_collection(COLLECTION, vector_size=DIM)["size"] == DIM
+
+
+def test_search_similar_ranks_exact_vector_first(store, vectors):
+    hits = store.search_similar(COLLECTION, vectors[2][1], top_k=3)
+    assert hits[0]["content"] == "note 2 chunk 1"
+    assert hits[0]["score"] == pytest.approx(1.0, abs=1e-3)
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+
+def test_search_similar_returns_stored_vectors_on_request(store, vectors):
+    assert "vector" not in store.search_similar(COLLECTION, vectors[2][1], top_k=1)[0]
+    hit = store.search_similar(COLLECTION, vectors[2][1], top_k=1, with_vectors=True)[0]
+    expected = vectors[2][1] / np.linalg.norm(vectors[2][1])
+    assert hit["vector"].dtype == np.float32
+    np.testing.assert_allclose(hit["vector"] / np.linalg.norm(hit["vector"]), expected, atol=1e-5)
+    batch = asyncio.run(store.asearch_similar_batch(COLLECTION, [vectors[1][0]], top_k=2, with_vectors=True))
+    assert all(hit["vector"].shape == (DIM,) for hit in batch[0])
+
+
+def test_search_similar_filters(store, vectors):
+    query = vectors[2][1]
+    assert {h["note_id"] for h in store.search_similar(COLLECTION, query, top_k=10, user_id=2)} == {3}
+    assert {h["note_id"] for h in store.search_similar(COLLECTION, query, top_k=10, category="work")} == {1, 3}
+    hits = store.search_similar(
+        COLLECTION, query, top_k=10, created_from=BASE + timedelta(days=5), created_to=BASE + timedelta(days=15)
+    )
+    assert {h["note_id"] for h in hits} == {2}
+    assert store.search_similar(COLLECTION, query, top_k=10, user_id=99) == []
+
+
+def test_get_note_chunks_returns_index_and_hash(store, vectors):
+    chunks = store.get_note_chunks(COLLECTION, 1)
+    assert sorted((c["chunk_index"], c["chunk_hash"]) for c in chunks) == [(0, "h10"), (1, "h11"), (2, "h12")]
+
+
+def test_upsert_with_existing_id_overwrites(store, vectors):
+    rewrite_first_chunk(store, vectors)
+    assert len(store.get_note_chunks(COLLECTION, 1)) == 3
+    assert store.search_similar(COLLECTION, vectors[1][0], top_k=1)[0]["content"] == "note 1 chunk 0 (rewritten)"
+
+
+def test_keyword_search_ranks_rarer_term_and_filters(store, vectors):
+    rewrite_first_chunk(store, vectors)
+    hits = store.keyword_search(COLLECTION, "rewritten notes", top_k=3)
+    assert hits[0]["content"] == "note 1 chunk 0 (rewritten)"
+    assert store.keyword_search(COLLECTION, "rewritten", top_k=3, user_id=2) == []
+    # 미리 분석한 검색어를 넘기면 질의어 대신 그 검색어로 찾는다
+    hits = asyncio.run(store.akeyword_search(COLLECTION, "unrelated", top_k=3, terms=["rewritten"]))
+    assert [h["content"] for h in hits] == ["note 1 chunk 0 (rewritten)"]
+    hits = asyncio.run(store.akeyword_search(COLLECTION, "chunk", top_k=10, user_id=1))
+    assert {h["note_id"] for h in hits} == {1, 2}
+
+
+def test_update_chunk_indexes(store, vectors):
+    ids = point_ids(1)
+    store.update_chunk_indexes(COLLECTION, {ids[2]: 7})
+    assert {c["id"]: c["chunk_index"] for c in store.get_note_chunks(COLLECTION, 1)}[ids[2]] == 7
+
+
+def test_set_notes_metadata_updates_filter_fields(store, vectors):
+    store.set_notes_metadata(COLLECTION, {2: {**NOTES[2], "category": "work"}})
+    hits = store.search_similar(COLLECTION, vectors[2][1], top_k=10, category="work")
+    assert {h["note_id"] for h in hits} == {1, 2, 3}
+
+
+def test_delete_points_and_vectors(store, vectors):
+    store.delete_points(COLLECTION, point_ids(1)[:1])
+    assert len(store.get_note_chunks(COLLECTION, 1)) == 2
+    store.delete_vectors(COLLECTION, 3)
+    assert store.get_note_chunks(COLLECTION, 3) == []
+    hits = asyncio.run(store.asearch_similar(COLLECTION, vectors[2][1], top_k=1, user_id=1))
+    assert hits[0]["note_id"] == 2
+    assert store.get_collection_stats(COLLECTION)["points_count"] == 5
+
+
+def test_local_data_survives_reopening(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    store.ensure_collection(COLLECTION, vector_size=DIM)
+    query = np.ones(DIM, dtype=np.float32)
+    store.insert_vectors(COLLECTION, query[None], point_ids(2)[:1], [2], ["note 2 chunk 0"], metadata=NOTES[2])
+    store.delete_vectors(COLLECTION, 2)
+    store.insert_vectors(COLLECTION, query[None], point_ids(2)[1:2], [2], ["note 2 chunk 1"], metadata=NOTES[2])
+
+    reopened = LocalVectorStore(str(tmp_path))
+    hits = reopened.search_similar(COLLECTION, query, top_k=5, user_id=1)
+    assert [h["content"] for h in hits] == ["note 2 chunk 1"]
+    assert reopened.get_collection_stats(COLLECTION)["points_count"] == 1
+
+
+def test_local_store_sees_writes_from_another_instance(tmp_path):
+    # 같은 디렉토리를 여는 두 인스턴스 = 같은 데이터를 쓰는 두 워커 프로세스
+    writer = LocalVectorStore(str(tmp_path))
+    reader = LocalVectorStore(str(tmp_path))
+    writer.ensure_collection(COLLECTION, vector_size=DIM)
+    reader.ensure_collection(COLLECTION, vector_size=DIM)
+    rng = np.random.default_rng(1)
+    # 처음 용량(1024)을 넘겨 행렬 파일의 세대가 바뀌는 경우까지 포함
+    vecs = rng.standard_normal((1500, DIM), dtype=np.float32)
+    ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(len(vecs))]
+    note_ids = [i % 10 for i in range(len(vecs))]
+    writer.insert_vectors(COLLECTION, vecs, ids, note_ids, ["chunk"] * len(vecs), metadata={"user_id": 1})
+    assert reader.search_similar(COLLECTION, vecs[1400], top_k=1)[0]["note_id"] == 0
+
+    writer.delete_vectors(COLLECTION, 0)
+    writer.set_notes_metadata(COLLECTION, {1: {"user_id": 2}})
+    assert all(h["note_id"] != 0 for h in reader.search_similar(COLLECTION, vecs[1400], top_k=5))
+    assert {h["note_id"] for h in reader.search_similar(COLLECTION, vecs[1401], top_k=200, user_id=2)} == {1}
+    assert reader.get_collection_stats(COLLECTION)["points_count"] == 1350
+
+
+def test_local_store_migrates_legacy_meta_json(tmp_path):
+    path = tmp_path / COLLECTION
+    path.mkdir()
+    vecs = np.memmap(path / "vectors.0.f32", dtype=np.float32, mode="w+", shape=(4, DIM))
+    vecs[1] = 1.0 / np.sqrt(DIM)
+    vecs.flush()
+    meta = {
+        "dim": DIM, "capacity": 4, "generation": 0, "vectors_file": "vectors.0.f32",
+        "points": [{"id": point_ids(1)[0], "row": 1, "payload": {"note_id": 1, "content": "legacy", "user_id": 1}}],
+    }
+    (path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    store = LocalVectorStore(str(tmp_path))
+    hits = store.search_similar(COLLECTION, np.ones(DIM, dtype=np.float32), top_k=1)
+    assert hits[0]["content"] == "legacy"
+    assert not os.path.exists(path / "meta.json")